@@ -0,0 +1,97 @@
+"""
+Simulated annealing benchmark: quality of the best route of classes.annealing.Annealer against wall time (cost against the
+optimal route of RCSP, read from the improvements the chains report), and how often HillClimb answers the same queries,
+on a synthetic scale-free graph whose fuel and TTL limits bind.
+Usage: PYTHONPATH=src python -m benchmarks.annealing [edges] [queries] [chains] [seconds]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes.algorithms import RCSP, HillClimb
+from classes.annealing import Annealer
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+CHECKPOINTS_S: tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2, 4)
+
+def run(num_edges: int=50_000, queries: int=10, chains: int=None, seconds: float=4, peso: int=150, landmarks: int=8, seed: int=0) -> dict:
+    """
+    Run the same random queries (one zone -> 3 zones) with RCSP, HillClimb and the annealer (limited to `seconds`).
+    :return: Dict with "checkpoints": seconds -> {"answered", "cost_ratio" (mean cost / optimal cost of the answered queries),
+             "optimal"}, "hillclimb" {"answered", "cost_ratio", "ms"}, "rcsp_ms", the number of "solvable" queries and the
+             annealer totals ("iterations", "restarts", "evaluations").
+    """
+    graph = synthetic_graph(num_edges, seed, ttl_scale=1)
+    graph.build_landmarks(landmarks)
+    rng = random.Random(seed)
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    workload = [rng.sample(names, 4) for _ in range(queries)]
+    timings = {"rcsp": 0.0, "hillclimb": 0.0}
+    hillclimb = []
+    traces = []
+    totals = {"iterations": 0, "restarts": 0, "evaluations": 0}
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), Annealer(graph) as annealer: # Warnings of the algorithms are not part of the measure
+            annealer.solve(workload[0][0], workload[0][1:], peso, chains, iterations=1) # Start the workers before measuring
+            for (start_node, *end_nodes) in workload:
+                begin = time.perf_counter()
+                expected = RCSP(start_node, list(end_nodes), graph, peso)
+                timings["rcsp"] += time.perf_counter() - begin
+                begin = time.perf_counter()
+                with graph.snapshot() as snapshot:
+                    result = HillClimb(start_node, list(end_nodes), snapshot.query(), peso)
+                timings["hillclimb"] += time.perf_counter() - begin
+                stats = {}
+                annealer.solve(start_node, end_nodes, peso, chains, iterations=10**9, seconds=seconds, seed=seed, stats=stats)
+                for key in totals:
+                    totals[key] += stats[key]
+                if expected is None:
+                    continue
+                hillclimb.append(None if result is None else result[1] / expected[1])
+                traces.append([(moment, cost / expected[1]) for (moment, cost) in stats["trace"]])
+    finally:
+        utils.notify.DEBUG = debug
+    checkpoints = {}
+    for checkpoint in CHECKPOINTS_S:
+        ratios = [min((ratio for (moment, ratio) in trace if moment <= checkpoint), default=None) for trace in traces]
+        ratios = [ratio for ratio in ratios if ratio is not None]
+        checkpoints[checkpoint] = {
+            "answered": len(ratios),
+            "cost_ratio": sum(ratios) / len(ratios) if ratios else None,
+            "optimal": sum(ratio <= 1 + 1e-9 for ratio in ratios)
+        }
+    answered = [ratio for ratio in hillclimb if ratio is not None]
+    return {
+        "checkpoints": checkpoints,
+        "hillclimb": {"answered": len(answered), "cost_ratio": sum(answered) / len(answered) if answered else None, "ms": timings["hillclimb"] / queries * 1000},
+        "rcsp_ms": timings["rcsp"] / queries * 1000,
+        "solvable": len(traces),
+        "workers": annealer.workers,
+        **totals
+    }
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    chains = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    seconds = float(sys.argv[4]) if len(sys.argv) > 4 else max(CHECKPOINTS_S)
+    result = run(num_edges, queries, chains, seconds)
+    notify("info", f"Simulated annealing: {num_edges} arestas, {queries} consultas ({result['solvable']} com solução, RCSP {result['rcsp_ms']:.0f} ms/consulta), "
+                   f"{chains or result['workers']} cadeias em {result['workers']} processos, {result['iterations']} iterações, {result['restarts']} recomeços, {result['evaluations']} rotas avaliadas")
+    hillclimb = result["hillclimb"]
+    ratio = "-" if hillclimb["cost_ratio"] is None else f"{hillclimb['cost_ratio']:.3f}"
+    print(f"Hill Climbing: {hillclimb['answered']}/{result['solvable']} respondidas em {hillclimb['ms']:.1f} ms/consulta, custo/ótimo {ratio}")
+    print(f"{'tempo (s)':<11}{'respondidas':>13}{'custo/ótimo':>13}{'ótimas':>8}")
+    for checkpoint, entry in result["checkpoints"].items():
+        ratio = "-" if entry["cost_ratio"] is None else f"{entry['cost_ratio']:.3f}"
+        print(f"{checkpoint:<11}{entry['answered']:>13}{ratio:>13}{entry['optimal']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Anytime search benchmark: quality of the route ARAStar returns within each deadline (cost against the optimal one of AStar
+and the suboptimality bound it reports) and how many queries AStar itself would have answered within the same deadline.
+Usage: PYTHONPATH=src python -m benchmarks.anytime [edges] [queries] [epsilon]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes.algorithms import AStar, ARAStar
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+DEADLINES_MS: tuple[int, ...] = (25, 50, 100, 200, 400, 800)
+
+def run(num_edges: int=100_000, queries: int=10, epsilon: float=2.5, landmarks: int=8, seed: int=0) -> dict[int, dict]:
+    """
+    Run the same random queries with AStar (no deadline) and with ARAStar for every deadline.
+    :return: Dict deadline -> {"astar_answered", "answered" (by ARAStar), "cost_ratio" (mean cost / optimal cost of the answered
+             queries), "bound" (mean bound reported), "optimal" (answers with bound 1)}.
+    """
+    graph = synthetic_graph(num_edges, seed)
+    graph.build_landmarks(landmarks)
+    rng = random.Random(seed)
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    pairs = [rng.sample(names, 2) for _ in range(queries)]
+    results = {}
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Warnings of the algorithms are not part of the measure
+            optimal = []
+            for (start_node, end_node) in pairs:
+                begin = time.perf_counter()
+                result = AStar(start_node, [end_node], graph, 0)
+                optimal.append((result, (time.perf_counter() - begin) * 1000))
+            for deadline in DEADLINES_MS:
+                answered = optimal_answers = 0
+                ratios = []
+                bounds = []
+                for ((start_node, end_node), (expected, _)) in zip(pairs, optimal):
+                    result = ARAStar(start_node, [end_node], graph, 0, epsilon, deadline_ms=deadline)
+                    if result is None or expected is None:
+                        continue
+                    answered += 1
+                    ratios.append(result[1] / expected[1] if expected[1] else 1.0)
+                    bounds.append(result[3])
+                    optimal_answers += result[3] == 1.0
+                results[deadline] = {
+                    "astar_answered": sum(expected is not None and elapsed <= deadline for (expected, elapsed) in optimal),
+                    "answered": answered,
+                    "cost_ratio": sum(ratios) / len(ratios) if ratios else None,
+                    "bound": sum(bounds) / len(bounds) if bounds else None,
+                    "optimal": optimal_answers
+                }
+    finally:
+        utils.notify.DEBUG = debug
+    return results
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    epsilon = float(sys.argv[3]) if len(sys.argv) > 3 else 2.5
+    results = run(num_edges, queries, epsilon)
+    notify("info", f"ARA* com prazo: {num_edges} arestas, {queries} consultas, epsilon inicial {epsilon}")
+    print(f"{'prazo (ms)':<12}{'A* a tempo':>12}{'ARA* a tempo':>14}{'custo/ótimo':>13}{'limite':>9}{'ótimas':>8}")
+    for deadline, result in results.items():
+        ratio = "-" if result["cost_ratio"] is None else f"{result['cost_ratio']:.3f}"
+        bound = "-" if result["bound"] is None else f"{result['bound']:.2f}"
+        print(f"{deadline:<12}{result['astar_answered']:>12}{result['answered']:>14}{ratio:>13}{bound:>9}{result['optimal']:>8}")
+
+if __name__ == "__main__":
+    main()
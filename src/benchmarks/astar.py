@@ -0,0 +1,94 @@
+"""
+A* benchmark: node expansions, heap pushes and time per query on large synthetic scale-free graphs,
+with the heuristic table of the graph and with k ALT landmarks.
+Usage: PYTHONPATH=src python -m benchmarks.astar [edges] [queries] [landmarks]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes.graph import Graph
+from classes.algorithms import AStar
+from classes.synthetic import scale_free_graph
+from utils.notify import notify
+
+LINKS: int = 4 # Edges of each new zone of the scale-free graphs
+
+def synthetic_graph(num_edges: int, seed: int=0, backend: str="compact", ttl_scale: int=1000) -> Graph:
+    """
+    Build a seeded scale-free graph (see classes.synthetic.scale_free_graph) with about num_edges edges over num_edges // LINKS
+    zones, sampled by NumPy instead of one add_edge per edge. A compact graph is thawed and its heuristics read into a dict,
+    so the searches do not pay for the name lookups of a graph over mapped sections.
+    :param ttl_scale: Factor applied to the zone TTLs (the default makes them large enough for any route).
+    """
+    graph = scale_free_graph(max(LINKS + 1, num_edges // LINKS), LINKS, seed, backend, ttl_scale=ttl_scale)
+    if backend == "compact":
+        graph.storage.thaw()
+        graph.heuristics = graph.heuristics.to_dict()
+    return graph
+
+def run(num_edges: int=100_000, queries: int=20, seed: int=0, algorithm=AStar, landmarks: int=0, graph: Graph=None) -> dict:
+    """
+    Run random single-target queries with a light load (no feasibility pruning) and report the averages.
+    :param landmarks: Number of ALT landmarks to preprocess (0 uses the heuristic table).
+    :param graph: Graph to query (default: synthetic_graph(num_edges, seed)).
+    :return: Dict with the mean expansions, heap pushes (and any other counter the algorithm reports) and milliseconds
+             per query, the number of solved queries and the preprocessing time.
+    """
+    graph = graph or synthetic_graph(num_edges, seed)
+    preprocessing = time.perf_counter()
+    if landmarks:
+        graph.build_landmarks(landmarks)
+    else:
+        graph.landmarks = None
+    preprocessing = time.perf_counter() - preprocessing
+    rng = random.Random(seed)
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    totals = {}
+    elapsed = solved = 0
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        for _ in range(queries):
+            start_node, end_node = rng.sample(names, 2)
+            stats = {}
+            begin = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()): # Warnings of the algorithms are not part of the measure
+                result = algorithm(start_node, [end_node], graph, 0, stats=stats)
+            elapsed += time.perf_counter() - begin
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+            solved += result is not None
+    finally:
+        utils.notify.DEBUG = debug
+    result = {
+        "edges": num_edges,
+        "queries": queries,
+        "landmarks": landmarks,
+        "preprocessing_s": preprocessing,
+        "solved": solved,
+        "expansions": 0.0,
+        "pushes": 0.0,
+        "ms_per_query": elapsed / queries * 1000
+    }
+    result.update({key: value / queries for key, value in totals.items()}) # Mean of every counter the algorithm reports
+    return result
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    landmarks = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    graph = synthetic_graph(num_edges)
+    notify("info", f"A*: {num_edges} arestas, {queries} consultas")
+    print(f"{'heurística':<14}{'resolvidas':>12}{'expansões':>12}{'inserções':>12}{'ms/consulta':>14}{'pré-proc. (s)':>16}")
+    for k in (0, landmarks):
+        result = run(num_edges, queries, landmarks=k, graph=graph)
+        name = f"ALT ({k})" if k else "tabela"
+        print(f"{name:<14}{result['solved']:>12}{result['expansions']:>12.1f}{result['pushes']:>12.1f}{result['ms_per_query']:>14.2f}{result['preprocessing_s']:>16.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Batch query benchmark: queries per second of solve_batch (one AStar search per start, end nodes and load bucket) against
+answering the same queries one by one as main.resolve does (pinned snapshot, per-query view and a full AStar search each
+time), on RandomGraph with its own heuristic. Queries go from the camp (or other sources) to 1-3 zones of a small set of
+affected zones with random loads, as the loads of main.resolve_batch do; the results must match.
+Usage: PYTHONPATH=src python -m benchmarks.batch [queries] [sources] [targets]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes.algorithms import AStar
+from classes.batch import solve_batch
+from example_graph import RandomGraph
+from utils.notify import notify
+
+def run(num_queries: int=10_000, sources: int=1, targets: int=5, seed: int=0) -> dict[str, dict]:
+    """
+    Answer the same random queries with a resolve-style loop and with solve_batch.
+    :param sources: Number of distinct start zones (the camp and random zones).
+    :param targets: Number of zones the end nodes are drawn from.
+    :return: Dict with the "loop" and "batch" {"seconds", "queries_per_second"}, the batch stats and the number of different results.
+    """
+    random.seed(seed)
+    graph = RandomGraph()
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    starts = [graph.get_camp_node()] + random.sample(names, sources - 1)
+    pool = random.sample(names, targets)
+    queries = [(random.choice(starts), random.sample(pool, random.randint(1, min(3, targets))), random.randint(1, 1000)) for _ in range(num_queries)]
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Warnings of the algorithms are not part of the measure
+            begin = time.perf_counter()
+            expected = []
+            for (start_node, end_nodes, peso) in queries:
+                with graph.snapshot() as snapshot:
+                    expected.append(AStar(start_node, list(end_nodes), snapshot.query(), peso))
+            loop = time.perf_counter() - begin
+            stats = {}
+            results = solve_batch(graph, queries, AStar, stats)
+    finally:
+        utils.notify.DEBUG = debug
+    different = sum(a != b for a, b in zip(expected, results))
+    return {
+        "loop": {"seconds": loop, "queries_per_second": num_queries / loop},
+        "batch": {"seconds": stats["seconds"], "queries_per_second": stats["queries_per_second"]},
+        "stats": stats,
+        "different": different
+    }
+
+def main():
+    num_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    sources = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    targets = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    result = run(num_queries, sources, targets)
+    stats = result["stats"]
+    notify("info", f"Consultas em lote: {num_queries} consultas, {sources} origens, {targets} zonas destino ({stats['groups']} pesquisas)")
+    print(f"{'modo':<10}{'segundos':>12}{'consultas/s':>14}")
+    for name in ("loop", "batch"):
+        print(f"{name:<10}{result[name]['seconds']:>12.3f}{result[name]['queries_per_second']:>14.0f}")
+    print(f"Ganho: {result['batch']['queries_per_second'] / result['loop']['queries_per_second']:.1f}x, resultados diferentes: {result['different']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Bidirectional search benchmark: nodes settled per query by the one-directional engines (Dijkstra, i.e. AStar
+with a zero heuristic, and AStar with ALT landmarks) and by BidirectionalAStar without and with landmarks.
+Expansions of BidirectionalAStar include those of the AStar it runs when the cheapest route is not feasible ("das quais A*").
+Usage: PYTHONPATH=src python -m benchmarks.bidirectional [edges] [queries] [landmarks]
+"""
+
+import sys
+
+from classes.algorithms import AStar, BidirectionalAStar
+from benchmarks.astar import synthetic_graph, run as run_queries
+from utils.notify import notify
+
+def run(num_edges: int=100_000, queries: int=20, landmarks: int=8, seed: int=0) -> dict[str, dict]:
+    """
+    Run the same random queries with each engine.
+    :return: Dict engine name -> result of benchmarks.astar.run.
+    """
+    graph = synthetic_graph(num_edges, seed)
+    table = graph.heuristics
+    graph.heuristics = dict.fromkeys(table, 0)
+    results = {
+        "Dijkstra": run_queries(num_edges, queries, seed, AStar, graph=graph),
+        "Dijkstra bidirecional": run_queries(num_edges, queries, seed, BidirectionalAStar, graph=graph)
+    }
+    graph.heuristics = table
+    results[f"ALT ({landmarks})"] = run_queries(num_edges, queries, seed, AStar, landmarks, graph)
+    results[f"ALT bidirecional ({landmarks})"] = run_queries(num_edges, queries, seed, BidirectionalAStar, landmarks, graph)
+    return results
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    landmarks = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    results = run(num_edges, queries, landmarks)
+    notify("info", f"Nodos expandidos: {num_edges} arestas, {queries} consultas")
+    print(f"{'motor':<26}{'resolvidas':>12}{'expansões':>12}{'das quais A*':>14}{'ms/consulta':>14}")
+    for name, result in results.items():
+        fallback = result.get("fallback_expansions", 0.0)
+        print(f"{name:<26}{result['solved']:>12}{result['expansions']:>12.1f}{fallback:>14.1f}{result['ms_per_query']:>14.2f}")
+
+if __name__ == "__main__":
+    main()
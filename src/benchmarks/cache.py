@@ -0,0 +1,98 @@
+"""
+Route cache benchmark: time of a workload that repeats the same queries between simulation ticks, answered by running the
+algorithm on a fresh snapshot every time (as main.resolve did) and through classes.cache.RouteCache, with the hit rate, the
+entries invalidated per tick and how many cached answers differ from the fresh ones (routes kept after another edge got
+cheaper; none with strict invalidation).
+Queries go from the camp to 1-3 zones of a fixed pool with random loads and algorithms.
+Usage: PYTHONPATH=src python -m benchmarks.cache [ticks] [queries_per_tick] [edges] [probability]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes.algorithms import AStar, Greedy, BFS
+from classes.cache import RouteCache
+from example_graph import DynamicGraph
+from benchmarks.astar import synthetic_graph
+from benchmarks.replanning import _update_conditions
+from utils.notify import notify
+
+ALGORITHMS: tuple = (AStar, Greedy, BFS)
+
+def run(ticks: int=20, queries: int=200, num_edges: int=0, probability: float=0.01, pool: int=10, strict: bool=False, seed: int=0) -> dict:
+    """
+    Answer the same queries with and without the cache, simulating a tick between every `queries` queries.
+    :param num_edges: Size of the synthetic scale-free graph (see benchmarks.astar.synthetic_graph) to use instead of DynamicGraph (0 uses DynamicGraph and its own probability).
+    :param pool: Number of distinct (end nodes) queries.
+    :return: Dict with the "fresh" and "cached" {"seconds", "queries_per_second"}, the cache counters, the "edges" changed per tick
+             and the number of cached answers "different" from the fresh ones.
+    """
+    random.seed(seed)
+    rng = random.Random(seed)
+    if num_edges:
+        graph = synthetic_graph(num_edges, seed)
+        simulate = lambda: _update_conditions(graph, probability, rng)
+    else:
+        graph = DynamicGraph()
+        simulate = graph.simulate
+    camp = graph.get_camp_node()
+    names = [zone.get_name() for zone in graph.get_nodes() if zone.get_name() != camp]
+    targets = [rng.sample(names, rng.randint(1, 3)) for _ in range(pool)]
+    cache = RouteCache(graph, strict=strict)
+    fresh = cached = 0.0
+    changed_edges = different = 0
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Warnings of the algorithms are not part of the measure
+            for _ in range(ticks):
+                for _ in range(queries):
+                    algorithm = rng.choice(ALGORITHMS)
+                    end_nodes = rng.choice(targets)
+                    peso = rng.randint(1, 1000)
+                    begin = time.perf_counter()
+                    with graph.snapshot() as snapshot:
+                        expected = algorithm(camp, list(end_nodes), snapshot.query(), peso)
+                    fresh += time.perf_counter() - begin
+                    begin = time.perf_counter()
+                    result = cache.solve(algorithm, camp, end_nodes, peso)
+                    cached += time.perf_counter() - begin
+                    if (result is None) != (expected is None) or (result is not None and (result[0] != expected[0] or abs(result[1] - expected[1]) > 1e-9)):
+                        different += 1
+                changed = simulate()
+                changed_edges += len(set(changed))
+                cache.update(changed)
+    finally:
+        utils.notify.DEBUG = debug
+    total = ticks * queries
+    return {
+        "fresh": {"seconds": fresh, "queries_per_second": total / fresh},
+        "cached": {"seconds": cached, "queries_per_second": total / cached},
+        "counters": cache.counters(),
+        "zones": len(graph.get_nodes()),
+        "edges": changed_edges / ticks,
+        "different": different
+    }
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    num_edges = int(sys.argv[3]) if len(sys.argv) > 3 else 5_000
+    probability = float(sys.argv[4]) if len(sys.argv) > 4 else 0.01
+    for (scenario, edges) in (("DynamicGraph", 0), (f"sintético ({num_edges} arestas)", num_edges)):
+        for strict in (False, True):
+            result = run(ticks, queries, edges, probability, strict=strict)
+            counters = result["counters"]
+            notify("info", f"Cache de rotas em {scenario} ({'estrita' if strict else 'por arestas da rota'}): {result['zones']} zonas, {ticks} ticks de {queries} consultas, {result['edges']:.1f} arestas alteradas por tick")
+            print(f"{'modo':<10}{'segundos':>12}{'consultas/s':>14}")
+            for name in ("fresh", "cached"):
+                print(f"{name:<10}{result[name]['seconds']:>12.3f}{result[name]['queries_per_second']:>14.0f}")
+            print(f"Ganho: {result['cached']['queries_per_second'] / result['fresh']['queries_per_second']:.1f}x, acertos: {counters['hit_rate']:.1%}, "
+                  f"invalidadas por tick: {counters['invalidations'] / ticks:.1f}, respostas diferentes das novas: {result['different']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Search events benchmark: time per query of the algorithm functions (which log the events that replaced their prints, with debug
+messages off and stdout discarded) against their event generators asked for no events (only the solution) and for every event.
+Usage: PYTHONPATH=src python -m benchmarks.events [edges] [queries]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes import algorithms
+from classes.events import EVENTS
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+ENGINES: tuple[str, ...] = ("AStar", "BidirectionalAStar", "RCSP", "BeamSearch", "SMAStar")
+
+def run(num_edges: int=20_000, queries: int=20, peso: int=100, seed: int=0) -> dict[str, dict]:
+    """
+    Run the same random queries (one zone -> 2 zones) with each engine in the three modes.
+    :return: Dict engine name -> {"function_ms", "silent_ms", "events_ms" (per query), "events" (per query)}.
+    """
+    graph = synthetic_graph(num_edges, seed)
+    rng = random.Random(seed)
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    workload = [rng.sample(names, 3) for _ in range(queries)]
+    results = {}
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        for name in ENGINES:
+            function = getattr(algorithms, name)
+            generator = getattr(algorithms, name + "Events")
+            timings = {"function": 0.0, "silent": 0.0, "events": 0.0}
+            count = 0
+            for (start_node, *end_nodes) in workload:
+                begin = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()): # Warnings are part of the measure, the terminal is not
+                    function(start_node, list(end_nodes), graph, peso)
+                timings["function"] += time.perf_counter() - begin
+                begin = time.perf_counter()
+                for _ in generator(start_node, list(end_nodes), graph, peso, events=frozenset()):
+                    pass
+                timings["silent"] += time.perf_counter() - begin
+                begin = time.perf_counter()
+                for _ in generator(start_node, list(end_nodes), graph, peso, events=EVENTS):
+                    count += 1
+                timings["events"] += time.perf_counter() - begin
+            results[name] = {f"{mode}_ms": seconds / queries * 1000 for mode, seconds in timings.items()}
+            results[name]["events"] = count / queries
+    finally:
+        utils.notify.DEBUG = debug
+    return results
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    results = run(num_edges, queries)
+    notify("info", f"Eventos das pesquisas: {num_edges} arestas, {queries} consultas")
+    print(f"{'motor':<20}{'função ms':>11}{'sem eventos ms':>16}{'com eventos ms':>16}{'eventos':>10}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['function_ms']:>11.2f}{result['silent_ms']:>16.2f}{result['events_ms']:>16.2f}{result['events']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
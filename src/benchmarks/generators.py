@@ -0,0 +1,53 @@
+"""
+Synthetic graph benchmark: generation time of the seeded geometric, grid and scale-free graphs (classes/synthetic.py)
+at growing sizes, per zone and per edge. Generation is linear in the number of edges, so the time per edge should stay
+about flat as the graphs grow (the arc sort adds a slowly growing term).
+Usage: PYTHONPATH=src python -m benchmarks.generators [max_zones] [repeats]
+"""
+
+import sys
+import time
+import math
+
+from classes.synthetic import geometric_graph, grid_graph, scale_free_graph
+
+SIZES: tuple[int, ...] = (10_000, 100_000, 1_000_000)
+
+GENERATORS = {
+    "geometric": lambda zones, seed: geometric_graph(zones, seed=seed),
+    "grid": lambda zones, seed: grid_graph(math.isqrt(zones), math.isqrt(zones), seed=seed),
+    "scale_free": lambda zones, seed: scale_free_graph(zones, 3, seed=seed)
+}
+
+def run(sizes: tuple=SIZES, repeats: int=3, seed: int=0) -> dict[int, dict]:
+    """
+    Generate every graph of every size repeats times (each with its own seed) and keep the fastest run.
+    :return: Dict zones -> generator name -> {"zones", "edges", "seconds", "ns_per_edge"}.
+    """
+    results = {}
+    for num_zones in sizes:
+        results[num_zones] = {}
+        for name, generator in GENERATORS.items():
+            best = None
+            for repeat in range(repeats):
+                begin = time.perf_counter()
+                graph = generator(num_zones, seed + repeat)
+                elapsed = time.perf_counter() - begin
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, len(graph.get_nodes()), len(graph.storage.costs))
+                del graph
+            elapsed, zones, edges = best
+            results[num_zones][name] = {"zones": zones, "edges": edges, "seconds": elapsed, "ns_per_edge": elapsed / max(1, edges) * 1e9}
+    return results
+
+def main():
+    max_zones = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    results = run(tuple(size for size in SIZES if size <= max_zones) or (max_zones,), repeats)
+    print(f"{'tamanho':<10}{'gerador':<12}{'zonas':>10}{'arestas':>10}{'tempo (s)':>12}{'ns/aresta':>12}")
+    for num_zones, by_generator in results.items():
+        for name, result in by_generator.items():
+            print(f"{num_zones:<10}{name:<12}{result['zones']:>10}{result['edges']:>10}{result['seconds']:>12.3f}{result['ns_per_edge']:>12.0f}")
+
+if __name__ == "__main__":
+    main()
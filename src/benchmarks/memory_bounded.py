@@ -0,0 +1,90 @@
+"""
+Memory-bounded search benchmark: peak memory allocated by one query (tracemalloc) of AStar, BeamSearch and SMAStar
+on synthetic scale-free graphs of growing size. AStar keeps a score per reached node, so its peak grows with the graph;
+BeamSearch (fixed width) and SMAStar (fixed node budget) stay flat. The cost of each answer is compared with AStar.
+Usage: PYTHONPATH=src python -m benchmarks.memory_bounded [queries] [max_nodes] [width]
+"""
+
+import sys
+import time
+import random
+import tracemalloc
+import contextlib
+import io
+
+import utils.notify
+from classes.algorithms import AStar, BeamSearch, SMAStar
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+SIZES: tuple[int, ...] = (5_000, 20_000, 80_000)
+
+def run(sizes: tuple=SIZES, queries: int=10, max_nodes: int=5_000, width: int=50, seed: int=0) -> dict[int, dict]:
+    """
+    Run the same random queries (light load, ALT landmarks) with each algorithm on each graph size.
+    Each query is timed without tracing and run again under tracemalloc for its peak.
+    :return: Dict edges -> algorithm name -> {"peak_kb" (largest peak of a query), "ms_per_query", "solved",
+             "cost_ratio" (mean cost relative to AStar on the queries both solved), "peak_frontier" (None if not reported)}.
+    """
+    algorithms = {
+        "AStar": lambda s, e, g, stats: AStar(s, e, g, 0, stats=stats),
+        "BeamSearch": lambda s, e, g, stats: BeamSearch(s, e, g, 0, width=width, stats=stats),
+        "SMAStar": lambda s, e, g, stats: SMAStar(s, e, g, 0, max_nodes=max_nodes, stats=stats)
+    }
+    results = {}
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        for num_edges in sizes:
+            graph = synthetic_graph(num_edges, seed)
+            graph.build_landmarks(4)
+            rng = random.Random(seed)
+            names = [zone.get_name() for zone in graph.get_nodes()]
+            pairs = [rng.sample(names, 2) for _ in range(queries)]
+            costs = {}
+            results[num_edges] = {}
+            for name, algorithm in algorithms.items():
+                peak = elapsed = 0
+                frontier = None
+                ratios = []
+                for (index, (start_node, end_node)) in enumerate(pairs):
+                    stats = {}
+                    with contextlib.redirect_stdout(io.StringIO()): # Warnings of the algorithms are not part of the measure
+                        begin = time.perf_counter()
+                        result = algorithm(start_node, [end_node], graph, stats)
+                        elapsed += time.perf_counter() - begin
+                        # Tracing slows the search down several times: the peak is measured on a second run
+                        tracemalloc.start()
+                        algorithm(start_node, [end_node], graph, {})
+                        peak = max(peak, tracemalloc.get_traced_memory()[1])
+                        tracemalloc.stop()
+                    if "peak_frontier" in stats:
+                        frontier = max(frontier or 0, stats["peak_frontier"])
+                    if name == "AStar":
+                        costs[index] = result and result[1]
+                    elif result is not None and costs[index]:
+                        ratios.append(result[1] / costs[index])
+                results[num_edges][name] = {
+                    "peak_kb": peak / 1024,
+                    "ms_per_query": elapsed / queries * 1000,
+                    "solved": sum(costs[i] is not None for i in costs) if name == "AStar" else len(ratios),
+                    "cost_ratio": sum(ratios) / len(ratios) if ratios else 1.0,
+                    "peak_frontier": frontier
+                }
+    finally:
+        utils.notify.DEBUG = debug
+    return results
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    max_nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    width = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    results = run(queries=queries, max_nodes=max_nodes, width=width)
+    notify("info", f"Pesquisa com memória limitada: {queries} consultas, SMA* com {max_nodes} nodos, feixe de {width}")
+    print(f"{'arestas':<10}{'algoritmo':<12}{'pico (KB)':>12}{'fronteira':>12}{'ms/consulta':>14}{'resolvidas':>12}{'custo/A*':>10}")
+    for num_edges, by_algorithm in results.items():
+        for name, result in by_algorithm.items():
+            print(f"{num_edges:<10}{name:<12}{result['peak_kb']:>12.0f}{'-' if result['peak_frontier'] is None else result['peak_frontier']:>12}{result['ms_per_query']:>14.2f}{result['solved']:>12}{result['cost_ratio']:>10.3f}")
+
+if __name__ == "__main__":
+    main()
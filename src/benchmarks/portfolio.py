@@ -0,0 +1,66 @@
+"""
+Portfolio benchmark: wall time of each algorithm when run in parallel by classes.portfolio.Portfolio, how often each one
+answers and gives the answer returned, and the latency of the "first" and "best" policies, on a synthetic scale-free graph.
+Usage: PYTHONPATH=src python -m benchmarks.portfolio [edges] [queries] [load]
+"""
+
+import sys
+import random
+
+import utils.notify
+from classes.portfolio import Portfolio, POLICIES
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+def run(num_edges: int=5_000, queries: int=10, peso: int=150, seed: int=0) -> dict[str, dict]:
+    """
+    Run the same random queries (one zone -> 3 zones) with each policy.
+    :return: Dict policy -> {"ms_per_query", "solved", "algorithms": name -> {"ms" (mean over the runs that finished),
+             "answered", "wins", "cancelled"}}.
+    """
+    graph = synthetic_graph(num_edges, seed, ttl_scale=1)
+    rng = random.Random(seed)
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    workload = [rng.sample(names, 4) for _ in range(queries)]
+    results = {}
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        with Portfolio(graph) as portfolio:
+            portfolio.solve(workload[0][0], workload[0][1:], peso) # Start the workers before measuring
+            for policy in POLICIES:
+                algorithms = {}
+                total = solved = 0
+                for (start_node, *end_nodes) in workload:
+                    stats = {}
+                    solved += portfolio.solve(start_node, end_nodes, peso, policy, stats) is not None
+                    total += stats["seconds"]
+                    for name, seconds in stats["times"].items():
+                        entry = algorithms.setdefault(name, {"ms": 0.0, "runs": 0, "answered": 0, "wins": 0, "cancelled": 0})
+                        if seconds is None:
+                            entry["cancelled"] += 1
+                            continue
+                        entry["ms"] += seconds * 1000
+                        entry["runs"] += 1
+                        entry["answered"] += stats["costs"][name] is not None
+                        entry["wins"] += stats["winner"] == name
+                for entry in algorithms.values():
+                    entry["ms"] = entry["ms"] / entry["runs"] if entry["runs"] else float("nan")
+                results[policy] = {"ms_per_query": total / queries * 1000, "solved": solved, "algorithms": algorithms}
+    finally:
+        utils.notify.DEBUG = debug
+    return results
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    peso = int(sys.argv[3]) if len(sys.argv) > 3 else 150
+    results = run(num_edges, queries, peso)
+    for policy, result in results.items():
+        notify("info", f"Portfólio \"{policy}\": {num_edges} arestas, {queries} consultas, carga {peso}: {result['ms_per_query']:.1f} ms/consulta, {result['solved']} resolvidas")
+        print(f"{'algoritmo':<14}{'ms':>10}{'respostas':>12}{'escolhido':>12}{'cancelado':>12}")
+        for name, entry in result["algorithms"].items():
+            print(f"{name:<14}{entry['ms']:>10.1f}{entry['answered']:>12}{entry['wins']:>12}{entry['cancelled']:>12}")
+
+if __name__ == "__main__":
+    main()
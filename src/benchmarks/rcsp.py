@@ -0,0 +1,72 @@
+"""
+RCSP benchmark: routes found, mean cost, labels and peak heap size of the label-setting engine (exact and with
+label bucketing) against AStar, which keeps one state per node, on synthetic scale-free graphs with binding TTLs and fuel ranges.
+Usage: PYTHONPATH=src python -m benchmarks.rcsp [edges] [queries] [load]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+from functools import partial
+
+import utils.notify
+from classes.algorithms import AStar, RCSP
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+def run(num_edges: int=20_000, queries: int=10, peso: int=550, ttl_scale: int=1, seed: int=0, buckets: tuple=(20, 100)) -> dict[str, dict]:
+    """
+    Run the same multi-target queries (camp -> 3 zones) with each engine.
+    :param ttl_scale: Factor applied to the zone TTLs (small values make the TTLs bind).
+    :return: Dict engine name -> {"solved", "cost" (mean over solved), "labels", "peak_open", "ms_per_query"}.
+    """
+    graph = synthetic_graph(num_edges, seed, ttl_scale=ttl_scale)
+    graph.heuristics = dict.fromkeys(graph.heuristics, 0) # AStar as Dijkstra, so both engines minimise the same cost
+    rng = random.Random(seed)
+    names = [zone.get_name() for zone in graph.get_nodes()]
+    workload = [rng.sample(names, 4) for _ in range(queries)]
+    engines = {"AStar": AStar, "RCSP": RCSP}
+    for bucket in buckets:
+        engines[f"RCSP bucket={bucket}"] = partial(RCSP, bucket=bucket)
+    results = {}
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        for name, algorithm in engines.items():
+            costs = []
+            labels = peak_open = elapsed = 0
+            for (start_node, *end_nodes) in workload:
+                stats = {}
+                begin = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = algorithm(start_node, end_nodes, graph, peso, stats=stats)
+                elapsed += time.perf_counter() - begin
+                labels += stats.get("labels", stats.get("pushes", 0))
+                peak_open = max(peak_open, stats.get("peak_open", 0))
+                if result is not None:
+                    costs.append(result[1])
+            results[name] = {
+                "solved": len(costs),
+                "cost": sum(costs) / len(costs) if costs else float("nan"),
+                "labels": labels / queries,
+                "peak_open": peak_open,
+                "ms_per_query": elapsed / queries * 1000
+            }
+    finally:
+        utils.notify.DEBUG = debug
+    return results
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    peso = int(sys.argv[3]) if len(sys.argv) > 3 else 550
+    results = run(num_edges, queries, peso)
+    notify("info", f"RCSP: {num_edges} arestas, {queries} consultas, carga {peso}")
+    print(f"{'motor':<20}{'resolvidas':>12}{'custo médio':>14}{'labels':>12}{'pico heap':>12}{'ms/consulta':>14}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['solved']:>12}{result['cost']:>14.2f}{result['labels']:>12.1f}{result['peak_open']:>12}{result['ms_per_query']:>14.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Incremental replanning benchmark: per-tick cost of keeping a route up to date on DynamicGraph while its conditions change,
+with the D* Lite planner (classes/replanning.py) repairing its search from the edges changed by simulate, against planning
+again from scratch (a new planner, same routes) and against AStar on a fresh snapshot (as main.resolve does).
+Every few ticks the vehicle moves to the next node of its route, and back to the camp when it reaches a zone.
+DynamicGraph only has the countries of a continent, so the same ticks are also run on a large synthetic scale-free graph whose
+edges change like the ones of DynamicGraph.update_conditions, with a smaller probability.
+Usage: PYTHONPATH=src python -m benchmarks.replanning [ticks] [load] [move_every] [edges] [probability]
+"""
+
+import sys
+import time
+import random
+import contextlib
+import io
+
+import utils.notify
+from classes.algorithms import AStar
+from classes.replanning import IncrementalPlanner
+from classes.graph import Graph
+from example_graph import DynamicGraph
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+def _update_conditions(graph: Graph, probability: float, rng: random.Random) -> list[int]:
+    # Same changes as DynamicGraph.update_conditions (travel time and road conditions of each edge with the given probability)
+    for zone in graph.get_nodes():
+        for (adjacente, _, (_, fuel_cost, _, vehicles)) in graph.edges_of(zone.get_name()):
+            if rng.random() < probability:
+                graph.update_edge(zone.get_name(), adjacente, rng.randint(30, 180), fuel_cost, rng.random() < 0.85, vehicles)
+    return graph.commit_version()
+
+def run(ticks: int=1_000, peso: int=100, move_every: int=5, num_edges: int=0, probability: float=0.01, seed: int=0) -> dict[str, dict]:
+    """
+    Simulate the ticks and replan after each one with the three methods.
+    :param num_edges: Size of the synthetic scale-free graph (see benchmarks.astar.synthetic_graph) to use instead of DynamicGraph (0 uses DynamicGraph and its own probability).
+    :param probability: Probability of each edge of the synthetic graph changing in a tick.
+    :return: Dict with "incremental", "scratch" and "astar" {"ms_per_tick", "expansions_per_tick" (planners only)},
+             the number of "edges" changed per tick and the routes of the incremental planner with a "different" cost from scratch.
+    """
+    random.seed(seed)
+    rng = random.Random(seed)
+    if num_edges:
+        graph = synthetic_graph(num_edges, seed)
+        camp = graph.get_camp_node()
+        end_nodes = rng.sample([zone.get_name() for zone in graph.get_nodes()], 3)
+        simulate = lambda: _update_conditions(graph, probability, rng)
+    else:
+        graph = DynamicGraph()
+        camp = graph.get_camp_node()
+        end_nodes = list(graph.get_affected_nodes())
+        simulate = graph.simulate
+    planner = IncrementalPlanner(graph, camp, end_nodes, peso)
+    totals = {name: {"seconds": 0.0, "expansions": 0} for name in ("incremental", "scratch", "astar")}
+    changed_edges = different = 0
+    debug = utils.notify.DEBUG
+    utils.notify.DEBUG = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()): # Warnings of the algorithms are not part of the measure
+            for tick in range(ticks):
+                changed = simulate()
+                changed_edges += len(changed)
+                begin = time.perf_counter()
+                totals["incremental"]["expansions"] += planner.update(changed)
+                if tick % move_every == move_every - 1:
+                    route = planner.route()
+                    if route is not None:
+                        totals["incremental"]["expansions"] += planner.move(route[0][1] if len(route[0]) > 1 else camp)
+                incremental = planner.route()
+                totals["incremental"]["seconds"] += time.perf_counter() - begin
+
+                begin = time.perf_counter()
+                scratch = IncrementalPlanner(graph, planner.start_node, end_nodes, peso)
+                expected = scratch.route()
+                totals["scratch"]["seconds"] += time.perf_counter() - begin
+                totals["scratch"]["expansions"] += scratch.expansions
+                if (incremental is None) != (expected is None) or (incremental is not None and abs(incremental[1] - expected[1]) > 1e-9):
+                    different += 1
+
+                begin = time.perf_counter()
+                with graph.snapshot() as snapshot:
+                    AStar(planner.start_node, list(end_nodes), snapshot.query(), peso)
+                totals["astar"]["seconds"] += time.perf_counter() - begin
+    finally:
+        utils.notify.DEBUG = debug
+    result = {name: {"ms_per_tick": total["seconds"] / ticks * 1000, "expansions_per_tick": total["expansions"] / ticks} for name, total in totals.items()}
+    result.update(zones=len(graph.get_nodes()), edges=changed_edges / ticks, different=different)
+    return result
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    peso = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    move_every = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    num_edges = int(sys.argv[4]) if len(sys.argv) > 4 else 20_000
+    probability = float(sys.argv[5]) if len(sys.argv) > 5 else 0.01
+    for (scenario, edges) in (("DynamicGraph", 0), (f"sintético ({num_edges} arestas)", num_edges)):
+        result = run(ticks, peso, move_every, edges, probability)
+        notify("info", f"Replaneamento em {scenario}: {result['zones']} zonas, {ticks} ticks, carga {peso} kg, {result['edges']:.1f} arestas alteradas por tick, veículo avança a cada {move_every} ticks")
+        print(f"{'método':<14}{'ms/tick':>10}{'expansões/tick':>16}")
+        for name in ("incremental", "scratch", "astar"):
+            expansions = "-" if name == "astar" else f"{result[name]['expansions_per_tick']:.1f}"
+            print(f"{name:<14}{result[name]['ms_per_tick']:>10.3f}{expansions:>16}")
+        print(f"Ganho sobre replanear do início: {result['scratch']['ms_per_tick'] / result['incremental']['ms_per_tick']:.1f}x, rotas com custo diferente: {result['different']}")
+
+if __name__ == "__main__":
+    main()
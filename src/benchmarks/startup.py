@@ -0,0 +1,97 @@
+"""
+Startup benchmark: wall time of `python src/main.py test` until the menu is closed, and a summary
+of `python -X importtime` for the same command. Fails if the startup budget is exceeded or if one
+of the heavy plotting/geo packages is imported before it is needed (they must only be loaded by
+Graph.draw_graph, Graph.draw_map and the geo-backed graph builders).
+Usage: PYTHONPATH=src python -m benchmarks.startup [runs]
+"""
+
+import os
+import sys
+import time
+import subprocess
+from statistics import median
+
+from utils.notify import notify
+
+MAIN_SCRIPT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main.py")
+STARTUP_ARGS: list[str] = ["test"]
+STARTUP_INPUT: str = "0\n" # Leave the graph menu right after it is shown
+STARTUP_BUDGET_MS: float = 300.0
+# Packages that must not be imported just to show the menu
+HEAVY_MODULES: tuple[str, ...] = ("networkx", "matplotlib", "geopandas", "shapely", "pandas", "numpy")
+
+def _run_main(*python_options: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, MPLBACKEND="Agg") # Headless, in case something draws
+    return subprocess.run([sys.executable, *python_options, MAIN_SCRIPT, *STARTUP_ARGS], input=STARTUP_INPUT,
+                          capture_output=True, text=True, env=env, check=True)
+
+def measure_startup(runs: int=5) -> float:
+    """
+    Measure the startup time of main.py (process start to menu exit).
+    :param runs: Number of runs (the median is returned).
+    :return: Startup time in milliseconds.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run_main()
+        times.append((time.perf_counter() - start) * 1000)
+    return median(times)
+
+def import_times() -> list[tuple[str, int, int, int]]:
+    """
+    Run main.py with `-X importtime` and parse its report.
+    :return: List of (module, self µs, cumulative µs, nesting level) in import order.
+    """
+    imports = []
+    for line in _run_main("-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return imports
+
+def run(runs: int=5, top: int=10) -> dict:
+    """
+    Run the startup benchmark.
+    :return: Dict with the startup time, the budget, the heavy modules imported and the slowest top-level imports.
+    """
+    imports = import_times()
+    heavy = sorted({name for (name, _, _, _) in imports if name.split(".")[0] in HEAVY_MODULES})
+    roots = sorted([(name, cumulative) for (name, _, cumulative, level) in imports if level == 0], key=lambda i: -i[1])
+    return {
+        "startup_ms": measure_startup(runs),
+        "budget_ms": STARTUP_BUDGET_MS,
+        "import_ms": sum(cumulative for (_, cumulative) in roots) / 1000,
+        "heavy_modules": heavy,
+        "top_imports": [(name, cumulative / 1000) for (name, cumulative) in roots[:top]]
+    }
+
+def check(result: dict) -> list[str]:
+    """
+    Get the failures of a startup benchmark result (empty if it is within budget).
+    """
+    failures = []
+    if result["startup_ms"] > result["budget_ms"]:
+        failures.append(f"startup took {result['startup_ms']:.1f} ms (budget {result['budget_ms']:.0f} ms)")
+    if result["heavy_modules"]:
+        failures.append(f"heavy modules imported at startup: {', '.join(result['heavy_modules'])}")
+    return failures
+
+def main():
+    result = run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    notify("info", f"Startup: {result['startup_ms']:.1f} ms (budget {result['budget_ms']:.0f} ms), imports: {result['import_ms']:.1f} ms")
+    print(f"{'módulo':<32}{'cumulativo (ms)':>16}")
+    for (name, cumulative_ms) in result["top_imports"]:
+        print(f"{name:<32}{cumulative_ms:>16.1f}")
+    failures = check(result)
+    for failure in failures:
+        notify("error", failure)
+    if failures:
+        sys.exit(1)
+    notify("success", "Startup within budget")
+
+if __name__ == "__main__":
+    main()
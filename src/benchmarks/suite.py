@@ -0,0 +1,299 @@
+"""
+Benchmark suite: latency percentiles, throughput, peak memory and solution cost of DFS, BFS, AStar, Greedy,
+UniformCost and HillClimb on FixedGraph, seeded RandomGraph and DynamicGraph and synthetic graphs of growing size
+(see benchmarks.astar.synthetic_graph), plus the startup time of main.py. The report is written to bench/report.json and
+compared with bench/baseline.json: a median latency, throughput, memory or startup worse than the threshold, a higher
+cost or fewer solved queries fail the run. Everything is seeded, offline and headless (make bench also pins
+PYTHONHASHSEED, which decides the order of the sets of zones the algorithms walk); the baseline is machine-specific.
+Usage: PYTHONPATH=src python -m benchmarks.suite [baseline] [queries] [max_zones] [threshold]
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import heapq
+import random
+import platform
+import tracemalloc
+
+import utils.notify
+from classes.graph import Graph
+from classes.algorithms import DFS, BFS, AStar, Greedy, UniformCost, HillClimb
+from classes.stats import SearchStats
+from example_graph import FixedGraph, RandomGraph, DynamicGraph
+from benchmarks.astar import synthetic_graph
+from benchmarks.startup import measure_startup
+from utils.notify import notify
+
+ALGORITHMS: dict = {"DFS": DFS, "BFS": BFS, "AStar": AStar, "Greedy": Greedy, "UniformCost": UniformCost, "HillClimb": HillClimb}
+SIZES: tuple[int, ...] = (100, 1_000, 10_000, 100_000, 1_000_000) # Zones of the synthetic graphs
+LOADS: tuple[int, ...] = (50, 300, 900) # Loads of the queries (each picks other vehicles)
+MEMORY_QUERIES: int = 3 # Queries of each workload run again under tracemalloc for the peak memory
+BENCH_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "bench")
+REPORT_PATH: str = os.path.join(BENCH_DIR, "report.json")
+BASELINE_PATH: str = os.path.join(BENCH_DIR, "baseline.json")
+THRESHOLD: float = 0.25
+# Changes below these are noise whatever their ratio (timer resolution, allocator slack)
+MIN_MS: float = 0.25
+MIN_KB: float = 16.0
+# Metrics that are better when lower (the best of several runs keeps the lowest) and when higher
+LOWER: tuple[str, ...] = ("p50_ms", "p90_ms", "p99_ms", "mean_ms", "peak_kb", "reference_ms")
+HIGHER: tuple[str, ...] = ("qps",)
+
+def workloads(queries: int, max_zones: int, seed: int=0, skipped: list=None):
+    """
+    Build the graphs of the suite and their queries.
+    The example graphs are queried from the camp to the affected zones with each load; RandomGraph and DynamicGraph
+    need the world cache (make world) and are skipped without it. Synthetic graphs get random queries to two zones,
+    fewer on the large ones (at least 3) so that every size takes about the same time.
+    :param skipped: List where the graphs that could not be built are added, as "<graph>: <reason>".
+    :return: Generator of (graph name, graph, list of (start node, end nodes, load)).
+    """
+    examples = {"FixedGraph": FixedGraph, "RandomGraph": RandomGraph, "DynamicGraph": DynamicGraph}
+    for name, graph_class in examples.items():
+        random.seed(seed)
+        try:
+            graph = graph_class()
+        except FileNotFoundError as error:
+            if skipped is not None:
+                skipped.append(f"{name}: {error}")
+            continue
+        start_node = graph.get_camp_node()
+        end_nodes = graph.get_affected_nodes()
+        yield name, graph, [(start_node, list(end_nodes), peso) for peso in LOADS]
+    for zones in SIZES:
+        if zones > max_zones:
+            break
+        graph = synthetic_graph(4 * zones, seed)
+        rng = random.Random(seed)
+        names = [zone.get_name() for zone in graph.get_nodes()]
+        count = max(3, min(queries, queries * 10_000 // zones))
+        samples = [rng.sample(names, 3) for _ in range(count)]
+        yield f"synthetic-{zones}", graph, [(sample[0], sample[1:], LOADS[i % len(LOADS)]) for (i, sample) in enumerate(samples)]
+
+def reference(runs: int=10) -> float:
+    """
+    Time a fixed search-like loop (heap and dict operations on tuples) that runs no code of the project, to tell how
+    fast the machine is while the suite runs (frequency scaling, other processes).
+    :return: Best time of the runs in milliseconds.
+    """
+    best = None
+    for _ in range(runs):
+        begin = time.perf_counter()
+        heap, seen = [(0, 0)], {}
+        while heap and len(seen) < 20_000:
+            cost, node = heapq.heappop(heap)
+            if node in seen:
+                continue
+            seen[node] = cost
+            for step in (1, 7, 13):
+                heapq.heappush(heap, (cost + step, (node * 31 + step) % 100_003))
+        elapsed = (time.perf_counter() - begin) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+def measure(graph: Graph, algorithms: dict, queries: list[tuple], repeats: int=5) -> dict[str, dict]:
+    """
+    Run the queries with each algorithm, each on a per-query view of a snapshot (as main.resolve does).
+    The latency of a query is the best of its repeats; the first MEMORY_QUERIES queries run once more under tracemalloc.
+    :param algorithms: Dict name -> search function.
+    :param repeats: Rounds of all the queries with all the algorithms (a slow spell of the machine then hits one run of
+                    many queries instead of every run of the same ones).
+    :return: Dict name -> {"p50_ms", "p90_ms", "p99_ms", "mean_ms", "qps" (queries per second one after the other),
+             "peak_kb" (largest peak of a query), "solved", "cost" (sum of the costs of the solved queries),
+             "expansions" (mean per query), "reference_ms" (see reference, measured in every round)}.
+    """
+    best = {name: [None] * len(queries) for name in algorithms}
+    results = {name: [None] * len(queries) for name in algorithms}
+    expansions = dict.fromkeys(algorithms, 0)
+    reference_ms = None
+    gc.collect()
+    gc.disable() # A collection inside a query would be charged to whichever query triggers it
+    try:
+        for _ in range(repeats):
+            reference_ms = min(reference_ms or float("inf"), reference(2))
+            for name, algorithm in algorithms.items():
+                for (index, (start_node, end_nodes, peso)) in enumerate(queries):
+                    stats = SearchStats()
+                    with graph.snapshot() as snapshot:
+                        view = snapshot.query()
+                        begin = time.perf_counter()
+                        results[name][index] = algorithm(start_node, list(end_nodes), view, peso, stats=stats)
+                        elapsed = time.perf_counter() - begin
+                    best[name][index] = elapsed if best[name][index] is None else min(best[name][index], elapsed)
+                    expansions[name] += stats.counter("expansions")
+    finally:
+        gc.enable()
+    measures = {}
+    for name, algorithm in algorithms.items():
+        peak = 0
+        for (start_node, end_nodes, peso) in queries[:MEMORY_QUERIES]:
+            # Tracing slows the search down several times: the peak is measured on a separate run
+            with graph.snapshot() as snapshot:
+                view = snapshot.query()
+                tracemalloc.start()
+                algorithm(start_node, list(end_nodes), view, peso)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+        latencies = [elapsed * 1000 for elapsed in best[name]]
+        solved = [result for result in results[name] if result is not None]
+        measures[name] = {
+            "p50_ms": _percentile(latencies, 50),
+            "p90_ms": _percentile(latencies, 90),
+            "p99_ms": _percentile(latencies, 99),
+            "mean_ms": sum(latencies) / len(latencies),
+            "qps": len(latencies) / (sum(latencies) / 1000) if sum(latencies) else 0.0,
+            "peak_kb": peak / 1024,
+            "solved": len(solved),
+            "cost": round(sum(result[1] for result in solved), 4),
+            "expansions": expansions[name] / (len(queries) * repeats),
+            "reference_ms": reference_ms
+        }
+    return measures
+
+def run(queries: int=20, max_zones: int=10_000, repeats: int=5, seed: int=0, startup: bool=True) -> dict:
+    """
+    Run the suite.
+    :param queries: Queries per synthetic graph (up to 10 000 zones, fewer above).
+    :param max_zones: Largest synthetic graph (one of SIZES).
+    :param repeats: Runs of each query (the best is kept).
+    :param startup: Also measure the startup time of main.py (see benchmarks.startup).
+    :return: Report dict with the settings, the machine, "startup_ms", the "skipped" graphs (see workloads) and
+             "results" keyed by "<graph>/<algorithm>", each with the queries, nodes and edges of the graph and the
+             metrics of measure.
+    """
+    report = {
+        "queries": queries,
+        "max_zones": max_zones,
+        "repeats": repeats,
+        "seed": seed,
+        "hash_seed": os.environ.get("PYTHONHASHSEED"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "startup_ms": measure_startup() if startup else None,
+        "skipped": [],
+        "results": {}
+    }
+    level, debug = utils.notify.LEVEL, utils.notify.DEBUG
+    utils.notify.set_level("error") # Messages of the algorithms are neither formatted nor printed, as with UM_LOG_LEVEL=error
+    try:
+        for graph_name, graph, workload in workloads(queries, max_zones, seed, report["skipped"]):
+            size = {"queries": len(workload), "nodes": len(graph.get_nodes()), "edges": len(graph.storage.costs)}
+            for name, measures in measure(graph, ALGORITHMS, workload, repeats).items():
+                report["results"][f"{graph_name}/{name}"] = {**size, **measures}
+    finally:
+        utils.notify.LEVEL, utils.notify.DEBUG = level, debug
+    return report
+
+def best_of(report: dict, other: dict) -> dict:
+    """
+    Merge two reports of the same suite, keeping the best value of each timing and memory metric (the other metrics
+    do not change between runs).
+    """
+    merged = dict(report, results={})
+    if report.get("startup_ms") and other.get("startup_ms"):
+        merged["startup_ms"] = min(report["startup_ms"], other["startup_ms"])
+    for key, result in report["results"].items():
+        result = dict(result)
+        if key in other["results"]:
+            for field in LOWER:
+                result[field] = min(result[field], other["results"][key][field])
+            for field in HIGHER:
+                result[field] = max(result[field], other["results"][key][field])
+        merged["results"][key] = result
+    return merged
+
+def compare(report: dict, baseline: dict, threshold: float=THRESHOLD) -> list[str]:
+    """
+    Get the regressions of a report against a baseline (empty if there are none).
+    Only entries of both are compared, and only if they ran the same workload (queries, nodes and edges). Latencies
+    are compared against the baseline scaled by how much slower the machine ran the reference loop next to them (see
+    reference). The tail percentiles are reported but not compared: with a few queries per workload they are too noisy.
+    :param threshold: Relative change allowed in the median latency, throughput, memory and startup.
+    """
+    failures = []
+    if report.get("startup_ms") and baseline.get("startup_ms"):
+        if _worse(report["startup_ms"], baseline["startup_ms"], threshold, MIN_MS):
+            failures.append(f"startup: {report['startup_ms']:.1f} ms (baseline {baseline['startup_ms']:.1f} ms)")
+    for key, result in report["results"].items():
+        base = baseline["results"].get(key)
+        if base is None or any(result[field] != base[field] for field in ("queries", "nodes", "edges")):
+            continue
+        speed = result["reference_ms"] / base["reference_ms"]
+        if _worse(result["p50_ms"], base["p50_ms"] * speed, threshold, MIN_MS):
+            failures.append(f"{key}: p50_ms {result['p50_ms']:.3f} (baseline {base['p50_ms']:.3f}, machine x{speed:.2f})")
+        if _worse(result["mean_ms"], base["mean_ms"] * speed, threshold, MIN_MS):
+            failures.append(f"{key}: qps {result['qps']:.1f} (baseline {base['qps']:.1f}, machine x{speed:.2f})")
+        if _worse(result["peak_kb"], base["peak_kb"], threshold, MIN_KB):
+            failures.append(f"{key}: peak_kb {result['peak_kb']:.0f} (baseline {base['peak_kb']:.0f})")
+        if result["solved"] < base["solved"]:
+            failures.append(f"{key}: solved {result['solved']} (baseline {base['solved']})")
+        elif result["solved"] == base["solved"] and result["cost"] > base["cost"] + 1e-6:
+            failures.append(f"{key}: cost {result['cost']} (baseline {base['cost']})")
+    return failures
+
+def _worse(value: float, base: float, threshold: float, floor: float) -> bool:
+    return value > base * (1 + threshold) and value - base > floor
+
+def save(report: dict, path: str):
+    """
+    Write a report as JSON.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+
+def load(path: str) -> dict:
+    """
+    Read a report written by save, or None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+def main():
+    args = sys.argv[1:]
+    baseline_run = bool(args) and args[0] == "baseline"
+    if baseline_run:
+        args = args[1:]
+    queries = int(args[0]) if len(args) > 0 else 20
+    max_zones = int(args[1]) if len(args) > 1 else 10_000
+    threshold = float(args[2]) if len(args) > 2 else THRESHOLD
+    report = run(queries, max_zones)
+    baseline = None if baseline_run else load(BASELINE_PATH)
+    failures = compare(report, baseline, threshold) if baseline else []
+    if baseline_run or failures:
+        # The baseline, and a run that seems to regress, keep the best of two runs: a slow spell of the machine does not repeat
+        report = best_of(report, run(queries, max_zones))
+        failures = compare(report, baseline, threshold) if baseline else []
+    notify("info", f"Suite de benchmarks: {queries} consultas, até {max_zones} zonas, startup {report['startup_ms']:.1f} ms")
+    for skipped in report["skipped"]:
+        notify("warning", f"Grafo ignorado: {skipped}")
+    print(f"{'grafo/algoritmo':<30}{'resolvidas':>11}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'consultas/s':>13}{'pico (KB)':>11}{'custo':>12}")
+    for key, result in report["results"].items():
+        print(f"{key:<30}{result['solved']:>5}/{result['queries']:<5}{result['p50_ms']:>10.3f}{result['p90_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['qps']:>13.1f}{result['peak_kb']:>11.0f}{result['cost']:>12.1f}")
+    save(report, REPORT_PATH)
+    if baseline_run:
+        save(report, BASELINE_PATH)
+        notify("success", f"Baseline guardada em {os.path.normpath(BASELINE_PATH)}")
+        return
+    if baseline is None:
+        notify("warning", "Sem baseline para comparar: execute make bench-baseline")
+        return
+    if baseline.get("hash_seed") != report["hash_seed"]:
+        notify("warning", f"PYTHONHASHSEED {report['hash_seed']} diferente do da baseline ({baseline.get('hash_seed')}): os resultados podem diferir")
+    for failure in failures:
+        notify("error", failure)
+    if failures:
+        sys.exit(1)
+    notify("success", f"Sem regressões acima de {threshold:.0%} face à baseline")
+
+if __name__ == "__main__":
+    main()
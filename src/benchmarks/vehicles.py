@@ -0,0 +1,69 @@
+"""
+Vehicle choice microbenchmark: cost per edge expansion of picking the vehicle of an edge with
+get_fastest_capable_vehicle (list of the permitted vehicles, sort, filter and min) and with the
+per-load table indexed by the vehicle mask of the edge slot (Graph.vehicle_table), on every edge of a synthetic scale-free graph.
+Usage: PYTHONPATH=src python -m benchmarks.vehicles [edges] [repeats]
+"""
+
+import sys
+import time
+
+from classes.graph import Graph
+from classes.vehicle import get_fastest_capable_vehicle
+from benchmarks.astar import synthetic_graph
+from utils.notify import notify
+
+LOADS: tuple[int, ...] = (50, 150, 550, 900)
+
+def _edges(graph: Graph) -> list[tuple]:
+    return [(slot, vehicles) for zone in graph.get_nodes() for (_, slot, (_, _, _, vehicles)) in graph.edges_of(zone.get_name())]
+
+def run(num_edges: int=100_000, repeats: int=3, backends: tuple=("dict", "compact"), seed: int=0) -> dict[str, dict]:
+    """
+    Time both vehicle choices over every edge for each load (best of `repeats` passes).
+    :return: Dict backend -> {"edges", "sort_ns", "table_ns" (per edge), "table_build_us" (per query), "mismatches"}.
+    """
+    results = {}
+    for backend in backends:
+        graph = synthetic_graph(num_edges, seed, backend)
+        edges = _edges(graph)
+        best_sort = best_table = build = 0.0
+        mismatches = 0
+        for peso in LOADS:
+            begin = time.perf_counter()
+            table = graph.vehicle_table(peso)
+            build += time.perf_counter() - begin
+            get_edge_mask = graph.get_edge_mask
+            sort_times = []
+            table_times = []
+            for _ in range(repeats):
+                begin = time.perf_counter()
+                chosen = [get_fastest_capable_vehicle([v.get_vehicle() for v in vehicles], peso) for (_, vehicles) in edges]
+                sort_times.append(time.perf_counter() - begin)
+                begin = time.perf_counter()
+                looked_up = [table[get_edge_mask(slot)] for (slot, _) in edges]
+                table_times.append(time.perf_counter() - begin)
+            mismatches += sum(str(a) != str(b) for a, b in zip(chosen, looked_up))
+            best_sort += min(sort_times)
+            best_table += min(table_times)
+        results[backend] = {
+            "edges": len(edges),
+            "sort_ns": best_sort / (len(edges) * len(LOADS)) * 1e9,
+            "table_ns": best_table / (len(edges) * len(LOADS)) * 1e9,
+            "table_build_us": build / len(LOADS) * 1e6,
+            "mismatches": mismatches
+        }
+    return results
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    results = run(num_edges, repeats)
+    notify("info", f"Escolha de veículo por aresta: {num_edges} arestas, cargas {list(LOADS)}")
+    print(f"{'backend':<10}{'arcos':>10}{'ordenação (ns)':>16}{'tabela (ns)':>14}{'ganho':>8}{'tabela/consulta (us)':>22}{'diferenças':>12}")
+    for backend, result in results.items():
+        speedup = result["sort_ns"] / result["table_ns"]
+        print(f"{backend:<10}{result['edges']:>10}{result['sort_ns']:>16.1f}{result['table_ns']:>14.1f}{speedup:>7.1f}x{result['table_build_us']:>22.1f}{result['mismatches']:>12}")
+
+if __name__ == "__main__":
+    main()
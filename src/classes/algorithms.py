@@ -1,12 +1,20 @@
 from classes.graph import Graph
 from utils.notify import notify
-from classes.vehicle import Vehicle, VehicleType, get_fastest_capable_vehicle, get_start_capable_vehicle
+from classes.vehicle import Vehicle, VehicleType, get_start_capable_vehicle
+from classes.skyline import Skyline
+from classes.events import SearchEvent, EVENTS, EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE, VEHICLE_SWITCH, SOLUTION, logged_events, run_search
+from classes.stats import COUNTERS, add_stats, measure
 import copy
+import math
+import time
 from collections import deque
 from queue import Queue
-from heapq import heappush, heappop
+from heapq import heappush, heappop, heapify, nsmallest
 
-def DFS(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, path: list = None, visited: set = None, vehicle: Vehicle = None):
+# Eventos registados pelos algoritmos exatos, que só avisavam das trocas de veículo na rota devolvida
+_ROUTE_EVENTS: frozenset[str] = frozenset((VEHICLE_SWITCH,))
+
+def DFS(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, path: list = None, visited: set = None, vehicle: Vehicle = None, stats: dict = None):
     """
     Busca em profundidade modificada (DFS) com TTL e troca de veículo baseado no peso.
     :param start_node: Nodo inicial.
@@ -15,84 +23,134 @@ def DFS(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, path
     :param path: Caminho atual, incluindo nós e trocas de veículos.
     :param visited: Conjunto de nodos já visitados.
     :param peso: Peso a ser transportado.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa; a fronteira
+                  é a pilha da recursão.
     :return: Tupla (caminho, custo_total) se encontrar, caso contrário, None.
     """
+    stats = {} if stats is None else stats
+    return run_search(DFSEvents(start_node, end_nodes, graph, peso, path, visited, vehicle, stats, logged_events()), stats)
+
+def DFSEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, path: list = None, visited: set = None, vehicle: Vehicle = None, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    DFS como gerador de eventos (ver classes/events.py), que pode ser filtrado ou interrompido a meio.
+    :param stats: Dicionário opcional (ver DFS).
+    :param events: Tipos de eventos a devolver (os restantes nem são criados); a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado do DFS se encontrar uma rota.
+    """
     # Initialize path and visited set on the first call if they are not passed
     if path is None:
         path = []
     if visited is None:
         visited = set()
+    counts = dict.fromkeys(COUNTERS + ("vehicle_switches",), 0)
+    counts["pushes"] = 1
+    try:
+        result = yield from _dfs(start_node, end_nodes, graph, peso, path, visited, vehicle, graph.vehicle_table(peso), counts, events)
+        counts["pops"] += 1
+    finally:
+        if stats is not None:
+            stats.update(counts)
+    if result is not None:
+        yield SearchEvent(SOLUTION, result[0][-1], value=result)
+
+def _dfs(start_node: str, end_nodes: list[str], graph: Graph, peso: int, path: list, visited: set, vehicle: Vehicle, vehicle_table: list, counts: dict, events: frozenset[str]):
+    # Recursão do DFSEvents: devolve os eventos do ramo e retorna o resultado (ou None); os contadores são somados em counts
     # If no more accessible final zones
     if not end_nodes:
         return None
     path.append(start_node)
     visited.add(start_node)
+    counts["peak_frontier"] = max(counts["peak_frontier"], len(path))
     # If the current node is a final zone
     if start_node in end_nodes:
         custo_total = graph.calcula_custo(path)
         return (path, custo_total, vehicle)
-    for (adjacente, edge_data) in graph.graph[start_node]:
-        travel_time, fuel_cost, _, vehicleTypes = edge_data
+    counts["expansions"] += 1
+    if EXPAND in events:
+        yield SearchEvent(EXPAND, start_node)
+    edges = graph.edges_of(start_node)
+    counts["relaxed"] += len(edges)
+    for (adjacente, slot, edge_data) in edges:
+        travel_time, fuel_cost, _, _ = edge_data
         # Check if the adjacent node hasn't been visited
         if adjacente not in visited:
-            notify("debug", f"Testando rota {path+[adjacente]}")
             # Find an appropriate vehicle that can carry the load on this edge, which has higher speed and can still carry the weight
-            vehicle_list = [v.get_vehicle() for v in vehicleTypes]
-            current_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
+            current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
             # Update vehicle fuel
             if current_vehicle is not None:
                 # Notify if vehicle has changed
                 if vehicle is not None and current_vehicle != vehicle:
-                    notify("warning", f"Troca de veículo de {vehicle.get_name()} para {current_vehicle.get_name()} em {adjacente}")
+                    counts["vehicle_switches"] += 1
+                    if VEHICLE_SWITCH in events:
+                        yield SearchEvent(VEHICLE_SWITCH, start_node, adjacente, (vehicle, current_vehicle))
                 if current_vehicle.get_range() < fuel_cost:
-                    notify("warning", f"Combustível seria insuficiente para chegar a {adjacente}, reabasteça {abs(current_vehicle.get_range()-fuel_cost)} de combustível")
+                    counts["pruned_fuel"] += 1
+                    if PRUNE_FUEL in events:
+                        yield SearchEvent(PRUNE_FUEL, start_node, adjacente, abs(current_vehicle.get_range()-fuel_cost))
                     continue
                 current_vehicle.set_range(current_vehicle.get_range() - fuel_cost)
-                notify("debug", f"Veículo {current_vehicle.get_name()} com {current_vehicle.get_range()} de combustível ao chegar a {adjacente}")
             # If no suitable vehicle, continue
             if current_vehicle is None:
-                notify("debug", f"Não há nenhum veículo capaz de realizar esta rota, {path+[adjacente]}, com esta carga: {peso}")
+                counts["pruned_vehicle"] += 1
+                if PRUNE_VEHICLE in events:
+                    yield SearchEvent(PRUNE_VEHICLE, start_node, adjacente, peso)
                 continue
             # For each step, update TTL of all final zones
             for end_node_name in end_nodes[:]:  # Iterate over the copy, not the original
                 end_zone = graph.get_node(end_node_name)
                 end_zone.set_ttl(end_zone.get_ttl() - travel_time)
                 if end_zone.get_ttl() <= 0:
-                    notify("warning", f"Zona {end_node_name} removida por TTL")
+                    counts["pruned_ttl"] += 1
+                    if PRUNE_TTL in events:
+                        yield SearchEvent(PRUNE_TTL, start_node, adjacente, end_node_name)
                     end_nodes.remove(end_node_name) # Remove from the copy, not from the graph
+            counts["pushes"] += 1
+            if PUSH in events:
+                yield SearchEvent(PUSH, start_node, adjacente)
             # Recursion with the updated vehicle and fresh path/visited
-            resultado = DFS(adjacente, end_nodes, graph, peso, path.copy(), visited.copy(), current_vehicle)
+            resultado = yield from _dfs(adjacente, end_nodes, graph, peso, path.copy(), visited.copy(), current_vehicle, vehicle_table, counts, events)
+            counts["pops"] += 1
             if resultado is not None:
                 return resultado
             # Backtracking não é utilizado no algoritmo DFS, mas será util para outros algoritmos
             #else:
                 # Se não encontrámos nenhuma end zone e os recursos acabaram então os últimos gastos ficam sem efeito e vamos verificar os restantes caminhos
                 #current_vehicle.set_range(current_vehicle.get_range() + fuel_cost) # Restaurar o valor do combustível nesta zona
-                #notify("info", f"BackTracking to {path[-1]}: Veículo {current_vehicle.get_name()} com {current_vehicle.get_range()} de combustível")
                 #for end_node_name in end_nodes[:]:
                     #end_zone = graph.get_node(end_node_name)
                     #end_zone.set_ttl(end_zone.get_ttl() + travel_time) # Restaurar o valor do TTL nesta zona
-                    #notify("info", f"BackTracking to {path[-1]}: Zona {end_node_name} com TTL {end_zone.get_ttl()}")
     # Remover o último nó do caminho se não houver solução
     path.pop()
     return None
 
-def BFS(start_node: str, end_nodes: list[str], graph: Graph, peso: int=0):
+def BFS(start_node: str, end_nodes: list[str], graph: Graph, peso: int=0, stats: dict = None):
     """
     Busca em largura modificada (BFS) com TTL e troca de veículo baseado no peso.
     :param start_node: Nodo inicial.
     :param end_nodes: Lista de nodos finais.
     :param graph: Grafo.
     :param peso: Peso a ser transportado.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa.
     :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
     """
+    stats = {} if stats is None else stats
+    return run_search(BFSEvents(start_node, end_nodes, graph, peso, stats, logged_events()), stats)
+
+def BFSEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int=0, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    BFS como gerador de eventos (ver classes/events.py).
+    :param stats: Dicionário opcional (ver BFS).
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado do BFS se encontrar uma rota.
+    """
     # Se não houver zonas finais acessíveis
     if not end_nodes:
-        return None
+        return
 
     # Se o nodo incial for uma zona final
     if start_node in end_nodes:
-        return ([start_node], 0, current_vehicle)
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
     
     # Para cada estado/path está associado o valor de combustível para o percorrer
     fuel_needed = 0 
@@ -105,233 +163,735 @@ def BFS(start_node: str, end_nodes: list[str], graph: Graph, peso: int=0):
     visited = set()  # Usado para evitar revisitar zonas
 
     
+    # Veículo escolhido para cada máscara de veículos permitidos numa aresta, com esta carga
+    vehicle_table = graph.vehicle_table(peso)
+
     # Adição da zona de partida à lista de visitadas
     visited.add(start_node)
-    while queue:
-        # Pega no primeiro elemento da fila
-        current_node, current_path, vehicle, current_end_nodes_ttl, current_path_fuel_needed = queue.popleft()
+    expansions = relaxed = pruned_fuel = pruned_ttl = pruned_vehicle = switches = 0
+    pushes = peak_frontier = 1
+    try:
+        while queue:
+            # Pega no primeiro elemento da fila
+            peak_frontier = max(peak_frontier, len(queue))
+            current_node, current_path, vehicle, current_end_nodes_ttl, current_path_fuel_needed = queue.popleft()
 
 
-        notify("debug", f"A analizar os vizinhos de {current_node}")
-        # Explorar nós adjacentes
-        for (adjacente, edge_data) in graph.graph[current_node]:
-            travel_time, fuel_cost, _, vehicles = edge_data
+            expansions += 1
+            if EXPAND in events:
+                yield SearchEvent(EXPAND, current_node)
+            # Explorar nós adjacentes
+            edges = graph.edges_of(current_node)
+            relaxed += len(edges)
+            for (adjacente, slot, edge_data) in edges:
+                travel_time, fuel_cost, _, _ = edge_data
 
-            # Verificar se o nodo adjacente não foi visitado
-            if adjacente not in visited:
-                notify("debug", f"Testando rota {current_path+[adjacente]}")
+                # Verificar se o nodo adjacente não foi visitado
+                if adjacente not in visited:
+                    # Encontrar um veículo que possa atravessar esta aresta com esta carga e que seja rápido mas também adequado à carga qeu irá transportar
+                    current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
 
-                # Encontrar um veículo que possa atravessar esta aresta com esta carga e que seja rápido mas também adequado à carga qeu irá transportar
-                vehicle_list = [v.get_vehicle() for v in vehicles]
-                current_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
+                    # Validar combustível
+                    if current_vehicle is not None:
+                        if vehicle is not None and current_vehicle != vehicle:
+                            switches += 1
+                            if VEHICLE_SWITCH in events:
+                                yield SearchEvent(VEHICLE_SWITCH, current_node, adjacente, (vehicle, current_vehicle))
+                        # Se o veículo tiver autonomia para percorrer este potencial path
+                        if current_vehicle.get_range() < current_path_fuel_needed + fuel_cost:
+                            pruned_fuel += 1
+                            if PRUNE_FUEL in events:
+                                yield SearchEvent(PRUNE_FUEL, current_node, adjacente, abs(current_vehicle.get_range() - (current_path_fuel_needed + fuel_cost)))
+                            continue
 
-                # Validar combustível
-                if current_vehicle is not None:
-                    if vehicle is not None and current_vehicle != vehicle:
-                        notify("warning", f"Troca de veículo de {vehicle.get_name()} para {current_vehicle.get_name()} em {adjacente}")
-                    # Se o veículo tiver autonomia para percorrer este potencial path
-                    if current_vehicle.get_range() < current_path_fuel_needed + fuel_cost:
-                        notify("warning", f"Combustível seria insuficiente por esta rota para chegar a {adjacente}, reabasteça {abs(current_vehicle.get_range() - (current_path_fuel_needed + fuel_cost))}")
+                    # Se não houver veículo adequado, continuar
+                    if current_vehicle is None:
+                        pruned_vehicle += 1
+                        if PRUNE_VEHICLE in events:
+                            yield SearchEvent(PRUNE_VEHICLE, current_node, adjacente, peso)
                         continue
-                    notify("debug", f"Veículo {current_vehicle.get_name()} ficaria com {current_vehicle.get_range() - (current_path_fuel_needed + fuel_cost)} de combustível ao chegar a {adjacente}")
+                    
+                    # Atualizar TTL das zonas finais
+                    new_end_nodes_ttl = []
+                    for end_zone, ttl in current_end_nodes_ttl:
+                        new_ttl = ttl - travel_time
+                        if new_ttl > 0:
+                            new_end_nodes_ttl.append((end_zone, new_ttl))
+                        else:
+                            pruned_ttl += 1
+                            if PRUNE_TTL in events:
+                                yield SearchEvent(PRUNE_TTL, current_node, adjacente, end_zone)
 
-                # Se não houver veículo adequado, continuar
-                if current_vehicle is None:
-                    notify("debug", f"Não há nenhum veículo capaz de realizar esta rota, {current_path+[adjacente]}, com esta carga: {peso}")
-                    continue
-                
-                # Atualizar TTL das zonas finais
-                new_end_nodes_ttl = []
-                for end_zone, ttl in current_end_nodes_ttl:
-                    new_ttl = ttl - travel_time
-                    if new_ttl > 0:
-                        new_end_nodes_ttl.append((end_zone, new_ttl))
-                        notify("debug", f"Zona {end_zone} ficaria com TTL {new_ttl}")
-                    else:
-                        notify("warning", f"Zona {end_zone} removida pois excederia TTL para esta rota")
-
-
-                 # Se o nodo adjacente for uma zona final
-                if any(adjacente == end_zone for end_zone, _ in new_end_nodes_ttl):
-                    custo_total = graph.calcula_custo(current_path + [adjacente])
-                    return (current_path+[adjacente], custo_total, current_vehicle)
-                
-                # Adicionar o nó adjacente aos visitados e à fila com caminho atualizado
-                visited.add(adjacente)
-                queue.append((adjacente, current_path + [adjacente], current_vehicle, new_end_nodes_ttl, current_path_fuel_needed+fuel_cost))
 
-    return None  # Se não encontrar nenhum caminho
+                     # Se o nodo adjacente for uma zona final
+                    if any(adjacente == end_zone for end_zone, _ in new_end_nodes_ttl):
+                        custo_total = graph.calcula_custo(current_path + [adjacente])
+                        yield SearchEvent(SOLUTION, adjacente, value=(current_path+[adjacente], custo_total, current_vehicle))
+                        return
+                    
+                    # Adicionar o nó adjacente aos visitados e à fila com caminho atualizado
+                    visited.add(adjacente)
+                    queue.append((adjacente, current_path + [adjacente], current_vehicle, new_end_nodes_ttl, current_path_fuel_needed+fuel_cost))
+                    pushes += 1
+                    if PUSH in events:
+                        yield SearchEvent(PUSH, current_node, adjacente)
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=pushes - len(queue), peak_frontier=peak_frontier,
+                         pruned_fuel=pruned_fuel, pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, vehicle_switches=switches)
 
 
-def AStar(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0):
+def AStar(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None):
     """
     Busca A* modificada com TTL e troca de veículo baseado no peso.
+    Cada nodo guarda apenas o pai, o custo g, o combustível gasto, o tempo decorrido e o veículo com que foi alcançado;
+    entradas obsoletas da heap são descartadas ao sair (lazy deletion) e o caminho é reconstruído uma única vez no fim.
     :param start_node: Nodo inicial.
     :param end_nodes: Lista de nodos finais.
     :param graph: Grafo.
     :param peso: Peso a ser transportado.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa, incluindo
+                  as expansões ("expansions") e inserções na heap ("pushes").
     :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
     """
+    stats = {} if stats is None else stats
+    result = run_search(AStarEvents(start_node, end_nodes, graph, peso, stats, logged_events()), stats)
+    if "expansions" in stats:
+        notify("debug", "A* expandiu %d nodos", stats["expansions"])
+    return result
+
+def AStarEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    A* como gerador de eventos (ver classes/events.py). As estatísticas são registadas mesmo que o gerador seja fechado antes do fim.
+    :param stats: Dicionário opcional (ver AStar).
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado do AStar se encontrar uma rota.
+    """
     # Se não houver zonas finais acessíveis
     if not end_nodes:
-        return None
+        return
 
     # Se o nodo incial for uma zona final
     if start_node in end_nodes:
-        return ([start_node], 0, None)
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
 
-    # Queue prioritária para A* (min-heap)
-    # Queue prioritária tuplos: (f_score, current_path_cost, current_node, path, current_vehicle, end_nodes_ttl, fuel_used)
-    open_set = []
-    heappush(open_set, (0, 0, start_node, [start_node], None, 
-                        [(end_node, graph.get_node(end_node).get_ttl()) for end_node in end_nodes], 0))
+    # TTL inicial das zonas finais: uma zona continua alcançável enquanto o tempo decorrido for inferior ao seu TTL
+    end_nodes_ttl = {end_node: graph.get_node(end_node).get_ttl() for end_node in end_nodes}
+    max_ttl = max(end_nodes_ttl.values())
 
-    # Guardar os melhores custos de rota para cada nodo
+    # Estado de cada nodo alcançado
     g_score = {start_node: 0}
-    visited = set()
+    parents = {start_node: None}
+    fuel_used = {start_node: 0}
+    elapsed = {start_node: 0}
+    vehicles_used = {start_node: None}
+    closed = set()
+    # Veículo escolhido para cada máscara de veículos permitidos numa aresta, com esta carga
+    vehicle_table = graph.vehicle_table(peso)
+    # Eventos pedidos (consultados uma vez, para o ciclo não pagar pelos que ninguém consome)
+    expand_events, push_events, fuel_events, ttl_events, vehicle_events, switch_events = (kind in events for kind in (EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE, VEHICLE_SWITCH))
 
-    while open_set:
-        _, current_cost, current_node, current_path, vehicle, current_end_nodes_ttl, current_path_fuel = heappop(open_set)
+    # Queue prioritária para A* (min-heap) de tuplos (f_score, g_score, nodo)
+    open_set = [(graph.get_heuristic(start_node, end_nodes), 0, start_node)]
+    expansions = relaxed = pruned_fuel = pruned_ttl = pruned_vehicle = switches = 0
+    pushes = peak_frontier = 1
 
-        # Se o nodo atual for um nodo objetivo
-        if any(current_node == end_zone for end_zone, _ in current_end_nodes_ttl):
-            custo_total = graph.calcula_custo(current_path)
-            return (current_path, custo_total, vehicle)
+    try:
+        while open_set:
+            if len(open_set) > peak_frontier:
+                peak_frontier = len(open_set)
+            _, current_cost, current_node = heappop(open_set)
 
-        notify("debug", f"A analisar os vizinhos de {current_node}")
+            # Entrada obsoleta (o nodo já foi expandido ou foi encontrado um caminho melhor)
+            if current_node in closed or current_cost > g_score[current_node]:
+                continue
 
-        for (adjacente, edge_data) in graph.graph[current_node]:
-            travel_time, fuel_cost, _, vehicles = edge_data
+            # Se o nodo atual for um nodo objetivo ainda dentro do TTL
+            if current_node in end_nodes_ttl and elapsed[current_node] < end_nodes_ttl[current_node]:
+                path = []
+                node = current_node
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                yield SearchEvent(SOLUTION, current_node, value=(path, current_cost, vehicles_used[current_node]))
+                return
 
-            if adjacente in visited:
-                continue
-            notify("debug", f"Testando rota {current_path+[adjacente]}")
+            closed.add(current_node)
+            expansions += 1
+            vehicle = vehicles_used[current_node]
+            current_fuel = fuel_used[current_node]
+            current_elapsed = elapsed[current_node]
+            if expand_events:
+                yield SearchEvent(EXPAND, current_node, value=current_cost)
 
-            # Calcular o potencial custo de rota para o nodo adjacente
-            tentative_g_score = current_cost + graph.calcula_custo(current_path + [adjacente])
+            edges = graph.edges_of(current_node)
+            relaxed += len(edges)
+            for (adjacente, slot, edge_data) in edges:
+                if adjacente in closed:
+                    continue
+                travel_time, fuel_cost, _, _ = edge_data
 
-            # Calcular a heurística do nodo adjacente e completar a função custo: custo rota + heuristica 
-            heuristic = graph.get_heuristic(adjacente)
-            f_score = tentative_g_score + heuristic
+                # Calcular o custo de rota para o nodo adjacente e ignorar se não melhorar o melhor conhecido
+                tentative_g_score = current_cost + graph.get_edge_cost(slot)
+                if tentative_g_score >= g_score.get(adjacente, float('inf')):
+                    continue
 
-            # Se o valor do custo da rota do nodo for melhor doq que o seu último valor, atualizar
-            if tentative_g_score < g_score.get(adjacente, float('inf')):
-                g_score[adjacente] = tentative_g_score
+                # Se todas as zonas finais excederiam o TTL por esta rota, nenhuma é alcançável a partir daqui
+                if current_elapsed + travel_time >= max_ttl:
+                    pruned_ttl += 1
+                    if ttl_events:
+                        yield SearchEvent(PRUNE_TTL, current_node, adjacente)
+                    continue
 
-            # Encontrar um veículo que possa atravessar esta aresta com esta carga e que seja rápido mas também adequado à carga que irá transportar
-            vehicle_list = [v.get_vehicle() for v in vehicles]
-            current_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
+                # Encontrar um veículo que possa atravessar esta aresta com esta carga e que seja rápido mas também adequado à carga que irá transportar
+                current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
 
-            # Validar combustível
-            if current_vehicle is not None:
+                # Se não houver veículo adequado, continuar
+                if current_vehicle is None:
+                    pruned_vehicle += 1
+                    if vehicle_events:
+                        yield SearchEvent(PRUNE_VEHICLE, current_node, adjacente, peso)
+                    continue
+
+                # Validar combustível
                 if vehicle is not None and current_vehicle != vehicle:
-                    notify("warning", f"Troca de veículo de {vehicle.get_name()} para {current_vehicle.get_name()} em {adjacente}")
+                    switches += 1
+                    if switch_events:
+                        yield SearchEvent(VEHICLE_SWITCH, current_node, adjacente, (vehicle, current_vehicle))
                 # Se o veículo tiver autonomia para percorrer este potencial path
-                if current_vehicle.get_range() < current_path_fuel + fuel_cost:
-                    notify("warning", f"Combustível seria insuficiente por esta rota para chegar a {adjacente}, reabasteça {abs(current_vehicle.get_range() - (current_path_fuel + fuel_cost))}")
+                if current_vehicle.get_range() < current_fuel + fuel_cost:
+                    pruned_fuel += 1
+                    if fuel_events:
+                        yield SearchEvent(PRUNE_FUEL, current_node, adjacente, abs(current_vehicle.get_range() - (current_fuel + fuel_cost)))
                     continue
-                notify("debug", f"Veículo {current_vehicle.get_name()} ficaria com {current_vehicle.get_range() - (current_path_fuel + fuel_cost)} de combustível ao chegar a {adjacente}")
 
-            # Se não houver veículo adequado, continuar
-            if current_vehicle is None:
-                notify("debug", f"Não há nenhum veículo capaz de realizar esta rota, {current_path+[adjacente]}, com esta carga: {peso}")
+                # Relaxar o nodo adjacente e inserir o novo estado na queue
+                g_score[adjacente] = tentative_g_score
+                parents[adjacente] = current_node
+                fuel_used[adjacente] = current_fuel + fuel_cost
+                elapsed[adjacente] = current_elapsed + travel_time
+                vehicles_used[adjacente] = current_vehicle
+                heappush(open_set, (tentative_g_score + graph.get_heuristic(adjacente, end_nodes), tentative_g_score, adjacente))
+                pushes += 1
+                if push_events:
+                    yield SearchEvent(PUSH, current_node, adjacente, tentative_g_score)
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=pushes - len(open_set), peak_frontier=peak_frontier,
+                         pruned_fuel=pruned_fuel, pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, vehicle_switches=switches)
+
+
+def BidirectionalAStar(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None):
+    """
+    Busca bidirecional: Dijkstra (ou A* com a heurística ALT, se o grafo tiver landmarks) em simultâneo a partir do
+    nodo inicial e, pelas arestas de entrada, a partir de cada zona final, até as duas pesquisas se encontrarem.
+    A viabilidade (veículo, combustível e TTL) é verificada no caminho unido; se falhar, essa zona final é resolvida pelo AStar.
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo (direcionado ou não).
+    :param peso: Peso a ser transportado.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores das duas direções e do AStar
+                  (os nodos expandidos, "expansions", incluem os deste), o número de zonas resolvidas pelo AStar por a rota mais barata
+                  não ser viável ("fallbacks"), os nodos que este expandiu ("fallback_expansions") e o seu tempo ("fallback_s").
+    :return: Tupla (caminho, custo_total, veículo) da zona final mais barata alcançável, caso contrário, None.
+    """
+    stats = {} if stats is None else stats
+    result = run_search(BidirectionalAStarEvents(start_node, end_nodes, graph, peso, stats, logged_events()), stats)
+    if "expansions" in stats:
+        notify("debug", "Busca bidirecional expandiu %d nodos e %d com AStar", stats["expansions"] - stats["fallback_expansions"], stats["fallback_expansions"])
+    return result
+
+def BidirectionalAStarEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    Busca bidirecional como gerador de eventos (ver classes/events.py), incluindo os das duas direções e os do AStar nas zonas
+    em que a rota mais barata não é viável.
+    :param stats: Dicionário opcional (ver BidirectionalAStar).
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado da BidirectionalAStar se encontrar uma rota.
+    """
+    # Se não houver zonas finais acessíveis
+    if not end_nodes:
+        return
+
+    # Se o nodo incial for uma zona final
+    if start_node in end_nodes:
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
+
+    landmarks = graph.landmarks
+    lower_bound = (lambda end_node: landmarks.distance_bound(start_node, end_node)) if landmarks is not None else (lambda end_node: 0)
+    best = None
+    totals = dict.fromkeys(COUNTERS + ("vehicle_switches",), 0) # Contadores somados das pesquisas e das verificações de cada zona final
+    fallbacks = fallback_expansions = 0
+    fallback_time = 0.0
+    try:
+        # Zonas finais por ordem do limite inferior do custo, até nenhuma poder melhorar a melhor rota encontrada
+        for end_node in sorted(end_nodes, key=lower_bound):
+            if best is not None and lower_bound(end_node) >= best[1]:
+                break
+            search = {}
+            route = yield from _bidirectional_route(start_node, end_node, graph, search, events)
+            add_stats(totals, search)
+            if route is None:
+                notify("debug", "%s não é alcançável a partir de %s", end_node, start_node)
                 continue
+            result = yield from _check_route(route[0], route[1], graph, peso, totals, events)
+            if result is None:
+                notify("debug", "A rota mais barata até %s não é viável, a procurar com A*", end_node)
+                search = {}
+                begin = time.perf_counter()
+                for event in AStarEvents(start_node, [end_node], graph, peso, search, events):
+                    if event.kind == SOLUTION:
+                        result = event.value
+                    else:
+                        yield event
+                fallback_time += time.perf_counter() - begin
+                fallbacks += 1
+                fallback_expansions += search.get("expansions", 0)
+                add_stats(totals, search)
+            if result is not None and (best is None or result[1] < best[1]):
+                best = result
+    finally:
+        if stats is not None:
+            stats.update(totals, fallbacks=fallbacks, fallback_expansions=fallback_expansions, fallback_s=fallback_time)
+    if best is not None:
+        yield SearchEvent(SOLUTION, best[0][-1], value=best)
 
-            # Atualizar TTL para end zones
-            new_end_nodes_ttl = []
-            for end_zone, ttl in current_end_nodes_ttl:
-                new_ttl = ttl - travel_time
-                if new_ttl > 0:
-                    new_end_nodes_ttl.append((end_zone, new_ttl))
-                    notify("debug", f"Zona {end_zone} ficaria com TTL {new_ttl}")
-                else:
-                    notify("warning", f"Zona {end_zone} removida pois excederia TTL para esta rota")
+def _bidirectional_route(start_node: str, end_node: str, graph: Graph, stats: dict, events: frozenset[str] = EVENTS):
+    """
+    Caminho mais barato entre dois nodos (sem restrições) por pesquisa bidirecional.
+    Com landmarks, as duas pesquisas usam os potenciais médios p(v) = (h(v, fim) - h(início, v)) / 2 e -p(v), que são consistentes,
+    pelo que param corretamente quando a soma dos topos das duas heaps atinge o melhor custo de união.
+    Gerador: devolve os eventos de expansão e inserção das duas direções e retorna o resultado (usar com yield from).
+    :return: Tupla (caminho, custo), ou None se o nodo final não for alcançável.
+    """
+    landmarks = graph.landmarks
+    potentials = {}
+    def potential(node: str) -> float:
+        value = potentials.get(node)
+        if value is None:
+            value = 0.0 if landmarks is None else (landmarks.distance_bound(node, end_node) - landmarks.distance_bound(start_node, node)) / 2
+            potentials[node] = value
+        return value
 
-            # Se o nodo adjacente é um nodo objetivo
-            if any(adjacente == end_zone for end_zone, _ in new_end_nodes_ttl):
-                custo_total = graph.calcula_custo(current_path + [adjacente])
-                return (current_path + [adjacente], custo_total, current_vehicle)
+    # Estado de cada direção (0: a partir do início pelas arestas de saída, 1: a partir do fim pelas arestas de entrada)
+    g_score = ({start_node: 0}, {end_node: 0})
+    parents = ({start_node: None}, {end_node: None})
+    closed = (set(), set())
+    open_sets = ([(potential(start_node), 0, start_node)], [(-potential(end_node), 0, end_node)])
+    best_cost = math.inf
+    meeting = None
+    expansions = relaxed = 0
+    pushes = peak_frontier = 2
+    expand_events, push_events = EXPAND in events, PUSH in events
 
-            # Inserir o novo estado na queue
-            heappush(open_set, (f_score, tentative_g_score, adjacente, current_path + [adjacente], 
-                                current_vehicle, new_end_nodes_ttl, current_path_fuel + fuel_cost))
+    while open_sets[0] and open_sets[1]:
+        # Critério de paragem: nenhum caminho ainda por unir pode ser mais barato do que o melhor já unido
+        # (os potenciais das duas direções anulam-se, pelo que a soma das chaves compara diretamente com o custo)
+        if open_sets[0][0][0] + open_sets[1][0][0] >= best_cost:
+            break
+        peak_frontier = max(peak_frontier, len(open_sets[0]) + len(open_sets[1]))
+        # Expandir a direção com a fronteira mais pequena
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        _, current_cost, current_node = heappop(open_sets[side])
+        if current_node in closed[side] or current_cost > g_score[side][current_node]:
+            continue
+        closed[side].add(current_node)
+        expansions += 1
+        if expand_events:
+            yield SearchEvent(EXPAND, current_node, value=current_cost)
+        if side == 0:
+            edges = [(adjacente, slot) for (adjacente, slot, _) in graph.edges_of(current_node)]
+        else:
+            edges = graph.incoming_edges(current_node)
+        relaxed += len(edges)
+        for (adjacente, slot) in edges:
+            if adjacente in closed[side]:
+                continue
+            tentative_g_score = current_cost + graph.get_edge_cost(slot)
+            if tentative_g_score >= g_score[side].get(adjacente, math.inf):
+                continue
+            key = potential(adjacente)
+            if math.isinf(key) or math.isnan(key):
+                continue # O nodo não está em nenhum caminho entre o início e o fim
+            g_score[side][adjacente] = tentative_g_score
+            parents[side][adjacente] = current_node
+            heappush(open_sets[side], (tentative_g_score + (key if side == 0 else -key), tentative_g_score, adjacente))
+            pushes += 1
+            if push_events:
+                yield SearchEvent(PUSH, current_node, adjacente, tentative_g_score)
+            # Unir as duas pesquisas
+            other_cost = g_score[1 - side].get(adjacente)
+            if other_cost is not None and tentative_g_score + other_cost < best_cost:
+                best_cost = tentative_g_score + other_cost
+                meeting = adjacente
 
-        visited.add(current_node)
+    stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=pushes - len(open_sets[0]) - len(open_sets[1]), peak_frontier=peak_frontier)
+    if meeting is None:
+        return None
+    # Reconstruir o caminho: do início até ao nodo de encontro e deste até ao fim
+    path = []
+    node = meeting
+    while node is not None:
+        path.append(node)
+        node = parents[0][node]
+    path.reverse()
+    node = parents[1][meeting]
+    while node is not None:
+        path.append(node)
+        node = parents[1][node]
+    return (path, best_cost)
 
-    return None  # No path found
+def _check_route(path: list[str], cost: float, graph: Graph, peso: int, counts: dict, events: frozenset[str] = EVENTS):
+    """
+    Verificar a viabilidade de um caminho com as mesmas regras do AStar: em cada aresta o veículo mais rápido capaz de levar a carga,
+    com autonomia para o combustível gasto desde o início, e a zona final alcançada dentro do seu TTL.
+    Gerador: devolve os eventos da aresta que falha e das trocas de veículo e retorna o resultado (usar com yield from).
+    :param counts: Contadores onde são somados os cortes e as trocas de veículo ("pruned_*", "vehicle_switches").
+    :return: Tupla (caminho, custo_total, veículo) se for viável, caso contrário, None.
+    """
+    vehicle_table = graph.vehicle_table(peso)
+    vehicle = None
+    fuel_used = 0
+    elapsed = 0
+    for (node, adjacente) in zip(path, path[1:]):
+        slot, (travel_time, fuel_cost, _, _) = next((slot, edge_data) for (destino, slot, edge_data) in graph.edges_of(node) if destino == adjacente)
+        current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+        if current_vehicle is None:
+            counts["pruned_vehicle"] += 1
+            if PRUNE_VEHICLE in events:
+                yield SearchEvent(PRUNE_VEHICLE, node, adjacente, peso)
+            return None
+        if current_vehicle.get_range() < fuel_used + fuel_cost:
+            counts["pruned_fuel"] += 1
+            if PRUNE_FUEL in events:
+                yield SearchEvent(PRUNE_FUEL, node, adjacente, abs(current_vehicle.get_range() - (fuel_used + fuel_cost)))
+            return None
+        if vehicle is not None and current_vehicle != vehicle:
+            counts["vehicle_switches"] += 1
+            if VEHICLE_SWITCH in events:
+                yield SearchEvent(VEHICLE_SWITCH, node, adjacente, (vehicle, current_vehicle))
+        vehicle = current_vehicle
+        fuel_used += fuel_cost
+        elapsed += travel_time
+    if elapsed >= graph.get_node(path[-1]).get_ttl():
+        counts["pruned_ttl"] += 1
+        if PRUNE_TTL in events:
+            yield SearchEvent(PRUNE_TTL, path[-2], path[-1], path[-1])
+        return None
+    return (path, cost, vehicle)
 
+def RCSP(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, bucket: int = None, max_labels: int = None):
+    """
+    Caminho mais barato com recursos limitados (resource-constrained shortest path) por label-setting.
+    Cada nodo guarda um conjunto de Pareto de labels (custo, combustível gasto, tempo decorrido, veículo): um label só é descartado
+    se outro no mesmo nodo for tão barato, gastar tanto ou menos combustível e demorar tanto ou menos (o veículo de cada aresta é escolhido
+    pela própria aresta, por isso não restringe o resto do caminho). Os labels saem da heap por ordem de custo (mais a heurística ALT, se
+    o grafo tiver landmarks), pelo que o primeiro a chegar a uma zona final dentro do TTL é a rota viável ótima.
+    Labels que já não conseguem chegar a nenhuma zona final dentro do TTL ou da autonomia máxima são cortados por limites calculados
+    no início (Dijkstra inverso do tempo e do combustível a partir das zonas finais).
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa, por labels,
+                  e os labels expandidos ("expansions"), criados ("labels"), dominados ("dominated"), cortados pelos limites ("pruned"),
+                  o máximo de labels na heap ("peak_open"), o maior conjunto de Pareto ("max_front") e o tempo dos limites ("bounds_s").
+    :param bucket: Largura dos intervalos em que o combustível e o tempo são agrupados na dominância (None: exato). Limita o número de
+                   labels por nodo; as rotas devolvidas continuam viáveis mas podem não ser ótimas.
+    :param max_labels: Máximo de labels criados (None: sem limite); se for atingido a busca termina sem resultado.
+    :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
+    """
+    stats = {} if stats is None else stats
+    result = run_search(RCSPEvents(start_node, end_nodes, graph, peso, stats, bucket, max_labels, logged_events(_ROUTE_EVENTS)), stats, _ROUTE_EVENTS)
+    if max_labels is not None and stats.get("labels", 0) > max_labels:
+        notify("warning", f"Limite de {max_labels} labels atingido, busca interrompida")
+    if "expansions" in stats:
+        notify("debug", "RCSP expandiu %d labels de %d criados", stats["expansions"], stats["labels"])
+    return result
+
+def RCSPEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, bucket: int = None, max_labels: int = None, events: frozenset[str] = EVENTS):
+    """
+    RCSP como gerador de eventos (ver classes/events.py): cada label expandido ou criado e cada corte, pelos limites de TTL e de
+    combustível ou por falta de veículo; as trocas de veículo são as da rota encontrada, antes da solução.
+    :param stats: Dicionário opcional (ver RCSP).
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado do RCSP se encontrar uma rota.
+    """
+    # Se não houver zonas finais acessíveis
+    if not end_nodes:
+        return
+
+    # Se o nodo incial for uma zona final
+    if start_node in end_nodes:
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
+
+    end_nodes_ttl = {end_node: graph.get_node(end_node).get_ttl() for end_node in end_nodes}
+    ranges = [v.get_range() for v in graph.get_vehicle_types().values() if v.get_capacity() >= peso]
+    if not ranges:
+        return
+    max_range = max(ranges)
+    begin = time.perf_counter()
+    time_slack, fuel_needed = _resource_bounds(graph, end_nodes_ttl)
+    bounds_time = time.perf_counter() - begin
+    heuristic = (lambda node: graph.get_heuristic(node, end_nodes)) if graph.landmarks is not None else (lambda node: 0)
+    resolution = (lambda value: -(-value // bucket)) if bucket else (lambda value: value)
+    vehicle_table = graph.vehicle_table(peso)
+    expand_events, push_events, fuel_events, ttl_events, vehicle_events = (kind in events for kind in (EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE))
+
+    # Labels em listas paralelas (nodo, label pai, veículo da última aresta); a heap guarda (f, custo, combustível, tempo, label)
+    label_nodes = [start_node]
+    label_parents = [-1]
+    label_vehicles = [None]
+    skylines: dict[str, Skyline] = {}
+    open_set = [(heuristic(start_node), 0, 0, 0, 0)]
+    expansions = dominated = pruned = peak_open = max_front = relaxed = pruned_fuel = pruned_ttl = pruned_vehicle = switches = 0
+    result = None
+
+    try:
+        while open_set:
+            peak_open = max(peak_open, len(open_set))
+            _, current_cost, current_fuel, current_elapsed, label = heappop(open_set)
+            current_node = label_nodes[label]
+            skyline = skylines.get(current_node)
+            if skyline is None:
+                skyline = skylines[current_node] = Skyline()
+            if not skyline.insert(resolution(current_fuel), resolution(current_elapsed)):
+                dominated += 1
+                continue
+            max_front = max(max_front, len(skyline))
+            expansions += 1
+
+            # Se o nodo atual for uma zona final ainda dentro do TTL
+            if current_node in end_nodes_ttl and current_elapsed < end_nodes_ttl[current_node]:
+                path = []
+                vehicles_used = []
+                while label >= 0:
+                    path.append(label_nodes[label])
+                    vehicles_used.append(label_vehicles[label])
+                    label = label_parents[label]
+                path.reverse()
+                vehicles_used.reverse()
+                for i in range(2, len(path)):
+                    if vehicles_used[i] != vehicles_used[i - 1]:
+                        switches += 1
+                        if VEHICLE_SWITCH in events:
+                            yield SearchEvent(VEHICLE_SWITCH, path[i - 1], path[i], (vehicles_used[i - 1], vehicles_used[i]))
+                result = (path, current_cost, vehicles_used[-1])
+                break
+            if expand_events:
+                yield SearchEvent(EXPAND, current_node, value=current_cost)
+
+            edges = graph.edges_of(current_node)
+            relaxed += len(edges)
+            for (adjacente, slot, edge_data) in edges:
+                travel_time, fuel_cost, _, _ = edge_data
+                new_elapsed = current_elapsed + travel_time
+                new_fuel = current_fuel + fuel_cost
+                # Cortar labels que já não chegam a nenhuma zona final dentro do TTL ou da autonomia máxima
+                if new_elapsed >= time_slack.get(adjacente, -math.inf):
+                    pruned += 1
+                    pruned_ttl += 1
+                    if ttl_events:
+                        yield SearchEvent(PRUNE_TTL, current_node, adjacente)
+                    continue
+                if new_fuel + fuel_needed.get(adjacente, math.inf) > max_range:
+                    pruned += 1
+                    pruned_fuel += 1
+                    if fuel_events:
+                        yield SearchEvent(PRUNE_FUEL, current_node, adjacente, new_fuel + fuel_needed.get(adjacente, math.inf) - max_range)
+                    continue
+                # Encontrar um veículo que possa atravessar esta aresta com esta carga e com autonomia para o combustível gasto
+                current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                if current_vehicle is None:
+                    pruned_vehicle += 1
+                    if vehicle_events:
+                        yield SearchEvent(PRUNE_VEHICLE, current_node, adjacente, peso)
+                    continue
+                if current_vehicle.get_range() < new_fuel:
+                    pruned_fuel += 1
+                    if fuel_events:
+                        yield SearchEvent(PRUNE_FUEL, current_node, adjacente, new_fuel - current_vehicle.get_range())
+                    continue
+                adjacent_skyline = skylines.get(adjacente)
+                if adjacent_skyline is not None and adjacent_skyline.dominates(resolution(new_fuel), resolution(new_elapsed)):
+                    dominated += 1
+                    continue
+                new_cost = current_cost + graph.get_edge_cost(slot)
+                label_nodes.append(adjacente)
+                label_parents.append(label)
+                label_vehicles.append(current_vehicle)
+                heappush(open_set, (new_cost + heuristic(adjacente), new_cost, new_fuel, new_elapsed, len(label_nodes) - 1))
+                if push_events:
+                    yield SearchEvent(PUSH, current_node, adjacente, new_cost)
+            if max_labels is not None and len(label_nodes) > max_labels:
+                break
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=len(label_nodes), pops=len(label_nodes) - len(open_set), peak_frontier=peak_open,
+                         pruned_fuel=pruned_fuel, pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, labels=len(label_nodes), dominated=dominated,
+                         pruned=pruned, peak_open=peak_open, max_front=max_front, bounds_s=bounds_time, vehicle_switches=switches)
+    if result is not None:
+        yield SearchEvent(SOLUTION, result[0][-1], value=result)
+
+def _resource_bounds(graph: Graph, end_nodes_ttl: dict[str, int]) -> tuple[dict[str, float], dict[str, float]]:
+    """
+    Limites de recursos para as zonas finais, por Dijkstra inverso (arestas de entrada) a partir de todas elas.
+    :return: Tupla (folga, combustível): folga[v] = max(TTL(t) - tempo mínimo de v a t) sobre as zonas finais t, e
+             combustível[v] = combustível mínimo de v até à zona final mais próxima. Nodos ausentes não alcançam nenhuma zona final.
+    """
+    if graph.is_directed():
+        incoming = lambda node: [(origem, graph.get_edge_data(origem, node)) for (origem, _) in graph.incoming_edges(node)]
+    else:
+        incoming = lambda node: [(origem, edge_data) for (origem, _, edge_data) in graph.edges_of(node)] # Same data in both directions
+    bounds = []
+    for (initial, field) in (({end_node: -ttl for end_node, ttl in end_nodes_ttl.items()}, 0), (dict.fromkeys(end_nodes_ttl, 0), 1)):
+        distances = dict(initial)
+        open_set = [(distance, node) for node, distance in initial.items()]
+        heapify(open_set)
+        while open_set:
+            distance, node = heappop(open_set)
+            if distance > distances[node]:
+                continue
+            for (origem, edge_data) in incoming(node):
+                candidate = distance + edge_data[field]
+                if candidate < distances.get(origem, math.inf):
+                    distances[origem] = candidate
+                    heappush(open_set, (candidate, origem))
+        bounds.append(distances)
+    return {node: -distance for node, distance in bounds[0].items()}, bounds[1]
+
+def Greedy(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None): 
+    stats = {} if stats is None else stats
+    return run_search(GreedyEvents(start_node, end_nodes, graph, peso, stats, logged_events()), stats)
+
+def GreedyEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    Greedy como gerador de eventos (ver classes/events.py).
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa.
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado do Greedy se encontrar uma rota.
+    """
+    # Se o nodo incial for uma zona final
+    if start_node in end_nodes:
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
 
-def Greedy(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0): 
     open_list = set([start_node])
     closed_list = set([])
     parents = {}
     parents[start_node] = start_node
     old_vehicle = copy.deepcopy(get_start_capable_vehicle(peso))
     if old_vehicle is None:
-        return None
-    while len(open_list) > 0:
-        n = None
-        # Encontra o nodo com a menor heurística
-        for v in open_list:
-            if n == None or graph.heuristics[v] < graph.heuristics[n]:
-                n = v
-        if n == None:
-            return None
-        # Se o nodo corrente é o destino
-        if n in end_nodes:
-            reconst_path = []
-            while parents[n] != n:
-                reconst_path.append(n)
-                n = parents[n]
-            reconst_path.append(start_node)
-            reconst_path.reverse()
-            return (reconst_path, graph.calcula_custo(reconst_path), new_vehicle)
-        # Para todos os vizinhos do nodo corrente
-        for (m, travel_time, fuel_cost, _, vehicleTypes) in graph.get_neighbours(n):
-            # Se o nodo corrente não está na open nem na closed list, adicioná-lo à open_list
-            if m not in open_list and m not in closed_list:
-                # Other logic
-                # Update the TTL of all final zones for each step
-                for end_node_name in end_nodes[:]:
-                    end_zone = graph.get_node(end_node_name)
-                    end_zone.set_ttl(end_zone.get_ttl() - travel_time)
-                    if end_zone.get_ttl() <= 0:
-                        notify("warning", f"Zona {end_node_name} removida por TTL")
-                        end_nodes.remove(end_node_name)
-                # Verificar se o veículo tem combustível suficiente para a próxima viagem
-                vehicle_list = [v.get_vehicle() for v in vehicleTypes]
-                new_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
-                if new_vehicle is None:
-                    continue
-                # Add the vehicle change notification
-                if new_vehicle is not None:
-                    if new_vehicle != old_vehicle:
-                        if old_vehicle is not None:
-                            notify("warning", f"Troca de veículo de {old_vehicle.get_name()} para {new_vehicle.get_name()} em {n}")
-                        old_vehicle = new_vehicle
-                if new_vehicle.get_range() < fuel_cost:
-                    # Notificar que o veículo precisa de reabastecimento
-                    notify("warning", f"Combustível insuficiente para ir de {n} para {m}, reabasteça!")
-                    continue
-                # Deduzir o combustível para a próxima viagem
-                new_vehicle.set_range(new_vehicle.get_range() - fuel_cost)
-                # Adicionar m à open_list
-                open_list.add(m)
-                parents[m] = n
-        # Remover n da open_list e adicionar à closed_list, pois todos os seus vizinhos foram inspecionados
-        open_list.remove(n)
-        closed_list.add(n)
-    return None
+        return
+    vehicle_table = graph.vehicle_table(peso)
+    expansions = relaxed = pops = pruned_fuel = pruned_ttl = pruned_vehicle = switches = 0
+    pushes = peak_frontier = 1
+    try:
+        while len(open_list) > 0:
+            n = None
+            # Encontra o nodo com a menor heurística
+            for v in open_list:
+                if n == None or graph.get_heuristic(v, end_nodes) < graph.get_heuristic(n, end_nodes):
+                    n = v
+            if n == None:
+                return
+            pops += 1
+            peak_frontier = max(peak_frontier, len(open_list))
+            # Se o nodo corrente é o destino
+            if n in end_nodes:
+                reconst_path = []
+                while parents[n] != n:
+                    reconst_path.append(n)
+                    n = parents[n]
+                reconst_path.append(start_node)
+                reconst_path.reverse()
+                yield SearchEvent(SOLUTION, reconst_path[-1], value=(reconst_path, graph.calcula_custo(reconst_path), new_vehicle))
+                return
+            expansions += 1
+            if EXPAND in events:
+                yield SearchEvent(EXPAND, n)
+            # Para todos os vizinhos do nodo corrente
+            edges = graph.edges_of(n)
+            relaxed += len(edges)
+            for (m, slot, (travel_time, fuel_cost, _, _)) in edges:
+                # Se o nodo corrente não está na open nem na closed list, adicioná-lo à open_list
+                if m not in open_list and m not in closed_list:
+                    # Other logic
+                    # Update the TTL of all final zones for each step
+                    for end_node_name in end_nodes[:]:
+                        end_zone = graph.get_node(end_node_name)
+                        end_zone.set_ttl(end_zone.get_ttl() - travel_time)
+                        if end_zone.get_ttl() <= 0:
+                            pruned_ttl += 1
+                            if PRUNE_TTL in events:
+                                yield SearchEvent(PRUNE_TTL, n, m, end_node_name)
+                            end_nodes.remove(end_node_name)
+                    # Verificar se o veículo tem combustível suficiente para a próxima viagem
+                    new_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                    if new_vehicle is None:
+                        pruned_vehicle += 1
+                        if PRUNE_VEHICLE in events:
+                            yield SearchEvent(PRUNE_VEHICLE, n, m, peso)
+                        continue
+                    # Add the vehicle change notification
+                    if new_vehicle is not None:
+                        if new_vehicle != old_vehicle:
+                            if old_vehicle is not None:
+                                switches += 1
+                                if VEHICLE_SWITCH in events:
+                                    yield SearchEvent(VEHICLE_SWITCH, n, m, (old_vehicle, new_vehicle))
+                            old_vehicle = new_vehicle
+                    if new_vehicle.get_range() < fuel_cost:
+                        # Notificar que o veículo precisa de reabastecimento
+                        pruned_fuel += 1
+                        if PRUNE_FUEL in events:
+                            yield SearchEvent(PRUNE_FUEL, n, m, fuel_cost - new_vehicle.get_range())
+                        continue
+                    # Deduzir o combustível para a próxima viagem
+                    new_vehicle.set_range(new_vehicle.get_range() - fuel_cost)
+                    # Adicionar m à open_list
+                    open_list.add(m)
+                    parents[m] = n
+                    pushes += 1
+                    if PUSH in events:
+                        yield SearchEvent(PUSH, n, m)
+            # Remover n da open_list e adicionar à closed_list, pois todos os seus vizinhos foram inspecionados
+            open_list.remove(n)
+            closed_list.add(n)
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=pops, peak_frontier=peak_frontier,
+                         pruned_fuel=pruned_fuel, pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, vehicle_switches=switches)
 
-def UniformCost(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0):  
+def UniformCost(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None):  
     """
     Uniform Cost Search for pathfinding using Queue and deque, prioritizing the least total cost (fuel cost).
     :param start_node: Nodo inicial.
     :param end_nodes: Lista de nodos finais.
     :param graph: Grafo.
     :param peso: Peso a ser transportado.
+    :param stats: Optional dict (a SearchStats, see classes/stats.py) where the counters of the search are recorded.
     :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
     """
+    stats = {} if stats is None else stats
+    return run_search(UniformCostEvents(start_node, end_nodes, graph, peso, stats, logged_events()), stats)
+
+def UniformCostEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    Uniform Cost Search as a generator of events (see classes/events.py).
+    :param stats: Optional dict (see UniformCost).
+    :param events: Kinds of events to yield; the solution is always yielded.
+    :return: Generator of SearchEvent, ending with the "solution" event holding the result of UniformCost if a path is found.
+    """
+    # If the start node is one of the end nodes
+    if start_node in end_nodes:
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
+
     # Queue for the exploration process
     open_list = Queue()
     open_list.put((0, start_node, None))  # (cumulative cost, node, vehicle)
@@ -344,76 +904,105 @@ def UniformCost(start_node: str, end_nodes: list[str], graph: Graph, peso: int =
     old_vehicle = copy.deepcopy(get_start_capable_vehicle(peso))  # Initialize the starting vehicle
 
     if old_vehicle is None:
-        return None # if no vehicle can carry the load at the start, we will assume the load is impossible for the entire path
+        return # if no vehicle can carry the load at the start, we will assume the load is impossible for the entire path
+    vehicle_table = graph.vehicle_table(peso)  # Vehicle chosen for each mask of permitted vehicles with this load
     
-    while not open_list.empty():
-        current_cost, current_node, vehicle = open_list.get()  # Get the node with lowest cumulative cost
+    expansions = relaxed = pops = pruned_fuel = pruned_ttl = pruned_vehicle = 0
+    pushes = peak_frontier = 1
+    try:
+        while not open_list.empty():
+            peak_frontier = max(peak_frontier, open_list.qsize())
+            current_cost, current_node, vehicle = open_list.get()  # Get the node with lowest cumulative cost
+            pops += 1
         
-        # If we reached one of the end nodes, reconstruct the path
-        if current_node in end_nodes:
-            path = []
-            node = current_node
-            while node is not None:
-                if new_vehicle is not None and new_vehicle.get_range() >= fuel_cost:
-                    # Check if the vehicle has enough fuel
-                    if new_vehicle.get_range() < fuel_cost:
-                        notify("warning", f"Combustível insuficiente para viajar de {current_node} para {adjacente}, reabasteça!")
-                        continue # Skip this path if fuel is insufficient
-                    if new_vehicle != old_vehicle:
-                        if old_vehicle is not None:
-                            notify("warning", f"Troca de veículo de {old_vehicle.get_name()} para {new_vehicle.get_name()} em {adjacente}")
+            # If we reached one of the end nodes, reconstruct the path
+            if current_node in end_nodes:
+                path = []
+                node = current_node
+                while node is not None:
                     path.append(node)
                     node = parents[node]
-            path.reverse()
-            total_cost = current_cost
-            return (path, total_cost, vehicle)
+                path.reverse()
+                total_cost = current_cost
+                yield SearchEvent(SOLUTION, current_node, value=(path, total_cost, vehicle))
+                return
+            expansions += 1
+            if EXPAND in events:
+                yield SearchEvent(EXPAND, current_node, value=current_cost)
         
-        # Process each adjacent node
-        for (adjacente, edge_data) in graph.graph[current_node]:
-            travel_time, fuel_cost, _, vehicleTypes = edge_data
-            new_cost = current_cost + fuel_cost  # Total cost to reach the adjacent node
+            # Process each adjacent node
+            edges = graph.edges_of(current_node)
+            relaxed += len(edges)
+            for (adjacente, slot, edge_data) in edges:
+                travel_time, fuel_cost, _, _ = edge_data
+                new_cost = current_cost + fuel_cost  # Total cost to reach the adjacent node
             
-            # Check if we found a cheaper way to reach the adjacent node
-            if adjacente not in min_cost or new_cost < min_cost[adjacente]:
-                min_cost[adjacente] = new_cost
-                parents[adjacente] = current_node
+                # Check if we found a cheaper way to reach the adjacent node
+                if adjacente not in min_cost or new_cost < min_cost[adjacente]:
+                    min_cost[adjacente] = new_cost
+                    parents[adjacente] = current_node
                 
-                # Find the most appropriate vehicle for this edge
-                vehicle_list = [v.get_vehicle() for v in vehicleTypes]
-                new_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
+                    # Find the most appropriate vehicle for this edge
+                    new_vehicle = vehicle_table[graph.get_edge_mask(slot)]
                 
-                if new_vehicle is None:
-                    continue  # If no vehicle can carry the load, skip
+                    if new_vehicle is None:
+                        pruned_vehicle += 1
+                        if PRUNE_VEHICLE in events:
+                            yield SearchEvent(PRUNE_VEHICLE, current_node, adjacente, peso)
+                        continue  # If no vehicle can carry the load, skip
                 
-                # Deduct the fuel for this journey
-                new_vehicle.set_range(new_vehicle.get_range() - fuel_cost)
+                    # Deduct the fuel for this journey
+                    new_vehicle.set_range(new_vehicle.get_range() - fuel_cost)
                 
-                # Notify if the vehicle changed
-                if new_vehicle != old_vehicle and new_vehicle is not None:
-                    old_vehicle = new_vehicle
+                    # Notify if the vehicle changed
+                    if new_vehicle != old_vehicle and new_vehicle is not None:
+                        old_vehicle = new_vehicle
 
-                # Add to the open list
-                open_list.put((new_cost, adjacente, new_vehicle))
-                vehicles[adjacente] = new_vehicle
+                    # Add to the open list
+                    open_list.put((new_cost, adjacente, new_vehicle))
+                    pushes += 1
+                    vehicles[adjacente] = new_vehicle
+                    if PUSH in events:
+                        yield SearchEvent(PUSH, current_node, adjacente, new_cost)
         
-        # Update TTL for the end zones at each step
-        for end_node_name in end_nodes[:]:
-            end_zone = graph.get_node(end_node_name)
-            end_zone.set_ttl(end_zone.get_ttl() - travel_time)
-            if end_zone.get_ttl() <= 0:
-                notify("warning", f"Zona {end_node_name} removida por TTL")
-                end_nodes.remove(end_node_name)
-    return None  # Return None if no path is found
+            # Update TTL for the end zones at each step
+            for end_node_name in end_nodes[:]:
+                end_zone = graph.get_node(end_node_name)
+                end_zone.set_ttl(end_zone.get_ttl() - travel_time)
+                if end_zone.get_ttl() <= 0:
+                    pruned_ttl += 1
+                    if PRUNE_TTL in events:
+                        yield SearchEvent(PRUNE_TTL, current_node, adjacente, end_node_name)
+                    end_nodes.remove(end_node_name)
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=pops, peak_frontier=peak_frontier,
+                         pruned_fuel=pruned_fuel, pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle)
 
-def HillClimb(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0):
+def HillClimb(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None):
     """
     Hill Climbing algorithm for pathfinding.
     :param start_node: Initial node.
     :param end_nodes: List of goal nodes.
     :param graph: Graph.
     :param peso: Weight to be transported.
+    :param stats: Optional dict (a SearchStats, see classes/stats.py) where the counters of the search are recorded; every move is a
+                  push and a pop of a frontier of one node, and only the neighbors better than the best so far are checked for pruning.
     :return: Tuple (path, total_cost, vehicle) if a solution is found, otherwise None.
     """
+    stats = {} if stats is None else stats
+    result = run_search(HillClimbEvents(start_node, end_nodes, graph, peso, stats, logged_events()), stats)
+    if result is None and get_start_capable_vehicle(peso) is not None:
+        notify("info", "Nenhum melhor vizinho encontrado. Terminando o algoritmo.")
+    return result
+
+def HillClimbEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    Hill Climbing as a generator of events (see classes/events.py); every move to the best neighbor is a push.
+    :param stats: Optional dict (see HillClimb).
+    :param events: Kinds of events to yield; the solution is always yielded.
+    :return: Generator of SearchEvent, ending with the "solution" event holding the result of HillClimb if a solution is found.
+    """
     # Initial setup
     current_node = start_node
     path = [current_node]
@@ -421,46 +1010,628 @@ def HillClimb(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0
     vehicle = copy.deepcopy(get_start_capable_vehicle(peso))
 
     if vehicle is None:
-        return None
+        return
+    vehicle_table = graph.vehicle_table(peso)
 
     visited.add(current_node)
 
-    while True:
-        # If the current node is one of the goal nodes
-        if current_node in end_nodes:
-            total_cost = graph.calcula_custo(path)
-            return (path, total_cost, vehicle)
-
-        # Find the best neighbor based on heuristic values
-        neighbors = graph.get_neighbours(current_node)
-        best_neighbor = None
-        best_heuristic = float("inf")
-
-        for (neighbor, travel_time, fuel_cost, _, vehicleTypes) in neighbors:
-            if neighbor not in visited:
-                heuristic = graph.get_heuristic(neighbor)
-                if heuristic < best_heuristic:
-                    # Check vehicle suitability
-                    vehicle_list = [v.get_vehicle() for v in vehicleTypes]
-                    new_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
-
-                    if new_vehicle and new_vehicle.get_range() >= fuel_cost:
-                        best_heuristic = heuristic
-                        best_neighbor = (neighbor, travel_time, fuel_cost, new_vehicle)
-
-        # If no valid neighbor is found, terminate
-        if best_neighbor is None:
-            notify("info", "Nenhum melhor vizinho encontrado. Terminando o algoritmo.")
-            return None
+    expansions = relaxed = moves = pruned_fuel = pruned_vehicle = switches = 0
+    try:
+        while True:
+            # If the current node is one of the goal nodes
+            if current_node in end_nodes:
+                total_cost = graph.calcula_custo(path)
+                yield SearchEvent(SOLUTION, current_node, value=(path, total_cost, vehicle))
+                return
+            expansions += 1
+            if EXPAND in events:
+                yield SearchEvent(EXPAND, current_node)
+
+            # Find the best neighbor based on heuristic values
+            neighbors = graph.edges_of(current_node)
+            relaxed += len(neighbors)
+            best_neighbor = None
+            best_heuristic = float("inf")
+
+            for (neighbor, slot, (travel_time, fuel_cost, _, _)) in neighbors:
+                if neighbor not in visited:
+                    heuristic = graph.get_heuristic(neighbor, end_nodes)
+                    if heuristic < best_heuristic:
+                        # Check vehicle suitability
+                        new_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+
+                        if new_vehicle and new_vehicle.get_range() >= fuel_cost:
+                            best_heuristic = heuristic
+                            best_neighbor = (neighbor, travel_time, fuel_cost, new_vehicle)
+                        elif new_vehicle:
+                            pruned_fuel += 1
+                            if PRUNE_FUEL in events:
+                                yield SearchEvent(PRUNE_FUEL, current_node, neighbor, fuel_cost - new_vehicle.get_range())
+                        else:
+                            pruned_vehicle += 1
+                            if PRUNE_VEHICLE in events:
+                                yield SearchEvent(PRUNE_VEHICLE, current_node, neighbor, peso)
+
+            # If no valid neighbor is found, terminate
+            if best_neighbor is None:
+                return
+
+            # Move to the best neighbor
+            next_node, travel_time, fuel_cost, new_vehicle = best_neighbor
+
+            if new_vehicle != vehicle:
+                switches += 1
+                if VEHICLE_SWITCH in events:
+                    yield SearchEvent(VEHICLE_SWITCH, current_node, next_node, (vehicle, new_vehicle))
+                vehicle = new_vehicle
+
+            vehicle.set_range(vehicle.get_range() - fuel_cost)
+            visited.add(next_node)
+            path.append(next_node)
+            moves += 1
+            if PUSH in events:
+                yield SearchEvent(PUSH, current_node, next_node)
+            current_node = next_node
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=moves + 1, pops=moves + 1, peak_frontier=1,
+                         pruned_fuel=pruned_fuel, pruned_ttl=0, pruned_vehicle=pruned_vehicle, vehicle_switches=switches)
+
+def _on_path(state: tuple, node: str) -> bool:
+    # Estados encadeados (nodo, ..., estado anterior): verificar se o nodo já está no caminho até este estado
+    while state is not None:
+        if state[0] == node:
+            return True
+        state = state[-1]
+    return False
+
+def BeamSearch(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, width: int = 10, stats: dict = None):
+    """
+    Busca em feixe (beam search) com memória limitada: avança por camadas e mantém em cada uma apenas os `width` estados com menor
+    heurística (a do Greedy e do Hill Climbing, com o custo como desempate). Cada estado guarda só o nodo, o custo, o combustível,
+    o tempo decorrido, o veículo e uma ligação ao estado anterior, pelo que a memória é O(width × profundidade) qualquer que seja
+    o tamanho do grafo. Aplica as mesmas regras de veículo, combustível e TTL do AStar; não é completa nem ótima.
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado.
+    :param width: Largura do feixe (número de estados mantidos por camada).
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa, por estados,
+                  e as camadas ("layers"); cada candidato gerado é uma inserção e a fronteira máxima ("peak_frontier") é o maior número de
+                  candidatos numa camada.
+    :return: Tupla (caminho, custo_total, veículo) da zona final mais barata da primeira camada que chega a uma, caso contrário, None.
+    """
+    stats = {} if stats is None else stats
+    result = run_search(BeamSearchEvents(start_node, end_nodes, graph, peso, width, stats, logged_events(_ROUTE_EVENTS)), stats, _ROUTE_EVENTS)
+    if "expansions" in stats:
+        notify("debug", "Beam search expandiu %d estados em %d camadas", stats["expansions"], stats["layers"])
+    return result
 
-        # Move to the best neighbor
-        next_node, travel_time, fuel_cost, new_vehicle = best_neighbor
+def BeamSearchEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, width: int = 10, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    Beam search como gerador de eventos (ver classes/events.py); cada candidato gerado numa camada é uma inserção, mesmo que fique
+    fora do feixe.
+    :param stats: Dicionário opcional (ver BeamSearch).
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado da BeamSearch se encontrar uma rota.
+    """
+    # Se não houver zonas finais acessíveis
+    if not end_nodes:
+        return
 
-        if new_vehicle != vehicle:
-            notify("warning", f"Troca de veículo de {vehicle.get_name()} para {new_vehicle.get_name()} em {next_node}")
-            vehicle = new_vehicle
+    # Se o nodo incial for uma zona final
+    if start_node in end_nodes:
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
+
+    end_nodes_ttl = {end_node: graph.get_node(end_node).get_ttl() for end_node in end_nodes}
+    max_ttl = max(end_nodes_ttl.values())
+    vehicle_table = graph.vehicle_table(peso)
+    expand_events, push_events, fuel_events, ttl_events, vehicle_events = (kind in events for kind in (EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE))
+    # Estados (nodo, custo, combustível, tempo, veículo, estado anterior)
+    beam = [(start_node, 0, 0, 0, None, None)]
+    expansions = layers = peak_frontier = relaxed = pruned_fuel = pruned_ttl = pruned_vehicle = 0
+    pushes = 1
+    result = None
+
+    try:
+        while beam and result is None:
+            layers += 1
+            candidates = {} # Melhor candidato de cada nodo nesta camada: nodo -> ((heurística, custo), estado)
+            goals = []
+            for state in beam:
+                current_node, current_cost, current_fuel, current_elapsed, _, _ = state
+                expansions += 1
+                if expand_events:
+                    yield SearchEvent(EXPAND, current_node, value=current_cost)
+                edges = graph.edges_of(current_node)
+                relaxed += len(edges)
+                for (adjacente, slot, (travel_time, fuel_cost, _, _)) in edges:
+                    if current_elapsed + travel_time >= max_ttl:
+                        pruned_ttl += 1
+                        if ttl_events:
+                            yield SearchEvent(PRUNE_TTL, current_node, adjacente)
+                        continue
+                    current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                    if current_vehicle is None:
+                        pruned_vehicle += 1
+                        if vehicle_events:
+                            yield SearchEvent(PRUNE_VEHICLE, current_node, adjacente, peso)
+                        continue
+                    if current_vehicle.get_range() < current_fuel + fuel_cost:
+                        pruned_fuel += 1
+                        if fuel_events:
+                            yield SearchEvent(PRUNE_FUEL, current_node, adjacente, current_fuel + fuel_cost - current_vehicle.get_range())
+                        continue
+                    if _on_path(state, adjacente):
+                        continue
+                    new_state = (adjacente, current_cost + graph.get_edge_cost(slot), current_fuel + fuel_cost, current_elapsed + travel_time, current_vehicle, state)
+                    pushes += 1
+                    if push_events:
+                        yield SearchEvent(PUSH, current_node, adjacente, new_state[1])
+                    if adjacente in end_nodes_ttl and new_state[3] < end_nodes_ttl[adjacente]:
+                        goals.append(new_state)
+                        continue
+                    key = (graph.get_heuristic(adjacente, end_nodes), new_state[1])
+                    if adjacente not in candidates or key < candidates[adjacente][0]:
+                        candidates[adjacente] = (key, new_state)
+            peak_frontier = max(peak_frontier, len(candidates))
+            if goals:
+                result = min(goals, key=lambda goal: goal[1])
+            beam = [new_state for (_, new_state) in nsmallest(width, candidates.values(), key=lambda candidate: candidate[0])]
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=expansions, peak_frontier=peak_frontier,
+                         pruned_fuel=pruned_fuel, pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, layers=layers)
+    if result is None:
+        return
+    path = []
+    vehicles_used = []
+    state = result
+    while state is not None:
+        path.append(state[0])
+        vehicles_used.append(state[4])
+        state = state[-1]
+    path.reverse()
+    vehicles_used.reverse()
+    switches = 0
+    for i in range(2, len(path)):
+        if vehicles_used[i] != vehicles_used[i - 1]:
+            switches += 1
+            if VEHICLE_SWITCH in events:
+                yield SearchEvent(VEHICLE_SWITCH, path[i - 1], path[i], (vehicles_used[i - 1], vehicles_used[i]))
+    if stats is not None:
+        stats["vehicle_switches"] = switches
+    yield SearchEvent(SOLUTION, path[-1], value=(path, result[1], result[4]))
 
-        vehicle.set_range(vehicle.get_range() - fuel_cost)
-        visited.add(next_node)
-        path.append(next_node)
-        current_node = next_node
\ No newline at end of file
+# Nodos guardados pelo SMAStar se não for dado limite, e memória de cada um medida com tracemalloc (registo, entradas nas duas heaps e no índice por nodo)
+SMA_MAX_NODES: int = 100_000
+SMA_NODE_BYTES: int = 1024
+
+class _SMANode:
+    __slots__ = ("node", "slot", "parent", "g", "fuel", "elapsed", "vehicle", "depth", "f", "children", "forgotten", "version")
+
+    def __init__(self, node: str, slot: int, parent: "_SMANode", g: float, fuel: int, elapsed: int, vehicle: Vehicle, depth: int, f: float):
+        self.node = node
+        self.slot = slot # Aresta que liga ao pai
+        self.parent = parent
+        self.g = g
+        self.fuel = fuel
+        self.elapsed = elapsed
+        self.vehicle = vehicle
+        self.depth = depth
+        self.f = f
+        self.children = [] # Arestas dos sucessores em memória
+        self.forgotten = math.inf # Menor f dos sucessores esquecidos desde a última expansão
+        self.version = 0 # Entradas das heaps com outra versão estão obsoletas
+
+def SMAStar(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, max_nodes: int = None, max_bytes: int = None, stats: dict = None):
+    """
+    SMA* (simplified memory-bounded A*): A* sobre a árvore de caminhos (cada nodo guardado é um caminho, com o seu combustível, tempo e veículo)
+    que nunca guarda mais de `max_nodes` nodos. Quando a memória se esgota esquece a folha com maior f (a menos profunda em caso de empate)
+    e o pai volta à fronteira com o menor f dos sucessores esquecidos, para os regenerar quando voltar a ser o melhor.
+    Um sucessor não é gerado se outro caminho em memória chegar ao mesmo nodo com custo, combustível, tempo e profundidade não superiores.
+    Com uma heurística admissível (landmarks) e memória suficiente para o caminho devolve a rota viável de menor custo.
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado.
+    :param max_nodes: Máximo de nodos guardados (SMA_MAX_NODES por omissão).
+    :param max_bytes: Alternativa a max_nodes: memória máxima, convertida em nodos com SMA_NODE_BYTES.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores da pesquisa (um pai que
+                  volta à fronteira é inserido de novo), os nodos esquecidos ("forgotten") e o máximo de nodos guardados ("peak_nodes").
+    :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
+    """
+    stats = {} if stats is None else stats
+    result = run_search(SMAStarEvents(start_node, end_nodes, graph, peso, max_nodes, max_bytes, stats, logged_events(_ROUTE_EVENTS)), stats, _ROUTE_EVENTS)
+    if "expansions" in stats:
+        notify("debug", "SMA* expandiu %d nodos e esqueceu %d (máximo de %d guardados)", stats["expansions"], stats["forgotten"], stats["peak_nodes"])
+    return result
+
+def SMAStarEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, max_nodes: int = None, max_bytes: int = None, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    SMA* como gerador de eventos (ver classes/events.py); um sucessor esquecido e depois regenerado volta a ser inserido.
+    :param stats: Dicionário opcional (ver SMAStar).
+    :param events: Tipos de eventos a devolver; a solução é sempre devolvida.
+    :return: Gerador de SearchEvent, terminado pelo evento "solution" com o resultado do SMAStar se encontrar uma rota.
+    """
+    # Se não houver zonas finais acessíveis
+    if not end_nodes:
+        return
+
+    # Se o nodo incial for uma zona final
+    if start_node in end_nodes:
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None))
+        return
+
+    if max_nodes is None:
+        max_nodes = max_bytes // SMA_NODE_BYTES if max_bytes is not None else SMA_MAX_NODES
+    max_nodes = max(2, max_nodes)
+    end_nodes_ttl = {end_node: graph.get_node(end_node).get_ttl() for end_node in end_nodes}
+    max_ttl = max(end_nodes_ttl.values())
+    vehicle_table = graph.vehicle_table(peso)
+    is_goal = lambda record: record.node in end_nodes_ttl and record.elapsed < end_nodes_ttl[record.node]
+    expand_events, push_events, fuel_events, ttl_events, vehicle_events = (kind in events for kind in (EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE))
+
+    # Fronteira em duas heaps com remoção preguiçosa: a melhor por (f, mais profunda) e a pior por (f, menos profunda)
+    best_heap = []
+    worst_heap = []
+    frontier = set()
+    stored: dict[str, list[_SMANode]] = {} # Nodos guardados por nodo do grafo (para a dominância)
+    sequence = pops = 0
+
+    def push(record: _SMANode):
+        nonlocal sequence
+        sequence += 1
+        record.version += 1
+        frontier.add(record)
+        heappush(best_heap, (record.f, -record.depth, sequence, record.version, record))
+        heappush(worst_heap, (-record.f, record.depth, sequence, record.version, record))
+        if len(best_heap) > 2 * len(frontier) + 64: # Descartar as entradas obsoletas para a memória não crescer
+            best_heap[:] = [entry for entry in best_heap if entry[4] in frontier and entry[3] == entry[4].version]
+            worst_heap[:] = [entry for entry in worst_heap if entry[4] in frontier and entry[3] == entry[4].version]
+            heapify(best_heap)
+            heapify(worst_heap)
+
+    def pop_best() -> _SMANode:
+        nonlocal pops
+        while best_heap:
+            entry = heappop(best_heap)
+            record = entry[4]
+            if record in frontier and entry[3] == record.version:
+                frontier.remove(record)
+                pops += 1
+                return record
+        return None
+
+    def pop_worst_leaf() -> _SMANode:
+        # Só as folhas podem ser esquecidas: um pai na fronteira volta a esta heap quando perder todos os sucessores
+        while worst_heap:
+            entry = heappop(worst_heap)
+            record = entry[4]
+            if record in frontier and entry[3] == record.version and not record.children:
+                frontier.remove(record)
+                return record
+        return None
+
+    root = _SMANode(start_node, None, None, 0, 0, 0, None, 0, graph.get_heuristic(start_node, end_nodes))
+    stored[start_node] = [root]
+    push(root)
+    count = 1
+    expansions = forgotten = relaxed = pruned_fuel = pruned_ttl = pruned_vehicle = 0
+    peak_nodes = peak_frontier = 1
+    result = None
+
+    def forget(record: _SMANode) -> bool:
+        # Retirar uma folha da memória e guardar o seu f no pai; devolve False se a raiz ficar sem caminhos possíveis
+        nonlocal count, forgotten
+        while True:
+            count -= 1
+            forgotten += 1
+            frontier.discard(record)
+            same_node = stored[record.node]
+            same_node.remove(record)
+            if not same_node:
+                del stored[record.node]
+            parent = record.parent
+            if parent is None:
+                return False
+            parent.children.remove(record.slot)
+            parent.forgotten = min(parent.forgotten, record.f)
+            if not math.isinf(parent.forgotten):
+                parent.f = parent.forgotten
+                push(parent)
+                return True
+            if parent.children:
+                return True
+            # Nenhum sucessor do pai leva a uma zona final
+            parent.f = math.inf
+            record = parent
+
+    try:
+        while True:
+            record = pop_best()
+            if record is None or math.isinf(record.f):
+                break
+            if is_goal(record):
+                result = record
+                break
+            expansions += 1
+            if expand_events:
+                yield SearchEvent(EXPAND, record.node, value=record.g)
+            # Gerar os sucessores que não estão em memória (todos na primeira expansão, os esquecidos nas seguintes)
+            edges = graph.edges_of(record.node)
+            relaxed += len(edges)
+            for (adjacente, slot, (travel_time, fuel_cost, _, _)) in edges:
+                if slot in record.children:
+                    continue
+                if record.elapsed + travel_time >= max_ttl:
+                    pruned_ttl += 1
+                    if ttl_events:
+                        yield SearchEvent(PRUNE_TTL, record.node, adjacente)
+                    continue
+                current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                if current_vehicle is None:
+                    pruned_vehicle += 1
+                    if vehicle_events:
+                        yield SearchEvent(PRUNE_VEHICLE, record.node, adjacente, peso)
+                    continue
+                if current_vehicle.get_range() < record.fuel + fuel_cost:
+                    pruned_fuel += 1
+                    if fuel_events:
+                        yield SearchEvent(PRUNE_FUEL, record.node, adjacente, record.fuel + fuel_cost - current_vehicle.get_range())
+                    continue
+                g = record.g + graph.get_edge_cost(slot)
+                fuel = record.fuel + fuel_cost
+                elapsed = record.elapsed + travel_time
+                depth = record.depth + 1
+                if any(other.g <= g and other.fuel <= fuel and other.elapsed <= elapsed and other.depth <= depth for other in stored.get(adjacente, ())):
+                    continue
+                ancestor = record
+                while ancestor is not None and ancestor.node != adjacente:
+                    ancestor = ancestor.parent
+                if ancestor is not None:
+                    continue # Ciclo
+                # Os sucessores esquecidos tinham f >= record.f, que passa a ser um limite inferior para os regenerados
+                child = _SMANode(adjacente, slot, record, g, fuel, elapsed, current_vehicle, depth, max(record.f, g + graph.get_heuristic(adjacente, end_nodes)))
+                if depth >= max_nodes - 1 and not is_goal(child):
+                    continue # O caminho não cabe na memória
+                stored.setdefault(adjacente, []).append(child)
+                push(child)
+                record.children.append(slot)
+                count += 1
+                if push_events:
+                    yield SearchEvent(PUSH, record.node, adjacente, g)
+            record.forgotten = math.inf
+            if not record.children:
+                # Sem sucessores: o caminho não leva a nenhuma zona final
+                record.f = math.inf
+                if not forget(record):
+                    break
+            while count > max_nodes:
+                leaf = pop_worst_leaf()
+                if leaf is None or not forget(leaf):
+                    break
+            peak_nodes = max(peak_nodes, count)
+            peak_frontier = max(peak_frontier, len(frontier))
+    finally:
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=sequence, pops=pops, peak_frontier=peak_frontier, pruned_fuel=pruned_fuel,
+                         pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, forgotten=forgotten, peak_nodes=peak_nodes)
+
+    if result is None:
+        return
+    path = []
+    vehicles_used = []
+    record = result
+    while record is not None:
+        path.append(record.node)
+        vehicles_used.append(record.vehicle)
+        record = record.parent
+    path.reverse()
+    vehicles_used.reverse()
+    switches = 0
+    for i in range(2, len(path)):
+        if vehicles_used[i] != vehicles_used[i - 1]:
+            switches += 1
+            if VEHICLE_SWITCH in events:
+                yield SearchEvent(VEHICLE_SWITCH, path[i - 1], path[i], (vehicles_used[i - 1], vehicles_used[i]))
+    if stats is not None:
+        stats["vehicle_switches"] = switches
+    yield SearchEvent(SOLUTION, path[-1], value=(path, result.g, result.vehicle))
+
+def ARAStarSolutions(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, epsilon: float = 2.5, step: float = 0.5, deadline_ms: float = None, stats: dict = None):
+    """
+    A* anytime (ARA*): uma primeira pesquisa com a heurística inflacionada por `epsilon` encontra depressa uma rota até epsilon vezes
+    pior que a ótima; depois epsilon desce `step` de cada vez até 1 e cada pesquisa reaproveita os custos da anterior, reabrindo apenas
+    os nodos cujo custo melhorou depois de expandidos. Usa as mesmas regras do AStar (veículo, combustível e TTL por nodo).
+    O limite de cada rota (custo / menor g + h por expandir) só é garantido com uma heurística admissível (landmarks).
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado.
+    :param epsilon: Peso inicial da heurística (>= 1).
+    :param step: Quanto epsilon desce entre pesquisas (> 0).
+    :param deadline_ms: Tempo máximo em milissegundos a partir da chamada; a pesquisa para quando termina, mesmo a meio de uma iteração.
+    :param stats: Dicionário opcional (um SearchStats, ver classes/stats.py) onde são registados os contadores das pesquisas (cada uma
+                  volta a inserir os nodos abertos), as pesquisas feitas ("iterations"), as rotas devolvidas ("solutions"), o último limite
+                  ("bound"), se o prazo terminou a pesquisa ("timed_out") e o tempo até à primeira rota ("first_solution_s"); o tempo total
+                  ("search_s") inclui o de quem consome as rotas.
+    :return: Gerador de tuplos (caminho, custo_total, veículo, limite), no fim de cada pesquisa que melhore a rota ou o seu limite.
+    """
+    stats = {} if stats is None else stats
+    with measure(stats):
+        for event in ARAStarEvents(start_node, end_nodes, graph, peso, epsilon, step, deadline_ms, stats, frozenset()):
+            yield event.value
+    notify("debug", "ARA* expandiu %d nodos em %d pesquisas (%d rotas, limite %.3f)", stats["expansions"], stats["iterations"], stats["solutions"], stats["bound"])
+
+def ARAStarEvents(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, epsilon: float = 2.5, step: float = 0.5, deadline_ms: float = None, stats: dict = None, events: frozenset[str] = EVENTS):
+    """
+    ARA* como gerador de eventos (ver classes/events.py): há um evento "solution" por cada rota de ARAStarSolutions, com o tuplo
+    (caminho, custo_total, veículo, limite), e um nodo reaberto numa pesquisa seguinte volta a ser expandido.
+    :param stats: Dicionário opcional (ver ARAStarSolutions).
+    :param events: Tipos de eventos a devolver; as soluções são sempre devolvidas.
+    :return: Gerador de SearchEvent.
+    """
+    if epsilon < 1:
+        raise ValueError(f"ARA* epsilon must be at least 1 (got {epsilon}).")
+    if step <= 0:
+        raise ValueError(f"ARA* step must be positive (got {step}).")
+    begin = time.perf_counter()
+    deadline = begin + deadline_ms / 1000 if deadline_ms is not None else math.inf
+    expansions = iterations = solutions = relaxed = pushes = pops = peak_frontier = pruned_fuel = pruned_ttl = pruned_vehicle = 0
+    bound = math.inf
+    timed_out = False
+    first_solution = None
+
+    def finish():
+        if stats is not None:
+            stats.update(expansions=expansions, relaxed=relaxed, pushes=pushes, pops=pops, peak_frontier=peak_frontier, pruned_fuel=pruned_fuel,
+                         pruned_ttl=pruned_ttl, pruned_vehicle=pruned_vehicle, iterations=iterations, solutions=solutions, bound=bound,
+                         timed_out=timed_out)
+            if first_solution is not None:
+                stats["first_solution_s"] = first_solution
+
+    # Se não houver zonas finais acessíveis
+    if not end_nodes:
+        finish()
+        return
+
+    # Se o nodo incial for uma zona final
+    if start_node in end_nodes:
+        bound = 1.0
+        solutions = 1
+        finish()
+        yield SearchEvent(SOLUTION, start_node, value=([start_node], 0, None, bound))
+        return
+
+    end_nodes_ttl = {end_node: graph.get_node(end_node).get_ttl() for end_node in end_nodes}
+    max_ttl = max(end_nodes_ttl.values())
+    vehicle_table = graph.vehicle_table(peso)
+    h = {}
+    def heuristic(node: str) -> float:
+        if node not in h:
+            h[node] = graph.get_heuristic(node, end_nodes)
+        return h[node]
+
+    # Estado de cada nodo alcançado (como no AStar)
+    g_score = {start_node: 0}
+    parents = {start_node: None}
+    fuel_used = {start_node: 0}
+    elapsed = {start_node: 0}
+    open_nodes = {start_node}
+    incons = set() # Nodos já expandidos nesta pesquisa cujo custo melhorou depois
+    best = None
+    best_cost = math.inf
+    epsilon = max(1.0, epsilon)
+    last = None
+    expand_events, push_events, fuel_events, ttl_events, vehicle_events = (kind in events for kind in (EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE))
+
+    try:
+        while True:
+            iterations += 1
+            closed = set()
+            open_set = [(g_score[node] + epsilon * heuristic(node), g_score[node], node) for node in open_nodes]
+            heapify(open_set)
+            pushes += len(open_set)
+            # Expandir enquanto algum nodo aberto puder levar a uma rota melhor que a atual com este epsilon
+            while open_set and open_set[0][0] < best_cost:
+                if len(open_set) > peak_frontier:
+                    peak_frontier = len(open_set)
+                _, current_cost, current_node = heappop(open_set)
+                pops += 1
+                if current_node not in open_nodes or current_cost > g_score[current_node]:
+                    continue
+                if time.perf_counter() >= deadline:
+                    heappush(open_set, (current_cost + epsilon * heuristic(current_node), current_cost, current_node))
+                    pushes += 1
+                    timed_out = True
+                    break
+                open_nodes.discard(current_node)
+                closed.add(current_node)
+                expansions += 1
+                if expand_events:
+                    yield SearchEvent(EXPAND, current_node, value=current_cost)
+                current_fuel = fuel_used[current_node]
+                current_elapsed = elapsed[current_node]
+                edges = graph.edges_of(current_node)
+                relaxed += len(edges)
+                for (adjacente, slot, (travel_time, fuel_cost, _, _)) in edges:
+                    tentative_g_score = current_cost + graph.get_edge_cost(slot)
+                    if tentative_g_score >= g_score.get(adjacente, math.inf):
+                        continue
+                    if current_elapsed + travel_time >= max_ttl:
+                        pruned_ttl += 1
+                        if ttl_events:
+                            yield SearchEvent(PRUNE_TTL, current_node, adjacente)
+                        continue
+                    current_vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                    if current_vehicle is None:
+                        pruned_vehicle += 1
+                        if vehicle_events:
+                            yield SearchEvent(PRUNE_VEHICLE, current_node, adjacente, peso)
+                        continue
+                    if current_vehicle.get_range() < current_fuel + fuel_cost:
+                        pruned_fuel += 1
+                        if fuel_events:
+                            yield SearchEvent(PRUNE_FUEL, current_node, adjacente, current_fuel + fuel_cost - current_vehicle.get_range())
+                        continue
+                    g_score[adjacente] = tentative_g_score
+                    parents[adjacente] = current_node
+                    fuel_used[adjacente] = current_fuel + fuel_cost
+                    elapsed[adjacente] = current_elapsed + travel_time
+                    if adjacente in end_nodes_ttl and elapsed[adjacente] < end_nodes_ttl[adjacente] and tentative_g_score < best_cost:
+                        # O caminho é guardado já, porque os pais dos nodos ainda podem mudar
+                        path = []
+                        node = adjacente
+                        while node is not None:
+                            path.append(node)
+                            node = parents[node]
+                        path.reverse()
+                        best, best_cost = (path, tentative_g_score, current_vehicle), tentative_g_score
+                    if adjacente in closed:
+                        incons.add(adjacente)
+                    else:
+                        open_nodes.add(adjacente)
+                        heappush(open_set, (tentative_g_score + epsilon * heuristic(adjacente), tentative_g_score, adjacente))
+                        pushes += 1
+                        if push_events:
+                            yield SearchEvent(PUSH, current_node, adjacente, tentative_g_score)
+
+            # Limite de subotimalidade: nenhuma rota custa menos que o menor g + h dos nodos por expandir
+            lower = min((g_score[node] + heuristic(node) for node in open_nodes | incons), default=math.inf)
+            # Devolver a rota sempre que melhora ou que o seu limite desce
+            current_bound = max(1.0, min(epsilon, best_cost / lower if lower > 0 else epsilon))
+            if best is not None and (best is not last or current_bound < bound):
+                bound = current_bound
+                last = best
+                solutions += 1
+                if first_solution is None:
+                    first_solution = time.perf_counter() - begin
+                yield SearchEvent(SOLUTION, best[0][-1], value=best + (bound,))
+            if timed_out or epsilon <= 1.0 or not (open_nodes or incons):
+                break
+            # Próxima pesquisa: epsilon mais apertado e os nodos inconsistentes voltam à fronteira
+            epsilon = max(1.0, epsilon - step)
+            open_nodes |= incons
+            incons = set()
+    finally:
+        finish()
+
+def ARAStar(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, epsilon: float = 2.5, step: float = 0.5, deadline_ms: float = None, stats: dict = None):
+    """
+    A* anytime (ARA*) com prazo: devolve a melhor rota encontrada por ARAStarSolutions até `deadline_ms` (ou até epsilon chegar a 1).
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado.
+    :param epsilon: Peso inicial da heurística (>= 1).
+    :param step: Quanto epsilon desce entre pesquisas (> 0).
+    :param deadline_ms: Tempo máximo em milissegundos (None: até à rota ótima).
+    :param stats: Dicionário opcional (ver ARAStarSolutions).
+    :return: Tupla (caminho, custo_total, veículo, limite) se encontrar, caso contrário, None; o custo é no máximo `limite` vezes o ótimo.
+    """
+    best = None
+    for solution in ARAStarSolutions(start_node, end_nodes, graph, peso, epsilon, step, deadline_ms, stats):
+        best = solution
+    return best
@@ -0,0 +1,372 @@
+import os
+import math
+import time
+import random
+import multiprocessing
+from heapq import heappush, heappop
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
+import classes.portfolio as portfolio
+from classes.graph import Graph
+from classes.portfolio import Portfolio
+from utils.notify import notify
+
+# Route variants generated and evaluated together in each iteration of a chain
+BATCH_SIZE: int = 16
+# Nodes a randomized depth-first walk may expand to build a route, and a perturbed Dijkstra to find a new segment of one
+CONSTRUCT_BUDGET: int = 20_000
+VARIANT_BUDGET: int = 500
+
+""" Worker process state (set once per worker by _init_worker) """
+_worker_best = None
+
+def _init_worker(path: str, best):
+    global _worker_best
+    portfolio._init_worker(path)
+    _worker_best = best
+
+class _Chain:
+    def __init__(self, graph: Graph, start_node: str, end_nodes: list[str], peso: int, seed: int):
+        """
+        One simulated annealing chain over the routes of a graph with CSR storage (the graph loaded by the workers).
+        Routes are lists of zone ids with the edge slots between them.
+        """
+        import numpy as np # Loaded on demand (see benchmarks/startup.py)
+        storage = graph.storage
+        storage.compact()
+        self.graph = graph
+        self.names = storage.names
+        self.offsets = storage.offsets
+        self.targets = storage.targets
+        self.arc_edges = storage.arc_edges
+        self.storage = storage # Its columns are read one slot at a time by the walks, the NumPy views below batch the evaluation
+        self.costs = np.frombuffer(storage.costs, dtype=np.float64)
+        self.fuel = np.frombuffer(storage.fuel_cost, dtype=np.int32)
+        self.travel = np.frombuffer(storage.travel_time, dtype=np.int32)
+        self.masks = np.frombuffer(storage.vehicle_mask, dtype=np.uint16)
+        self.vehicle_table = graph.vehicle_table(peso)
+        # Range of the vehicle of each mask (-1 if none can carry the load): an edge is usable while the fuel used up to it fits
+        self.ranges = np.array([-1 if vehicle is None else vehicle.get_range() for vehicle in self.vehicle_table], dtype=np.int64)
+        self.range_of = self.ranges.tolist()
+        self.start = storage.get_id(start_node)
+        self.end_nodes = list(end_nodes)
+        self.ttl = {storage.get_id(end_node): graph.get_node(end_node).get_ttl() for end_node in end_nodes}
+        self.max_ttl = max(self.ttl.values())
+        self.h = {}
+        self.rng = random.Random(seed)
+        self.evaluations = 0
+
+    def _heuristic(self, node: int) -> float:
+        if node not in self.h:
+            self.h[node] = self.graph.get_heuristic(self.names[node], self.end_nodes)
+        return self.h[node]
+
+    def _walk(self, source: int, avoid: set, fuel: int, elapsed: int, budget: int) -> tuple[list[int], list[int]]:
+        """
+        Randomized depth-first walk from source to one of the zones reached within its TTL, trying the successors by
+        heuristic with noise and with the vehicle, fuel and TTL rules of AStar.
+        :return: Tuple (nodes, slots) of the walk, or None if the budget runs out first.
+        """
+        ranges = self.range_of
+        masks = self.storage.vehicle_mask
+        fuel_cost = self.storage.fuel_cost
+        travel_time = self.storage.travel_time
+        visited = set(avoid)
+        visited.add(source)
+        nodes = [source]
+        slots = []
+        stack = [(self._successors(source), fuel, elapsed)]
+        while stack:
+            successors, fuel, elapsed = stack[-1]
+            arc = next(successors, None)
+            if arc is None:
+                stack.pop()
+                nodes.pop()
+                if slots:
+                    slots.pop()
+                continue
+            adjacente, slot = arc
+            new_fuel = fuel + fuel_cost[slot]
+            new_elapsed = elapsed + travel_time[slot]
+            if adjacente in visited or ranges[masks[slot]] < new_fuel or new_elapsed >= self.max_ttl:
+                continue
+            visited.add(adjacente)
+            nodes.append(adjacente)
+            slots.append(slot)
+            if new_elapsed < self.ttl.get(adjacente, -1):
+                return nodes, slots
+            budget -= 1
+            if budget <= 0:
+                return None
+            stack.append((self._successors(adjacente), new_fuel, new_elapsed))
+        return None
+
+    def _successors(self, node: int):
+        arcs = [(self.targets[arc], self.arc_edges[arc]) for arc in range(self.offsets[node], self.offsets[node + 1])]
+        noise = [self._heuristic(adjacente) * (0.5 + self.rng.random()) for (adjacente, _) in arcs]
+        return iter([arcs[i] for i in sorted(range(len(arcs)), key=noise.__getitem__)])
+
+    def _reroute(self, source: int, avoid: set, fuel: int, elapsed: int, rejoin: dict, budget: int) -> tuple[list[int], list[int]]:
+        """
+        Dijkstra from source with randomly perturbed edge costs, up to the first node of rejoin or zone it settles, with the
+        vehicle, fuel and TTL rules of AStar for the segment (the rest of the route is checked by its evaluation).
+        :return: Tuple (nodes, slots) of the segment, or None if the budget runs out first.
+        """
+        rng = self.rng
+        ranges = self.range_of
+        masks = self.storage.vehicle_mask
+        fuel_cost = self.storage.fuel_cost
+        travel_time = self.storage.travel_time
+        costs = self.storage.costs
+        offsets = self.offsets
+        targets = self.targets
+        arc_edges = self.arc_edges
+        distance = {source: 0.0}
+        parents = {source: None}
+        resources = {source: (fuel, elapsed)}
+        open_set = [(0.0, source)]
+        while open_set and budget > 0:
+            current_distance, current_node = heappop(open_set)
+            if current_distance > distance[current_node]:
+                continue
+            if current_node != source and (current_node in rejoin or current_node in self.ttl):
+                nodes = [current_node]
+                slots = []
+                while parents[nodes[-1]] is not None:
+                    (previous, slot) = parents[nodes[-1]]
+                    nodes.append(previous)
+                    slots.append(slot)
+                return nodes[::-1], slots[::-1]
+            budget -= 1
+            (current_fuel, current_elapsed) = resources[current_node]
+            for arc in range(offsets[current_node], offsets[current_node + 1]):
+                adjacente = targets[arc]
+                if adjacente in avoid:
+                    continue
+                slot = arc_edges[arc]
+                new_fuel = current_fuel + fuel_cost[slot]
+                new_elapsed = current_elapsed + travel_time[slot]
+                if ranges[masks[slot]] < new_fuel or new_elapsed >= self.max_ttl:
+                    continue
+                tentative = current_distance + costs[slot] * (0.5 + rng.random())
+                if tentative < distance.get(adjacente, math.inf):
+                    distance[adjacente] = tentative
+                    parents[adjacente] = (current_node, slot)
+                    resources[adjacente] = (new_fuel, new_elapsed)
+                    heappush(open_set, (tentative, adjacente))
+        return None
+
+    def _variant(self, route: tuple) -> tuple[list[int], list[int]]:
+        """
+        Random variant of a route: a detour that replaces a segment by a single node adjacent to both of its ends or,
+        half of the time and whenever there is no such node, a new segment from one of its nodes to a later node of the
+        route (or to a zone).
+        """
+        nodes, slots, fuel, elapsed = route
+        rng = self.rng
+        i = rng.randrange(len(slots))
+        positions = {node: j for (j, node) in enumerate(nodes)}
+        if rng.random() < 0.5:
+            detours = []
+            for arc in range(self.offsets[nodes[i]], self.offsets[nodes[i] + 1]):
+                w = self.targets[arc]
+                if w in positions:
+                    continue
+                for back in range(self.offsets[w], self.offsets[w + 1]):
+                    j = positions.get(self.targets[back], -1)
+                    if j > i:
+                        detours.append((self.arc_edges[arc], w, self.arc_edges[back], j))
+            if detours:
+                first, w, second, j = rng.choice(detours)
+                return nodes[:i + 1] + [w] + nodes[j:], slots[:i] + [first, second] + slots[j:]
+        later = {node: j for (node, j) in positions.items() if j > i + 1}
+        segment = self._reroute(nodes[i], set(nodes[:i + 2]), fuel[i], elapsed[i], later, VARIANT_BUDGET) # Not through the next node, so the route changes
+        if segment is None:
+            return None
+        j = later.get(segment[0][-1])
+        if j is None:
+            return nodes[:i] + segment[0], slots[:i] + segment[1]
+        return nodes[:i] + segment[0] + nodes[j + 1:], slots[:i] + segment[1] + slots[j:]
+
+    def _evaluate(self, candidates: list[tuple[list[int], list[int]]]) -> tuple[list[float], list[bool]]:
+        """
+        Cost and feasibility of a batch of routes at once, over the flattened edge slots of all of them.
+        """
+        import numpy as np
+        lengths = np.array([len(slots) for (_, slots) in candidates])
+        flat = np.fromiter(chain.from_iterable(slots for (_, slots) in candidates), dtype=np.int64, count=int(lengths.sum()))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        costs = np.add.reduceat(self.costs[flat], starts)
+        fuel = self.fuel[flat].astype(np.int64)
+        used = np.cumsum(fuel)
+        used -= np.repeat(used[starts] - fuel[starts], lengths) # Fuel used by each route up to each of its edges
+        feasible = np.logical_and.reduceat(self.ranges[self.masks[flat]] >= used, starts)
+        elapsed = np.add.reduceat(self.travel[flat].astype(np.int64), starts)
+        ttls = np.array([self.ttl.get(nodes[-1], -1) for (nodes, _) in candidates])
+        feasible &= elapsed < ttls
+        self.evaluations += len(candidates)
+        return costs.tolist(), feasible.tolist()
+
+    def _route(self, nodes: list[int], slots: list[int]) -> tuple:
+        # Fuel used and time elapsed at each node (the starting resources of a new segment)
+        fuel = [0]
+        elapsed = [0]
+        for slot in slots:
+            fuel.append(fuel[-1] + self.storage.fuel_cost[slot])
+            elapsed.append(elapsed[-1] + self.storage.travel_time[slot])
+        return (nodes, slots, fuel, elapsed)
+
+    def run(self, iterations: int, deadline: float, begin: float, temperature: float, cooling: float, patience: int, gap: float) -> dict:
+        """
+        Anneal from random routes, restarting from a new one when the chain stalls for `patience` iterations or falls more than
+        `gap` behind the best cost of all the chains.
+        :return: Dict with the best route ("nodes", "cost" and "vehicle" of its last edge, None if none found), the improvements
+                 ("trace": (seconds, cost)) and the counters of the chain.
+        """
+        best = None
+        best_cost = math.inf
+        current = None
+        trace = []
+        done = restarts = failures = accepted = stall = 0
+        for _ in range(iterations):
+            if time.time() >= deadline:
+                break
+            done += 1
+            if current is None:
+                walk = self._walk(self.start, (), 0, 0, CONSTRUCT_BUDGET)
+                if walk is None:
+                    failures += 1
+                    continue
+                (costs, feasible) = self._evaluate([walk])
+                current, current_cost = self._route(*walk), costs[0]
+                heat = temperature * current_cost
+                restarts += 1
+                stall = 0
+            else:
+                candidates = [variant for variant in (self._variant(current) for _ in range(BATCH_SIZE)) if variant is not None]
+                if not candidates:
+                    stall += 1
+                else:
+                    (costs, feasible) = self._evaluate(candidates)
+                    k = min((k for k in range(len(candidates)) if feasible[k]), key=costs.__getitem__, default=None)
+                    # Metropolis: better variants are always taken, worse ones with a probability that falls with the temperature
+                    if k is not None and (costs[k] < current_cost or (heat > 0 and self.rng.random() < math.exp((current_cost - costs[k]) / heat))):
+                        current, current_cost = self._route(*candidates[k]), costs[k]
+                        accepted += 1
+                    stall += 1
+                heat *= cooling
+            if current_cost < best_cost:
+                best, best_cost = current, current_cost
+                trace.append((time.time() - begin, best_cost))
+                stall = 0
+                if _worker_best is not None:
+                    with _worker_best.get_lock():
+                        if best_cost < _worker_best.value:
+                            _worker_best.value = best_cost
+            shared = _worker_best.value if _worker_best is not None else best_cost
+            if stall >= patience or (stall >= patience // 2 and current_cost > shared * (1 + gap)):
+                current = None
+        return {
+            "nodes": None if best is None else [self.names[node] for node in best[0]],
+            "vehicle": None if best is None else self.vehicle_table[self.storage.vehicle_mask[best[1][-1]]],
+            "cost": best_cost if best is not None else None,
+            "trace": trace,
+            "iterations": done,
+            "restarts": restarts,
+            "failures": failures,
+            "accepted": accepted,
+            "evaluations": self.evaluations
+        }
+
+def _run_chain(start_node: str, end_nodes: list[str], peso: int, seed: int, iterations: int, deadline: float, begin: float,
+               temperature: float, cooling: float, patience: int, gap: float) -> dict:
+    return _Chain(portfolio._worker_graph, start_node, end_nodes, peso, seed).run(iterations, deadline, begin, temperature, cooling, patience, gap)
+
+class Annealer(Portfolio):
+    def __init__(self, graph: Graph, workers: int=None):
+        """
+        Simulated annealing with random restarts, with independent chains on a pool of worker processes.
+        Like Portfolio, the workers memory-map the graph from a temporary binary file; the chains share the best cost found
+        so far, so a chain that falls far behind the others restarts instead of refining a bad route.
+        :param graph: Graph to search.
+        :param workers: Number of processes (default: one per CPU).
+        """
+        super().__init__(graph, (), workers or os.cpu_count() or 1)
+        self.best = multiprocessing.Value('d', math.inf)
+
+    def _start(self):
+        if self.version != self.graph.get_version():
+            self._stop()
+            self.graph.save(self.path)
+            self.version = self.graph.get_version()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.path, self.best))
+
+    def solve(self, start_node: str, end_nodes: list[str], peso: int=0, chains: int=None, iterations: int=2_000, seconds: float=None,
+              seed: int=0, temperature: float=0.05, cooling: float=0.995, patience: int=30, gap: float=0.5, stats: dict=None):
+        """
+        Run the chains on the same query and return the best route of all of them.
+        :param start_node: Nodo inicial.
+        :param end_nodes: Lista de nodos finais.
+        :param peso: Peso a ser transportado.
+        :param chains: Number of chains (default: one per worker); chain i uses the random seed seed + i.
+        :param iterations: Iterations of each chain (each one generates and evaluates BATCH_SIZE variants of its route).
+        :param seconds: Wall time limit from the call, including the start of the workers (None: only the iterations).
+        :param temperature: Initial temperature as a fraction of the cost of the route a chain (re)starts from.
+        :param cooling: Factor applied to the temperature after each iteration.
+        :param patience: Iterations without improving the route of a chain before it restarts from a new random route.
+        :param gap: Fraction above the best cost of all the chains after which a chain restarts after patience / 2 iterations.
+        :param stats: Optional dict where the best cost over time ("trace": (seconds, cost) at each improvement of the best of all
+                      the chains), the cost found by each chain ("costs"), the totals of "iterations", "restarts", "failures" (random
+                      routes not found within CONSTRUCT_BUDGET), "accepted" moves and route "evaluations", and the wall time
+                      ("seconds") are recorded.
+        :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
+        """
+        if start_node in end_nodes:
+            return ([start_node], 0, None)
+        if not end_nodes:
+            return None
+        begin = time.time()
+        deadline = begin + seconds if seconds is not None else math.inf
+        self._start()
+        self.best.value = math.inf
+        futures = [self.pool.submit(_run_chain, start_node, list(end_nodes), peso, seed + i, iterations, deadline, begin,
+                                    temperature, cooling, patience, gap) for i in range(chains or self.workers)]
+        results = [future.result() for future in futures]
+        elapsed = time.time() - begin
+        found = [result for result in results if result["cost"] is not None]
+        best = min(found, key=lambda result: result["cost"], default=None)
+        if stats is not None:
+            trace = []
+            for (moment, cost) in sorted(chain.from_iterable(result["trace"] for result in results)):
+                if not trace or cost < trace[-1][1]:
+                    trace.append((moment, cost))
+            stats.update(trace=trace, costs=[result["cost"] for result in results], seconds=elapsed,
+                         **{key: sum(result[key] for result in results) for key in ("iterations", "restarts", "failures", "accepted", "evaluations")})
+        notify("debug", f"Simulated annealing: {len(results)} cadeias, melhor custo {best['cost'] if best else None} em {elapsed:.2f} s")
+        if best is None:
+            return None
+        return (best["nodes"], best["cost"], best["vehicle"])
+
+def SimulatedAnnealing(start_node: str, end_nodes: list[str], graph: Graph, peso: int = 0, chains: int = None, iterations: int = 2_000,
+                       seconds: float = None, seed: int = 0, stats: dict = None):
+    """
+    Simulated annealing com recomeços aleatórios em paralelo (ver Annealer), em alternativa ao Hill Climbing: em vez de seguir
+    sempre o vizinho com menor heurística e desistir no primeiro beco sem saída, cada cadeia parte de uma rota aleatória e
+    melhora-a com variantes (um novo troço até um nodo mais à frente ou um desvio por um nodo), aceitando por vezes rotas piores
+    para sair de mínimos locais.
+    Aplica as mesmas regras de veículo, combustível e TTL do AStar; não é ótimo.
+    :param start_node: Nodo inicial.
+    :param end_nodes: Lista de nodos finais.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado.
+    :param chains: Número de cadeias (por omissão, uma por CPU).
+    :param iterations: Iterações de cada cadeia.
+    :param seconds: Tempo máximo em segundos.
+    :param seed: Semente da primeira cadeia (a cadeia i usa seed + i).
+    :param stats: Dicionário opcional (ver Annealer.solve).
+    :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
+    """
+    with Annealer(graph) as annealer:
+        return annealer.solve(start_node, end_nodes, peso, chains, iterations, seconds, seed, stats=stats)
@@ -0,0 +1,192 @@
+import math
+import time
+from heapq import heappush, heappop
+
+from classes.graph import Graph
+from classes.vehicle import Vehicle, best_vehicle_table, load_bucket
+from classes.algorithms import AStar
+from classes.stats import add_stats, measure
+from utils.notify import notify
+
+class SearchTree:
+    __slots__ = ("start_node", "max_ttl", "g_score", "parents", "elapsed", "vehicles_used", "order", "reach", "max_relaxed")
+
+    def __init__(self, graph: Graph, start_node: str, vehicle_table: list[Vehicle], max_ttl: int, stats: dict=None):
+        """
+        Search tree of AStar without heuristic (uniform cost, same relaxation, fuel and TTL rules) from one node,
+        run until the queue is empty so it answers every target set at once.
+        Keeps the order in which nodes were settled and, for each one, the largest elapsed time accepted by a relaxation
+        before it was settled: a query with a smaller TTL bound gets the same answer as long as that value stays below its bound
+        (AStar would have pruned none of those relaxations).
+        :param graph: Graph (or snapshot) to search.
+        :param start_node: Nodo inicial.
+        :param vehicle_table: Vehicle chosen for each vehicle mask with the load of the queries (see Graph.vehicle_table).
+        :param max_ttl: Relaxations reaching a node at this elapsed time or later are pruned (largest TTL of the targets).
+        :param stats: Optional dict where the counters of the search (see classes/stats.py) are added.
+        """
+        self.start_node = start_node
+        self.max_ttl = max_ttl
+        self.g_score = {start_node: 0}
+        self.parents = {start_node: None}
+        self.elapsed = {start_node: 0}
+        self.vehicles_used = {start_node: None}
+        self.order: dict[str, int] = {}
+        self.reach: list[int] = []
+        self.max_relaxed = 0
+        fuel_used = {start_node: 0}
+        open_set = [(0, start_node)]
+        relaxed = pruned_fuel = pruned_ttl = pruned_vehicle = 0
+        pushes = peak_frontier = 1
+        while open_set:
+            peak_frontier = max(peak_frontier, len(open_set))
+            current_cost, current_node = heappop(open_set)
+            if current_node in self.order or current_cost > self.g_score[current_node]:
+                continue
+            self.order[current_node] = len(self.reach)
+            self.reach.append(self.max_relaxed)
+            current_fuel = fuel_used[current_node]
+            current_elapsed = self.elapsed[current_node]
+            edges = graph.edges_of(current_node)
+            relaxed += len(edges)
+            for (adjacente, slot, (travel_time, fuel_cost, _, _)) in edges:
+                if adjacente in self.order:
+                    continue
+                tentative_g_score = current_cost + graph.get_edge_cost(slot)
+                if tentative_g_score >= self.g_score.get(adjacente, math.inf):
+                    continue
+                if current_elapsed + travel_time >= max_ttl:
+                    pruned_ttl += 1
+                    continue
+                vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                if vehicle is None:
+                    pruned_vehicle += 1
+                    continue
+                if vehicle.get_range() < current_fuel + fuel_cost:
+                    pruned_fuel += 1
+                    continue
+                self.g_score[adjacente] = tentative_g_score
+                self.parents[adjacente] = current_node
+                fuel_used[adjacente] = current_fuel + fuel_cost
+                self.elapsed[adjacente] = current_elapsed + travel_time
+                self.vehicles_used[adjacente] = vehicle
+                self.max_relaxed = max(self.max_relaxed, current_elapsed + travel_time)
+                heappush(open_set, (tentative_g_score, adjacente))
+                pushes += 1
+        if stats is not None:
+            add_stats(stats, {"expansions": len(self.order), "relaxed": relaxed, "pushes": pushes, "pops": pushes, "peak_frontier": peak_frontier,
+                              "pruned_fuel": pruned_fuel, "pruned_ttl": pruned_ttl, "pruned_vehicle": pruned_vehicle})
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def target(self, end_nodes_ttl: dict[str, int]) -> str:
+        """
+        Get the first target settled within its TTL (the one AStar returns).
+        :return: Name of the target, or None if none is reachable within its TTL.
+        """
+        best = None
+        for (end_node, ttl) in end_nodes_ttl.items():
+            position = self.order.get(end_node)
+            if position is not None and self.elapsed[end_node] < ttl and (best is None or position < self.order[best]):
+                best = end_node
+        return best
+
+    def answers(self, target: str, max_ttl: int) -> bool:
+        """
+        Check if the answer of this tree (see target) is also the answer of AStar with a smaller (or equal) TTL bound.
+        """
+        reach = self.reach[self.order[target]] if target is not None else self.max_relaxed
+        return max_ttl == self.max_ttl or reach < max_ttl
+
+    def route(self, target: str) -> tuple[list[str], float, Vehicle]:
+        """
+        Get the route to a settled node.
+        :return: Tupla (caminho, custo_total, veículo), or None if target is None.
+        """
+        if target is None:
+            return None
+        path = []
+        node = target
+        while node is not None:
+            path.append(node)
+            node = self.parents[node]
+        path.reverse()
+        return (path, self.g_score[target], self.vehicles_used[target])
+
+def solve_batch(graph: Graph, queries: list[tuple[str, list[str], int]], algorithm=AStar, stats: dict=None, shared_tree: bool=False) -> list:
+    """
+    Answer many queries (start_node, end_nodes, peso) over one pinned version of the graph.
+    By default the algorithm runs on its own view of the same snapshot once per distinct query. AStar only depends on the load
+    through its load bucket (the vehicle table, see best_vehicle_table) and not on the order of the end nodes, so its queries
+    are grouped by (start node, end nodes, load bucket) and each group is searched once; the results are the ones of AStar.
+    With shared_tree the queries are grouped by start node and vehicle class (loads that choose the same vehicle on every edge,
+    see best_vehicle_table), and each group shares the SearchTree of its largest TTL bound; the few queries it cannot answer
+    exactly get a tree for their own bound, shared with the rest of the group. The results are then the cheapest routes under
+    the rules of AStar (AStar without heuristic), which differ from the ones of AStar when its heuristic steers it elsewhere.
+    :param graph: Grafo.
+    :param queries: List of (start_node, end_nodes, peso).
+    :param algorithm: Search algorithm (see classes/algorithms.py), AStar with shared_tree.
+    :param stats: Optional dict where the number of "queries", "groups" (searches of the algorithm, or groups sharing trees),
+                  "trees" built, "fallbacks" (queries answered by a tree of their own bound), "seconds" and "queries_per_second"
+                  are recorded, with the counters and phase times of the trees or of the searches of the algorithm added up
+                  (a SearchStats, see classes/stats.py).
+    :param shared_tree: Answer the queries of each group from shared search trees.
+    :return: List with the result of each query, in input order: Tupla (caminho, custo_total, veículo) or None.
+    """
+    if shared_tree and algorithm is not AStar:
+        raise ValueError("shared_tree answers with the search tree of AStar without heuristic: algorithm must be AStar.")
+    begin = time.perf_counter()
+    results = [None] * len(queries)
+    groups = {}
+    trees = fallbacks = 0
+    with graph.snapshot() as snapshot:
+        if not shared_tree:
+            vehicle_types = snapshot.get_vehicle_types()
+            for index, (start_node, end_nodes, peso) in enumerate(queries):
+                key = (start_node, tuple(sorted(set(end_nodes))), load_bucket(peso, vehicle_types)) if algorithm is AStar else index
+                groups.setdefault(key, []).append(index)
+            for members in groups.values():
+                start_node, end_nodes, peso = queries[members[0]]
+                search = None if stats is None else {}
+                result = algorithm(start_node, list(end_nodes), snapshot.query(), peso, stats=search)
+                if search is not None:
+                    add_stats(stats, search)
+                for index in members:
+                    # Every query gets its own path list
+                    results[index] = None if result is None else (list(result[0]), *result[1:])
+        else:
+            vehicle_types = snapshot.get_vehicle_types()
+            for index, (start_node, end_nodes, peso) in enumerate(queries):
+                if not end_nodes:
+                    continue
+                if start_node in end_nodes:
+                    results[index] = ([start_node], 0, None)
+                    continue
+                end_nodes_ttl = {end_node: snapshot.get_node(end_node).get_ttl() for end_node in end_nodes}
+                key = (start_node, tuple(best_vehicle_table(peso, vehicle_types)))
+                groups.setdefault(key, []).append((index, end_nodes_ttl, max(end_nodes_ttl.values())))
+            for ((start_node, vehicle_class), members) in groups.items():
+                vehicle_table = [None if t is None else vehicle_types[t] for t in vehicle_class]
+                largest = max(max_ttl for (_, _, max_ttl) in members)
+                with measure(stats):
+                    shared = SearchTree(snapshot, start_node, vehicle_table, largest, stats)
+                group_trees = {largest: shared}
+                trees += 1
+                for (index, end_nodes_ttl, max_ttl) in members:
+                    tree = shared
+                    target = tree.target(end_nodes_ttl)
+                    if not tree.answers(target, max_ttl):
+                        fallbacks += 1
+                        tree = group_trees.get(max_ttl)
+                        if tree is None:
+                            with measure(stats):
+                                tree = group_trees[max_ttl] = SearchTree(snapshot, start_node, vehicle_table, max_ttl, stats)
+                            trees += 1
+                        target = tree.target(end_nodes_ttl)
+                    results[index] = tree.route(target)
+    elapsed = time.perf_counter() - begin
+    notify("debug", f"{len(queries)} consultas em {elapsed:.3f}s ({len(groups)} grupos, {trees} árvores)")
+    if stats is not None:
+        stats.update(queries=len(queries), groups=len(groups), trees=trees, fallbacks=fallbacks, seconds=elapsed,
+                     queries_per_second=len(queries) / elapsed if elapsed > 0 else math.inf)
+    return results
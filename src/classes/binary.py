@@ -0,0 +1,381 @@
+"""
+Versioned binary graph format (little-endian), laid out so it can be memory-mapped:
+
+    header     MAGIC, FORMAT_VERSION, flags, zones, edges, arcs, number of sections
+    directory  one (name, typecode, offset, count) entry per section
+    sections   8-byte aligned columns: string table (names, name_offsets, name_order),
+               zone attributes, heuristics, edge columns, CSR arrays, sorted edge keys,
+               role indexes and a JSON "params" section with the graph class name and scalar attributes.
+
+Unknown sections are ignored by the loader (and kept in `graph.sections`), so extensions can add their own.
+"""
+
+import json
+import math
+import mmap as mmap_module
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Any, Iterator
+
+from classes.zone import Zone
+from classes.storage import CompactStorage
+from classes.vehicle import vehicle_mask
+
+MAGIC: bytes = b"UMSG"
+FORMAT_VERSION: int = 1
+FLAG_DIRECTED: int = 1
+HEADER = struct.Struct("<4sHHQQQI")
+SECTION = struct.Struct("<16sc7xQQ")
+
+# Attributes of Graph (and of the storage) that are not scenario parameters
+INTERNAL_ATTRIBUTES = {"storage", "directed", "heuristics", "versions", "landmarks", "incoming", "zones", "sections"}
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def _column(values, typecode: str) -> array:
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    column = array(typecode)
+    if isinstance(values, memoryview):
+        column.frombytes(values.cast("B"))
+    else:
+        column.extend(values)
+    return column
+
+def _graph_columns(graph) -> dict[str, array]:
+    """
+    Collect the columns of a graph in the layout of the format, whatever its storage backend.
+    """
+    storage = graph.storage
+    zones = graph.get_nodes()
+    ids = {zone.get_name(): zone_id for zone_id, zone in enumerate(zones)}
+    encoded = [zone.get_name().encode("utf-8") for zone in zones]
+    columns = {
+        "names": array('B', b"".join(encoded)),
+        "name_offsets": array('q', [0]),
+        "name_order": array('i', sorted(range(len(zones)), key=encoded.__getitem__)),
+        "population": array('q', [zone.get_population() for zone in zones]),
+        "severity": array('i', [zone.get_severity() for zone in zones]),
+        "ttl": array('i', [zone.get_ttl() for zone in zones]),
+        "camp": array('b', [1 if zone.is_camp() else 0 for zone in zones]),
+        "heuristics": array('d', [graph.heuristics.get(zone.get_name(), math.nan) for zone in zones]),
+    }
+    for name in encoded:
+        columns["name_offsets"].append(columns["name_offsets"][-1] + len(name))
+    if hasattr(storage, "compact"):
+        storage.compact()
+        for column in ("travel_time", "fuel_cost", "conditions", "vehicle_mask", "costs", "offsets", "targets", "arc_edges"):
+            columns[column] = _column(getattr(storage, column), dict(CompactStorage.COLUMNS)[column])
+    else:
+        # Rebuild the CSR layout from the adjacency lists (edge slots come from the arc slots of edges_of)
+        num_slots = len(storage.costs)
+        columns.update({
+            "travel_time": array('i', [0]) * num_slots, "fuel_cost": array('i', [0]) * num_slots,
+            "conditions": array('b', [0]) * num_slots, "vehicle_mask": array('H', [0]) * num_slots,
+            "costs": _column(storage.costs, 'd'), "offsets": array('q', [0]), "targets": array('i'), "arc_edges": array('i')
+        })
+        for zone in zones:
+            node = zone.get_name()
+            for (adjacente, slot, (travel_time, fuel_cost, good_conditions, vehicles)) in storage.edges_of(node):
+                columns["travel_time"][slot] = travel_time
+                columns["fuel_cost"][slot] = fuel_cost
+                columns["conditions"][slot] = 1 if good_conditions else 0
+                columns["vehicle_mask"][slot] = vehicle_mask(vehicles)
+                columns["targets"].append(ids[adjacente])
+                columns["arc_edges"].append(slot)
+            columns["offsets"].append(len(columns["targets"]))
+    # Sorted (u << 32 | v) keys for the edge index of the compact backend
+    keys = {}
+    offsets = columns["offsets"]
+    for u in range(len(zones)):
+        for arc in range(offsets[u], offsets[u + 1]):
+            keys[u << 32 | columns["targets"][arc]] = columns["arc_edges"][arc]
+    columns["keys"] = array('q', sorted(keys))
+    columns["key_slots"] = array('i', [keys[key] for key in columns["keys"]])
+    columns["camp_ids"] = array('i', [zone_id for zone_id, zone in enumerate(zones) if zone.is_camp()])
+    columns["affected_ids"] = array('i', [zone_id for zone_id, zone in enumerate(zones) if zone.get_severity() > 0])
+    attributes = {key: value for key, value in vars(graph).items() if key not in INTERNAL_ATTRIBUTES and _is_param(value)}
+    params = {"class": type(graph).__name__, "attributes": attributes}
+    columns["params"] = array('B', json.dumps(params).encode("utf-8"))
+    return columns
+
+def _is_param(value: Any) -> bool:
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def save_graph(graph, path: str, extra_sections: dict[str, array]=None):
+    """
+    Write a graph to a binary file.
+    :param graph: Graph to save (any storage backend).
+    :param path: Destination file.
+    :param extra_sections: Additional named array columns to store alongside the graph.
+    """
+    if sys.byteorder != "little":
+        raise ValueError("The binary graph format is only supported on little-endian machines.")
+    columns = _graph_columns(graph)
+    columns.update(extra_sections or {})
+    num_zones = len(columns["population"])
+    num_edges = len(columns["costs"])
+    num_arcs = len(columns["targets"])
+    offset = _aligned(HEADER.size + SECTION.size * len(columns))
+    directory = []
+    for name, values in columns.items():
+        directory.append((name, values, offset))
+        offset = _aligned(offset + len(values) * values.itemsize)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_DIRECTED if graph.is_directed() else 0, num_zones, num_edges, num_arcs, len(columns)))
+        for name, values, start in directory:
+            f.write(SECTION.pack(name.encode("ascii"), values.typecode.encode("ascii"), start, len(values)))
+        for name, values, start in directory:
+            f.write(b"\0" * (start - f.tell()))
+            f.write(values.tobytes())
+
+def read_sections(path: str, mmap: bool=True) -> tuple[dict, dict[str, memoryview]]:
+    """
+    Open a binary graph file and get typed views of its sections.
+    :param path: File to read.
+    :param mmap: If True the file is memory-mapped (copy-on-write: pages are shared until written), otherwise read into memory.
+    :return: Tuple (header, sections) where sections maps each section name to a typed memoryview.
+    """
+    with open(path, "rb") as f:
+        if mmap:
+            buffer = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_COPY)
+        else:
+            buffer = bytearray(f.read())
+    view = memoryview(buffer)
+    magic, version, flags, num_zones, num_edges, num_arcs, num_sections = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a graph file.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported graph file version {version} (expected {FORMAT_VERSION}).")
+    sections = {}
+    for i in range(num_sections):
+        name, typecode, start, count = SECTION.unpack_from(view, HEADER.size + i * SECTION.size)
+        typecode = typecode.decode("ascii")
+        size = array(typecode).itemsize
+        sections[name.rstrip(b"\0").decode("ascii")] = view[start:start + count * size].cast(typecode)
+    header = {"directed": bool(flags & FLAG_DIRECTED), "zones": num_zones, "edges": num_edges, "arcs": num_arcs}
+    return header, sections
+
+def _params(sections: dict[str, memoryview]) -> dict:
+    return json.loads(bytes(sections["params"]).decode("utf-8"))
+
+def read_params(path: str) -> dict:
+    """
+    Read the parameters section of a graph file: {"class": name of the saved graph class, "attributes": {...}}.
+    """
+    return _params(read_sections(path)[1])
+
+def load_graph(cls, path: str, mmap: bool=True, backend: str="compact"):
+    """
+    Load a graph saved with save_graph.
+    With the "compact" backend nothing is rebuilt: the storage columns are views of the file and zones are
+    created on first access, so opening is O(1) and only the pages a search touches are read.
+    :param cls: Graph class to instantiate (its scenario parameters are restored from the file).
+    :param path: File to read.
+    :param mmap: Memory-map the file instead of reading it.
+    :param backend: Storage backend of the loaded graph ("compact" maps the file, others are rebuilt from it).
+    """
+    header, sections = read_sections(path, mmap)
+    return from_sections(cls, header, sections, backend)
+
+def from_sections(cls, header: dict, sections: dict[str, memoryview], backend: str="compact"):
+    """
+    Build a graph over the sections of the format (as returned by read_sections, or generated in memory, see
+    classes/synthetic.py). With the "compact" backend the sections become the storage columns without being copied.
+    :param cls: Graph class to instantiate.
+    :param header: Dict with at least "directed".
+    :param sections: Section name -> typed memoryview (every section written by save_graph).
+    :param backend: Storage backend of the graph ("compact" uses the sections, others are rebuilt from them).
+    """
+    from classes.graph import Graph # Imported here: classes.graph imports this module
+    # Scenario classes build their graph in __init__, so only the base Graph state is initialized
+    graph = cls.__new__(cls)
+    Graph.__init__(graph, directed=header["directed"], backend="compact")
+    storage = graph.storage
+    names = MappedNames(sections["names"], sections["name_offsets"])
+    storage.names = names
+    storage.ids = MappedIds(names, sections["name_order"])
+    storage.zones = MappedZones(names, sections)
+    for (column, _) in storage.COLUMNS:
+        setattr(storage, column, sections[column])
+    storage.camp_ids = sections["camp_ids"].tolist()
+    storage.affected_ids = sections["affected_ids"].tolist()
+    storage.mapped = True
+    graph.heuristics = MappedHeuristics(storage.ids, sections["heuristics"])
+    graph.sections = sections
+    for key, value in _params(sections)["attributes"].items():
+        setattr(graph, key, value)
+    if backend != "compact":
+        graph = _rebuild(graph, cls, backend)
+    return graph
+
+def _rebuild(mapped, cls, backend: str):
+    from classes.graph import Graph # Imported here: classes.graph imports this module
+    graph = cls.__new__(cls)
+    Graph.__init__(graph, directed=mapped.is_directed(), backend=backend)
+    for key, value in vars(mapped).items():
+        if key not in INTERNAL_ATTRIBUTES:
+            setattr(graph, key, value)
+    for zone in mapped.get_nodes():
+        graph.add_node(zone)
+    storage = mapped.storage
+    # Arcs sharing an edge slot are the two directions of one undirected edge
+    arcs: dict[int, list[tuple[str, str]]] = {}
+    for zone_id, name in enumerate(storage.names):
+        for arc in storage.row(zone_id):
+            arcs.setdefault(storage.arc_edges[arc], []).append((name, storage.names[storage.targets[arc]]))
+    for slot in sorted(arcs):
+        data = storage.edge_data(slot)
+        pair = arcs[slot]
+        if len(pair) == 2 and pair[0] == pair[1][::-1]:
+            graph.storage.add_edge(pair[0][0], pair[0][1], data, False)
+        else:
+            for (node1, node2) in pair:
+                graph.storage.add_edge(node1, node2, data, True)
+    graph.heuristics = mapped.heuristics.to_dict()
+    graph.sections = mapped.sections
+    return graph
+
+class MappedNames(Sequence):
+    def __init__(self, data: memoryview, offsets: memoryview):
+        """
+        Zone names decoded on demand from the string table.
+        """
+        self.data = data
+        self.offsets = offsets
+
+    def __getitem__(self, zone_id: int) -> str:
+        if zone_id < 0:
+            zone_id += len(self)
+        if not 0 <= zone_id < len(self):
+            raise IndexError(zone_id)
+        return self.encoded(zone_id).decode("utf-8")
+
+    def encoded(self, zone_id: int) -> bytes:
+        return bytes(self.data[self.offsets[zone_id]:self.offsets[zone_id + 1]])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+class MappedIds(Mapping):
+    def __init__(self, names: MappedNames, order: memoryview):
+        """
+        Name -> zone id lookup by binary search over the ids sorted by name (O(log V), nothing to build).
+        """
+        self.names = names
+        self.order = order
+
+    def __getitem__(self, name: str) -> int:
+        target = name.encode("utf-8") if isinstance(name, str) else None
+        if target is None:
+            raise KeyError(name)
+        low, high = 0, len(self.order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.names.encoded(self.order[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.order) and self.names.encoded(self.order[low]) == target:
+            return self.order[low]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+class MappedZones(Sequence):
+    def __init__(self, names: MappedNames, sections: dict[str, memoryview]):
+        """
+        Zones created from the attribute columns on first access (and then kept, so changes to them persist).
+        """
+        self.names = names
+        self.population = sections["population"]
+        self.severity = sections["severity"]
+        self.ttl = sections["ttl"]
+        self.camp = sections["camp"]
+        self.camp_ids = sections["camp_ids"]
+        self.affected_ids = sections["affected_ids"]
+        self.cache: dict[int, Zone] = {}
+
+    def __getitem__(self, zone_id: int) -> Zone:
+        if zone_id < 0:
+            zone_id += len(self)
+        zone = self.cache.get(zone_id)
+        if zone is None:
+            name = self.names[zone_id]
+            zone = Zone(name, self.population[zone_id], self.severity[zone_id], self.ttl[zone_id], bool(self.camp[zone_id]))
+            self.cache[zone_id] = zone
+        return zone
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def roles(self) -> tuple[list[int], list[int]]:
+        """
+        Camp and affected zone ids: the role sections of the file, with the zones accessed since then (the only
+        ones that can have changed) checked against their live state.
+        :return: Tuple (camp_ids, affected_ids), sorted by id.
+        """
+        camp_ids = set(self.camp_ids)
+        affected_ids = set(self.affected_ids)
+        for zone_id, zone in self.cache.items():
+            camp_ids.discard(zone_id)
+            affected_ids.discard(zone_id)
+            if zone.is_camp():
+                camp_ids.add(zone_id)
+            if zone.get_severity() > 0:
+                affected_ids.add(zone_id)
+        return sorted(camp_ids), sorted(affected_ids)
+
+class MappedHeuristics(MutableMapping):
+    def __init__(self, ids: MappedIds, values: memoryview):
+        """
+        Heuristic values read from their column (NaN marks a zone without heuristic); new values go to an overlay dict.
+        """
+        self.ids = ids
+        self.values = values
+        self.overlay: dict[str, int] = {}
+
+    def __getitem__(self, node: str) -> int:
+        if node in self.overlay:
+            return self.overlay[node]
+        value = self.values[self.ids[node]]
+        if math.isnan(value):
+            raise KeyError(node)
+        return int(value) if value.is_integer() else value
+
+    def __setitem__(self, node: str, value: int):
+        self.overlay[node] = value
+
+    def __delitem__(self, node: str):
+        raise TypeError("Heuristics of a loaded graph can not be deleted.")
+
+    def __iter__(self) -> Iterator[str]:
+        for zone_id, name in enumerate(self.ids.names):
+            if name in self.overlay or not math.isnan(self.values[zone_id]):
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict[str, int]:
+        """
+        Every heuristic value in a dict, read by zone id (dict(self) would search the id of every name).
+        """
+        values = {}
+        for (name, value) in zip(self.ids.names, self.values.tolist()):
+            if name in self.overlay:
+                values[name] = self.overlay[name]
+            elif not math.isnan(value):
+                values[name] = int(value) if value.is_integer() else value
+        return values
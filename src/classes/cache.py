@@ -0,0 +1,180 @@
+import sys
+from array import array
+from collections import OrderedDict
+
+from classes.graph import Graph
+from classes.vehicle import load_bucket
+from utils.notify import notify
+
+# Approximate memory of an entry besides its path and edge slots (key tuple, entry tuple and the dict and index references to them)
+ENTRY_BYTES: int = 300
+
+class RouteCache:
+    def __init__(self, graph: Graph, max_entries: int=1024, max_bytes: int=None, strict: bool=False):
+        """
+        LRU cache of the answers of the search algorithms, in front of the graph snapshots they run on (as in main.resolve).
+        Queries are normalized to (algorithm, start, sorted end nodes, load bucket), since the algorithms only depend on the load
+        through the vehicles that can carry it (see vehicle.load_bucket); every entry is valid for the graph version of the cache.
+        After a new version is committed, update moves the entries to it and drops only the routes that use an edge that
+        changed (and the queries without a route, which any change can open). Other edges can get cheaper too, so a kept route
+        stays a valid route with the same cost but may no longer be the cheapest: strict drops every entry when a changed edge
+        got cheaper, faster (TTL), used less fuel (vehicle range) or opened to more vehicles.
+        :param graph: Graph the queries run on.
+        :param max_entries: Maximum number of entries.
+        :param max_bytes: Maximum approximate memory of the entries (None: no limit).
+        :param strict: Keep only the answers the algorithms would still give after an update.
+        """
+        self.graph = graph
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.strict = strict
+        self.version = graph.get_version()
+        self.entries: OrderedDict[tuple, tuple] = OrderedDict() # query -> (result, edge slots, bytes), least recently used first
+        self.by_slot: dict[int, set[tuple]] = {} # Edge slot -> queries whose route uses it
+        self.unreachable: set[tuple] = set() # Queries without a route
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        # Edge costs, vehicle masks, travel times and fuel costs of the cached version, to tell how a changed edge changed (strict)
+        self.costs = self.masks = self.times = self.fuel = None
+        self.ends: dict[int, tuple[str, str]] = {} # Edge slot -> one of its arcs (strict)
+        if strict:
+            self._snapshot_edges()
+
+    def key(self, algorithm, start_node: str, end_nodes: list[str], peso: int) -> tuple:
+        """
+        Normalized query (the same key for the same end nodes in any order and for loads of the same bucket).
+        """
+        return (algorithm, start_node, tuple(sorted(set(end_nodes))), load_bucket(peso, self.graph.get_vehicle_types()))
+
+    def solve(self, algorithm, start_node: str, end_nodes: list[str], peso: int=0, stats: dict=None):
+        """
+        Answer a query from the cache, or run the algorithm on a snapshot of the graph and cache its answer.
+        :param algorithm: Search algorithm (function of classes/algorithms.py).
+        :param start_node: Nodo inicial.
+        :param end_nodes: Lista de nodos finais.
+        :param peso: Peso a ser transportado.
+        :param stats: Optional stats of the search (see classes/stats.py), left empty when the answer comes from the cache.
+        :return: Answer of the algorithm (the path is a copy, so callers can change it).
+        """
+        if self.graph.get_version() != self.version:
+            self.clear() # Versions committed without update: nothing is known about what changed
+            self.version = self.graph.get_version()
+        key = self.key(algorithm, start_node, end_nodes, peso)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self._copy(entry[0])
+        self.misses += 1
+        with self.graph.snapshot() as snapshot:
+            result = algorithm(start_node, list(end_nodes), snapshot.query(), peso, stats=stats)
+            if snapshot.get_version() == self.version:
+                self._store(key, result, snapshot)
+        return self._copy(result)
+
+    def _copy(self, result: tuple) -> tuple:
+        if result is None:
+            return None
+        return (list(result[0]), *result[1:])
+
+    def _store(self, key: tuple, result: tuple, graph: Graph):
+        if result is None:
+            slots = ()
+            self.unreachable.add(key)
+        else:
+            path = result[0]
+            slots = tuple(graph.get_edge_slot(path[i], path[i + 1]) for i in range(len(path) - 1))
+            for slot in slots:
+                self.by_slot.setdefault(slot, set()).add(key)
+        size = ENTRY_BYTES + (sys.getsizeof(result[0]) if result is not None else 0) + sys.getsizeof(slots)
+        self.entries[key] = (self._copy(result), slots, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes and len(self.entries) > 1):
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _drop(self, key: tuple):
+        (_, slots, size) = self.entries.pop(key)
+        self.bytes -= size
+        self.unreachable.discard(key)
+        for slot in slots:
+            keys = self.by_slot.get(slot)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_slot[slot]
+
+    def update(self, changed: list[int]) -> int:
+        """
+        Move the entries to the version the graph moved to, dropping the ones a change can affect.
+        :param changed: Edge slots changed (as returned by Graph.commit_version or DynamicGraph.simulate).
+        :return: Number of entries dropped.
+        """
+        before = len(self.entries)
+        if self.graph.get_version() != self.version + 1:
+            self.clear() # More than one version since the last update
+        else:
+            changed = set(changed)
+            improved = False
+            if self.strict:
+                for slot in changed:
+                    cost = self.graph.get_edge_cost(slot)
+                    mask = self.graph.get_edge_mask(slot)
+                    (travel_time, fuel_cost, _, _) = self.graph.get_edge_data(*self.ends[slot])
+                    improved = (improved or cost < self.costs[slot] or (mask | self.masks[slot]) != self.masks[slot]
+                                or travel_time < self.times[slot] or fuel_cost < self.fuel[slot])
+                    self.costs[slot] = cost
+                    self.masks[slot] = mask
+                    self.times[slot] = travel_time
+                    self.fuel[slot] = fuel_cost
+            if improved:
+                self.clear()
+            else:
+                stale = set(self.unreachable) if changed else set()
+                for slot in changed:
+                    stale |= self.by_slot.get(slot, set())
+                for key in stale:
+                    self._drop(key)
+        self.version = self.graph.get_version()
+        dropped = before - len(self.entries)
+        self.invalidations += dropped
+        notify("debug", "Cache de rotas: %d de %d entradas invalidadas por %d arestas alteradas", dropped, before, len(set(changed)))
+        return dropped
+
+    def clear(self):
+        """
+        Drop every entry (the counters are kept).
+        """
+        self.entries.clear()
+        self.by_slot.clear()
+        self.unreachable.clear()
+        self.bytes = 0
+        if self.strict:
+            self._snapshot_edges()
+
+    def _snapshot_edges(self):
+        self.costs = array('d', self.graph.storage.costs)
+        self.masks = array('H', self.graph.storage.vehicle_mask)
+        self.times = array('i', [0]) * len(self.costs)
+        self.fuel = array('i', [0]) * len(self.costs)
+        for zone in self.graph.get_nodes():
+            for (adjacente, slot, (travel_time, fuel_cost, _, _)) in self.graph.edges_of(zone.get_name()):
+                self.ends[slot] = (zone.get_name(), adjacente)
+                self.times[slot] = travel_time
+                self.fuel[slot] = fuel_cost
+
+    def counters(self) -> dict:
+        """
+        :return: Dict with the "hits", "misses", "evictions" (by the size limits), "invalidations" (by update), the "hit_rate",
+                 and the current "entries" and approximate "bytes".
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes
+        }
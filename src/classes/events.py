@@ -0,0 +1,92 @@
+from typing import NamedTuple, Any
+
+import utils.notify
+from utils.notify import notify
+from classes.stats import measure
+
+# Kinds of the events of the search generators (the *Events functions of classes/algorithms.py)
+EXPAND: str = "expand" # node: nodo expandido, value: custo até ele
+PUSH: str = "push" # node -> adjacente: nodo adicionado à fronteira, value: custo até ele
+PRUNE_FUEL: str = "prune_fuel" # node -> adjacente: aresta descartada por falta de combustível, value: combustível em falta
+PRUNE_TTL: str = "prune_ttl" # node -> adjacente: aresta descartada pelo TTL, value: zona final que deixou de ser alcançável (None: todas)
+PRUNE_VEHICLE: str = "prune_vehicle" # node -> adjacente: aresta sem veículo capaz de levar a carga, value: carga
+VEHICLE_SWITCH: str = "vehicle_switch" # adjacente: nodo da troca, value: (veículo anterior, veículo novo)
+SOLUTION: str = "solution" # node: zona final, value: tuplo devolvido pelo algoritmo (caminho, custo_total, veículo, ...)
+
+EVENTS: frozenset[str] = frozenset((EXPAND, PUSH, PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE, VEHICLE_SWITCH, SOLUTION))
+# Kinds logged by the wrappers (the plain algorithm functions), by notify level; pushes are only for consumers of the generators
+WARNING_EVENTS: frozenset[str] = frozenset((PRUNE_FUEL, VEHICLE_SWITCH))
+DEBUG_EVENTS: frozenset[str] = frozenset((EXPAND, PRUNE_TTL, PRUNE_VEHICLE))
+# Kinds counted in the notify counters (utils.notify.counters) whether their messages are printed or not
+COUNTED_EVENTS: frozenset[str] = frozenset((PRUNE_FUEL, PRUNE_TTL, PRUNE_VEHICLE, VEHICLE_SWITCH))
+# Stats key where the search generators count each counted kind, read by run_search when the events were not asked for
+COUNTER_OF: dict[str, str] = {PRUNE_FUEL: "pruned_fuel", PRUNE_TTL: "pruned_ttl", PRUNE_VEHICLE: "pruned_vehicle", VEHICLE_SWITCH: "vehicle_switches"}
+
+class SearchEvent(NamedTuple):
+    """
+    Step of a search, yielded by the search generators for the kinds they are asked for.
+    """
+    kind: str
+    node: str
+    adjacente: str = None
+    value: Any = None
+
+# Notify level of the message of each kind logged by the wrappers
+LEVEL_OF: dict[str, str] = {EXPAND: "debug", PRUNE_FUEL: "warning", PRUNE_TTL: "debug", PRUNE_VEHICLE: "debug", VEHICLE_SWITCH: "warning"}
+
+def logged_events(kinds: frozenset[str] = EVENTS) -> frozenset[str]:
+    """
+    Kinds of events a wrapper asks for: the ones it prints (or writes to the JSON log) at the current notify level (a solution
+    is always yielded). The others are not even created, so they cost nothing while their level is off; the counted ones are
+    taken from the stats of the search instead (see run_search).
+    :param kinds: Kinds the wrapper logs at all (the exact algorithms only report the vehicle switches of the route they return).
+    """
+    return kinds & {kind for kind, level in LEVEL_OF.items() if utils.notify.wanted(level)}
+
+def describe(event: SearchEvent) -> tuple[str, str, tuple]:
+    """
+    Notify level, format string and values of the message of an event (formatted by notify only if it is printed).
+    :return: Tuple (level, format string, values), or None for kinds that are not logged.
+    """
+    kind = event.kind
+    if kind == EXPAND:
+        return ("debug", "A analisar os vizinhos de %s", (event.node,))
+    if kind == PRUNE_FUEL:
+        return ("warning", "Combustível seria insuficiente por esta rota para chegar a %s, reabasteça %s", (event.adjacente, event.value))
+    if kind == PRUNE_TTL:
+        if event.value is None:
+            return ("debug", "Todas as zonas finais excederiam o TTL pela rota até %s", (event.adjacente,))
+        return ("debug", "Zona %s excederia o TTL pela rota até %s", (event.value, event.adjacente))
+    if kind == PRUNE_VEHICLE:
+        return ("debug", "Não há nenhum veículo capaz de realizar a rota %s -> %s com esta carga: %s", (event.node, event.adjacente, event.value))
+    if kind == VEHICLE_SWITCH:
+        return ("warning", "Troca de veículo de %s para %s em %s", (event.value[0], event.value[1], event.adjacente))
+    return None
+
+def run_search(search, stats: dict = None, kinds: frozenset[str] = EVENTS) -> tuple:
+    """
+    Run a search generator to completion, logging the events notify prints. The counted kinds are added to the notify counters
+    event by event when they are logged, and at the end from the counters of the stats (see COUNTER_OF) when they are not.
+    :param search: Generator of SearchEvent (asked for logged_events(kinds)).
+    :param stats: Stats the generator fills, where the wall time of the run is recorded as "search_s" (see classes.stats.measure).
+    :param kinds: Kinds the wrapper logs at all (the same given to logged_events).
+    :return: Value of its last solution event, or None.
+    """
+    result = None
+    counters = utils.notify.COUNTERS
+    shown = {kind for kind, level in LEVEL_OF.items() if utils.notify.wanted(level)}
+    with measure(stats):
+        for event in search:
+            kind = event.kind
+            if kind == SOLUTION:
+                result = event.value
+                continue
+            if kind in shown:
+                level, message, args = describe(event)
+                notify(level, message, *args, category=kind if kind in COUNTED_EVENTS else None)
+    if stats is not None:
+        for kind in kinds & COUNTED_EVENTS - shown:
+            count = stats.get(COUNTER_OF[kind], 0)
+            if count:
+                counters[kind] += count
+    return result
@@ -1,41 +1,64 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-import geopandas as gpd
 import math
-from shapely.geometry import Point
 from typing import Any
 
 from classes.zone import Zone
-from classes.zone import Zone
+from classes.vehicle import Vehicle, best_vehicle_table
+from classes.storage import DictStorage, CSRStorage, CompactStorage
+from classes.versions import VersionLog
+from utils.world import find_countries
 
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning) # Hide UserWarning messages from geopandas
 
+# Storage backends available for the graph (see classes/storage.py)
+BACKENDS: dict[str, type] = {
+    "dict": DictStorage,
+    "csr": CSRStorage,
+    "compact": CompactStorage
+}
+
 class Graph:
-    def __init__(self, directed: bool=False):
+    def __init__(self, directed: bool=False, backend: str="dict"):
         """
         Representa um grafo.
         :param directed: Booleano indicando se o grafo é direcionado.
+        :param backend: Armazenamento das arestas ("dict" listas de adjacência, "csr" arrays compressed-sparse-row, "compact" CSR com índice de arestas ordenado).
         """
-        self.graph: dict[str, list[Any]] = {}
-        self.nodes: list[Zone] = []
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown graph backend: {backend}. Use one of {list(BACKENDS.keys())}.")
+        self.storage = BACKENDS[backend]()
         self.directed = directed
         self.heuristics: dict[str, int] = {}
+        self.versions = VersionLog()
+        self.landmarks = None # ALT tables (see build_landmarks)
+        self.incoming: dict[str, list[tuple[str, int]]] = None # Incoming edges of each zone in a directed graph (see incoming_edges)
+
+    @property
+    def graph(self) -> dict[str, list[Any]]:
+        return self.storage.adjacency
+
+    @property
+    def nodes(self) -> list[Zone]:
+        return self.storage.zones
 
     """ Getters """
     def get_nodes(self) -> list[Zone]:
         return self.nodes
     
     def get_node(self, node: str) -> Zone:
-        for n in self.nodes:
-            if n.get_name() == node:
-                return n
-        return None
+        return self.storage.get_zone(node)
     
     def get_heuristics(self) -> dict[str, int]:
         return self.heuristics
     
-    def get_heuristic(self, node: str) -> int:
+    def get_heuristic(self, node: str, targets: list[str]=None) -> float:
+        """
+        Get the heuristic value of a node.
+        :param node: Name of the node.
+        :param targets: Goal nodes of the search; if given and the graph has landmarks, the admissible ALT estimate of the cost to the nearest of them is used instead of the heuristic table.
+        """
+        if targets and self.landmarks is not None:
+            return self.landmarks.estimate(node, targets)
         if node not in self.heuristics.keys():
             return math.inf
         else:
@@ -46,21 +69,26 @@ class Graph:
     
     def is_directed(self) -> bool:
         return self.directed
+
+    def get_version(self) -> int:
+        return self.versions.version
     
     """ Setters """
     def add_node(self, node: Zone):
-        self.nodes.append(node)
+        if self.storage.add_zone(node):
+            self.topology_changed()
 
     def add_heuristic(self, node: str, value: int):
-        n1 = Zone(node)
-        if n1 in self.nodes:
+        if self.storage.get_zone(node) is not None:
             self.heuristics[node] = value
 
     def set_directed(self, directed: bool):
         self.directed = directed
+        self.topology_changed()
 
     def set_graph(self, graph: dict[str, list[Any]]):
-        self.graph = graph
+        self.storage.set_adjacency(graph)
+        self.topology_changed()
 
     """ Methods """
     def add_edge(self, zone1: Zone, zone2: Zone, travel_time: int, fuel_cost: int, good_conditions: bool, vehicles: set):
@@ -76,18 +104,94 @@ class Graph:
         if not isinstance(zone1, Zone) or not isinstance(zone2, Zone):
             raise ValueError("Both arguments must be of type Zone.")
         # Ensure the zones are added to the graph
-        node1 = zone1.get_name()
-        node2 = zone2.get_name()
-        if zone1 not in self.nodes:
-            self.add_node(zone1)
-            self.graph[node1] = []
-        if zone2 not in self.nodes:
-            self.add_node(zone2)
-            self.graph[node2] = []
+        self.add_node(zone1)
+        self.add_node(zone2)
         # Adding vehicles permitted for each edge
-        self.graph[node1].append((node2, (travel_time, fuel_cost, good_conditions, vehicles)))
+        self.storage.add_edge(zone1.get_name(), zone2.get_name(), (travel_time, fuel_cost, good_conditions, vehicles), self.directed)
+        self.topology_changed()
+
+    def topology_changed(self):
+        """
+        Drop the structures derived from the zones and edges of the graph (landmark tables and incoming edge index).
+        """
+        self.landmarks = None
+        self.incoming = None
+
+    def update_edge(self, node1: str, node2: str, travel_time: int, fuel_cost: int, good_conditions: bool, vehicles: set):
+        """
+        Update the data of an existing edge between two zones (both directions if the graph is undirected).
+        The previous data is kept in the version log, so snapshots pinned before the change still see it;
+        the change is part of the next version, published by commit_version.
+        :param node1: Name of zone 1.
+        :param node2: Name of zone 2.
+        :param travel_time: New travel time between the two zones.
+        :param fuel_cost: New fuel cost between the two zones.
+        :param good_conditions: Boolean indicating if the road conditions are good.
+        :param vehicles: List of vehicles permitted for the edge.
+        """
+        slot = self.storage.edge_slot(node1, node2)
+        if slot is None:
+            raise KeyError(f"Edge {node1} -> {node2} not found.")
+        self.versions.record(slot, self.storage.get_edge(node1, node2))
         if not self.directed:
-            self.graph[node2].append((node1, (travel_time, fuel_cost, good_conditions, vehicles))) # Add edge in both directions (undirected graph)
+            reverse = self.storage.edge_slot(node2, node1)
+            if reverse is not None and reverse != slot:
+                self.versions.record(reverse, self.storage.get_edge(node2, node1))
+        self.storage.set_edge(node1, node2, (travel_time, fuel_cost, good_conditions, vehicles), self.directed)
+
+    def commit_version(self) -> list[int]:
+        """
+        Publish the edge changes made since the last commit as a new graph version.
+        The landmark tables, if any, are recomputed for the landmarks the changes affect.
+        :return: Slots of the edges changed in the new version.
+        """
+        changed = self.versions.commit()
+        if self.landmarks is not None:
+            self.landmarks = self.landmarks.update(self, changed)
+        return changed
+
+    def build_landmarks(self, k: int=8, selection: str="farthest", workers: int=None):
+        """
+        Preprocess k landmarks for the ALT heuristic (see classes/landmarks.py), used by get_heuristic when the search passes its targets.
+        :param k: Number of landmarks.
+        :param selection: Landmark selection ("farthest" or "random").
+        :param workers: Processes used to compute the distance tables (default: number of CPUs).
+        """
+        from classes.landmarks import Landmarks
+        self.landmarks = Landmarks.build(self, k, selection, workers)
+
+    def save(self, path: str):
+        """
+        Save the graph (zones, edges, heuristics, landmark tables and scenario parameters) to a binary file (see classes/binary.py).
+        :param path: Destination file.
+        """
+        from classes.binary import save_graph
+        save_graph(self, path, self.landmarks.sections() if self.landmarks is not None else None)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool=True, backend: str="compact") -> "Graph":
+        """
+        Load a graph saved with save.
+        With the "compact" backend the file is memory-mapped and used in place, so opening is O(1)
+        and several processes loading the same file share its pages.
+        :param path: File to read.
+        :param mmap: Memory-map the file instead of reading it into memory.
+        :param backend: Storage backend of the loaded graph.
+        :return: Graph of the class load was called on.
+        """
+        from classes.binary import load_graph
+        from classes.landmarks import Landmarks
+        graph = load_graph(cls, path, mmap, backend)
+        graph.landmarks = Landmarks.from_sections(graph, graph.sections)
+        return graph
+
+    def snapshot(self) -> "GraphSnapshot":
+        """
+        Get a read-only view of the current version of the graph (see classes/snapshot.py).
+        Release it (or use it as a context manager) when done so old edge versions can be dropped.
+        """
+        from classes.snapshot import GraphSnapshot
+        return GraphSnapshot(self)
 
     def has_edge(self, zone1: Zone, zone2: Zone) -> bool:
         """
@@ -98,13 +202,7 @@ class Graph:
         """
         if not isinstance(zone1, Zone) or not isinstance(zone2, Zone):
             raise ValueError("Both arguments must be of type Zone.")
-        node1 = zone1.get_name()
-        node2 = zone2.get_name()
-        if node1 in self.graph:
-            for (adjacente, _) in self.graph[node1]:
-                if adjacente == node2:
-                    return True
-        return False
+        return self.storage.has_edge(zone1.get_name(), zone2.get_name())
 
     def print_nodes(self):
         for node in self.nodes:
@@ -128,18 +226,62 @@ class Graph:
     def edge_cost_function(self, node1: Zone, node2: Zone) -> int:
         """
         Calculate the cost of an edge between two nodes. (Cost function definition)
+        The cost is read from the cached per-edge cost vector through the (node1, node2) edge index, in O(1).
         :param node1: Node 1.
         :param node2: Node 2.
         :return: Cost of the edge between the two nodes.
         """
-        # o custo será o tempo de viagem entre os dois nodos a dividir pelo custo do combustível e se não houver boas condições o tempo é 1.5 vezes maior
-        formula = lambda travel_time, fuel_cost, good_conditions: travel_time / fuel_cost if good_conditions else travel_time / fuel_cost * 1.5
-        costAux = math.inf
-        node_edges = self.graph[node1] # lista de arestas para aquele nodo
-        for (node, (travel_time, fuel_cost, good_conditions, _)) in node_edges:
-            if node == node2:
-                costAux = formula(travel_time, fuel_cost, good_conditions)
-        return costAux
+        slot = self.storage.edge_slot(node1, node2)
+        if slot is None:
+            return math.inf
+        return self.storage.costs[slot]
+
+    def get_edge_slot(self, node1: str, node2: str) -> int:
+        """
+        Get the slot of the edge between two nodes in the cached cost vector.
+        :param node1: Name of node 1.
+        :param node2: Name of node 2.
+        :return: Edge slot, or None if there is no such edge.
+        """
+        return self.storage.edge_slot(node1, node2)
+
+    def get_edge_cost(self, slot: int) -> float:
+        """
+        Get the cached cost of an edge slot (see get_edge_slot).
+        """
+        return self.storage.costs[slot]
+
+    def get_edge_mask(self, slot: int) -> int:
+        """
+        Get the mask of the vehicles permitted on an edge slot (see classes.vehicle.vehicle_mask).
+        """
+        return self.storage.vehicle_mask[slot]
+
+    def get_vehicle_types(self) -> dict[int, Vehicle]:
+        """
+        Get the vehicles the edges of the graph refer to, indexed by type.
+        """
+        return self.storage.vehicle_types
+
+    def vehicle_table(self, peso: int) -> list[Vehicle]:
+        """
+        Get the vehicle chosen for each vehicle mask with this load (fastest capable one, see get_fastest_capable_vehicle),
+        so the algorithms pick the vehicle of an edge with `table[graph.get_edge_mask(slot)]`.
+        :param peso: Load to carry.
+        :return: List indexed by mask with the vehicle, or None if no permitted vehicle can carry the load.
+        """
+        types = self.get_vehicle_types()
+        return [None if t is None else types[t] for t in best_vehicle_table(peso, types)]
+
+    def extend_path_cost(self, cost: float, node1: str, node2: str) -> float:
+        """
+        Extend the known cost of a path ending in node1 by the edge node1 -> node2, in O(1).
+        :param cost: Cost of the path up to node1.
+        :param node1: Last node of the path.
+        :param node2: Node appended to the path.
+        :return: Cost of the extended path.
+        """
+        return cost + self.edge_cost_function(node1, node2)
     
     def calcula_custo(self, path: list[str]) -> int:
         """
@@ -149,7 +291,7 @@ class Graph:
         """
         cost = 0
         for i in range(len(path) - 1):
-            cost += self.edge_cost_function(path[i], path[i + 1])
+            cost = self.extend_path_cost(cost, path[i], path[i + 1])
         return cost
 
     def get_camp_node(self) -> str:
@@ -157,22 +299,53 @@ class Graph:
         Get the name of the camp node.
         :return: Name of the camp node.
         """
-        for node in self.nodes:
-            if node.is_camp():
-                return node.get_name()
-        return None
+        return self.storage.camp_node()
     
     def get_affected_nodes(self) -> list[str]:
         """
         Get the names of the affected zones (zones with severity > 0).
         :return: List of affected zones.
         """
-        affected_nodes = []
-        for node in self.nodes:
-            if node.get_severity() > 0:
-                affected_nodes.append(node.get_name())
-        return affected_nodes
+        return self.storage.affected_nodes()
+
+    def reindex_roles(self):
+        """
+        Rebuild the camp/affected role indexes now (get_camp_node and get_affected_nodes already do it after zones
+        changed their camp flag or severity through their setters).
+        """
+        self.storage.reindex_roles()
     
+    def edges_of(self, node: str) -> list[tuple]:
+        """
+        Get the outgoing edges of a node with their slots in the cost vector.
+        :return: List of (adjacente, slot, (travel_time, fuel_cost, good_conditions, vehicles)).
+        """
+        return self.storage.edges_of(node)
+
+    def get_edge_data(self, node1: str, node2: str) -> tuple:
+        """
+        Get the data of the edge node1 -> node2.
+        :return: Tuple (travel_time, fuel_cost, good_conditions, vehicles), or None if there is no such edge.
+        """
+        return self.storage.get_edge(node1, node2)
+
+    def incoming_edges(self, node: str) -> list[tuple[str, int]]:
+        """
+        Get the edges that end in a node (for backward searches).
+        In a directed graph the index is built on first use and kept until the edges change.
+        :return: List of (origem, slot).
+        """
+        if not self.directed:
+            return [(adjacente, slot) for (adjacente, slot, _) in self.storage.edges_of(node)] # Both directions share the slot
+        if self.incoming is None:
+            incoming = {}
+            for zone in self.nodes:
+                origem = zone.get_name()
+                for (adjacente, slot, _) in self.storage.edges_of(origem):
+                    incoming.setdefault(adjacente, []).append((origem, slot))
+            self.incoming = incoming
+        return self.incoming.get(node, [])
+
     def get_neighbours(self, node: str) -> list:
         """
         Get the neighbours of a node.
@@ -185,6 +358,8 @@ class Graph:
         return neighbours
 
     def draw_graph(self):
+        import networkx as nx # Plotting dependencies are only loaded when drawing (see benchmarks/startup.py)
+        import matplotlib.pyplot as plt
         g = nx.Graph()
         for node in self.nodes:
             node_name = node.get_name()
@@ -201,39 +376,39 @@ class Graph:
         plt.show()
 
     def draw_map(self):
-        world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
-        places = [node.get_name() for node in self.nodes]
-        selected_countries = world[world['name'].isin(places)] # Filter only the countries in the graph
+        import matplotlib.pyplot as plt
+        import geopandas as gpd
+        from shapely.geometry import Point
+        countries = find_countries([node.get_name() for node in self.nodes]) # Geometries from the local world cache (utils/world.py)
+        if not countries:
+            raise ValueError("None of the zones of the graph is a country of the world geometry cache.")
         fig, ax = plt.subplots(figsize=(12, 8))
-        selected_countries.boundary.plot(ax=ax, color='lightgrey') # Draw the boundaries of the countries
+        gpd.GeoSeries([geometry for (geometry, _) in countries.values()]).boundary.plot(ax=ax, color='lightgrey') # Draw the boundaries of the countries
         # Paint the countries according to the severity of the zones
         max_severity = max([node.get_severity() for node in self.nodes])
         for node in self.nodes:
             zone_severity = node.get_severity()
-            if zone_severity > 0:
+            if zone_severity > 0 and node.get_name() in countries:
                 alpha_value = zone_severity / max_severity
-                selected_countries[selected_countries['name'] == node.get_name()].plot(ax=ax, color='darkred', alpha=alpha_value)
+                gpd.GeoSeries([countries[node.get_name()][0]]).plot(ax=ax, color='darkred', alpha=alpha_value)
         # Paint the camp country in blue
-        camp_country = None
-        for node in self.nodes:
-            if node.is_camp():
-                camp_country = node.get_name()
-                break
-        if camp_country:
-            selected_countries[selected_countries['name'] == camp_country].plot(ax=ax, color='blue')
+        camp_country = self.get_camp_node()
+        if camp_country in countries:
+            gpd.GeoSeries([countries[camp_country][0]]).plot(ax=ax, color='blue')
         # Add the name of the countries
-        for _, row in selected_countries.iterrows():
-            ax.text(row.geometry.centroid.x, row.geometry.centroid.y, row['name'], fontsize=8)
+        for name, (_, (centroid_x, centroid_y)) in countries.items():
+            ax.text(centroid_x, centroid_y, name, fontsize=8)
         # Draw the roads between the countries
         max_travel_time = max([travel_time for node in self.nodes for (_, (travel_time, _, _, _)) in self.graph[node.get_name()]])
         for node in self.nodes:
             node_name = node.get_name()
+            if node_name not in countries:
+                continue
             for (adjacente, (travel_time, fuel_cost, good_conditions, vehicles)) in self.graph[node_name]:
-                adjacente_country = world[world['name'] == adjacente]
-                node_centroid_x = selected_countries[selected_countries['name'] == node_name].geometry.centroid.x.values[0]
-                node_centroid_y = selected_countries[selected_countries['name'] == node_name].geometry.centroid.y.values[0]
-                adjacente_centroid_x = adjacente_country.geometry.centroid.x.values[0]
-                adjacente_centroid_y = adjacente_country.geometry.centroid.y.values[0]
+                if adjacente not in countries:
+                    continue
+                node_centroid_x, node_centroid_y = countries[node_name][1]
+                adjacente_centroid_x, adjacente_centroid_y = countries[adjacente][1]
                 line_color = 'k-' if good_conditions else 'r-'
                 permitted_vehicles = ', '.join([str(vehicle) for vehicle in vehicles])
                 road_label = f"({fuel_cost}, {permitted_vehicles})"
@@ -245,10 +420,9 @@ class Graph:
                 return
             for node in self.nodes:
                 zone_name = node.get_name()
-                zone_country = world[world['name'] == zone_name]
                 zone_heuristic = self.get_heuristic(zone_name)
-                if not zone_country.empty:
-                    geometry = zone_country.geometry.iloc[0]
+                if zone_name in countries:
+                    geometry = countries[zone_name][0]
                     if geometry.contains(Point(event.xdata, event.ydata)):
                         ax.set_title(f"Zone: {zone_name}\nPopulation: {node.get_population()}\nSeverity: {node.get_severity()}\nTTL: {node.get_ttl()}\nCamp: {node.is_camp()}\nHeuristic: {zone_heuristic}")
                         fig.canvas.draw_idle()
@@ -0,0 +1,334 @@
+"""
+ALT heuristic (A*, Landmarks and the Triangle inequality).
+For k landmarks L the exact edge-cost distances d(L, v) and d(v, L) are precomputed for every zone, and
+by the triangle inequality d(v, t) >= max(d(L, t) - d(L, v), d(v, L) - d(t, L)) for each landmark, which is
+an admissible (and consistent) estimate of the cost of the cheapest route from v to t. Fuel, TTL and vehicle
+checks only remove routes, so the bound stays admissible for the search algorithms.
+"""
+
+import math
+import os
+import random
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+
+# Graphs with fewer zones than this are preprocessed in the calling process (a pool costs more than it saves)
+PARALLEL_MIN_ZONES: int = 5000
+SELECTIONS: tuple[str, ...] = ("farthest", "random")
+
+class Topology:
+    def __init__(self, graph):
+        """
+        CSR adjacency of a graph by zone id (the order of graph.get_nodes(), as in the binary graph format),
+        with the edge slot of each arc, so distances can be computed from the graph's cost vector.
+        :param graph: Source graph (any storage backend).
+        """
+        storage = graph.storage
+        self.directed = graph.is_directed()
+        if hasattr(storage, "compact"):
+            storage.compact()
+            self.ids = storage.ids
+            self.offsets = array('q', storage.offsets)
+            self.targets = array('i', storage.targets)
+            self.slots = array('i', storage.arc_edges)
+        else:
+            zones = graph.get_nodes()
+            self.ids = {zone.get_name(): zone_id for zone_id, zone in enumerate(zones)}
+            self.offsets = array('q', [0])
+            self.targets = array('i')
+            self.slots = array('i')
+            for zone in zones:
+                for (adjacente, slot, _) in storage.edges_of(zone.get_name()):
+                    self.targets.append(self.ids[adjacente])
+                    self.slots.append(slot)
+                self.offsets.append(len(self.targets))
+        self.num_zones = len(self.offsets) - 1
+        # Endpoints of each edge slot (either direction of an undirected edge)
+        self.ends_u = array('i', [-1]) * len(storage.costs)
+        self.ends_v = array('i', [-1]) * len(storage.costs)
+        for u in range(self.num_zones):
+            for arc in range(self.offsets[u], self.offsets[u + 1]):
+                self.ends_u[self.slots[arc]] = u
+                self.ends_v[self.slots[arc]] = self.targets[arc]
+        self.reverse = self._reversed() if self.directed else None
+
+    def _reversed(self) -> tuple[array, array, array]:
+        # Counting sort of the arcs by target
+        offsets = array('q', [0]) * (self.num_zones + 1)
+        for v in self.targets:
+            offsets[v + 1] += 1
+        for u in range(self.num_zones):
+            offsets[u + 1] += offsets[u]
+        targets = array('i', [0]) * len(self.targets)
+        slots = array('i', [0]) * len(self.targets)
+        position = array('q', offsets[:-1])
+        for u in range(self.num_zones):
+            for arc in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[arc]
+                targets[position[v]] = u
+                slots[position[v]] = self.slots[arc]
+                position[v] += 1
+        return offsets, targets, slots
+
+    def arrays(self, reverse: bool=False) -> tuple[array, array, array]:
+        if reverse and self.directed:
+            return self.reverse
+        return self.offsets, self.targets, self.slots
+
+def shortest_distances(offsets, targets, slots, costs, source: int) -> array:
+    """
+    Dijkstra over a CSR adjacency.
+    :return: Distance from source to every zone id (inf when unreachable).
+    """
+    distances = array('d', [math.inf]) * (len(offsets) - 1)
+    distances[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        distance, u = heappop(heap)
+        if distance > distances[u]:
+            continue
+        for arc in range(offsets[u], offsets[u + 1]):
+            v = targets[arc]
+            candidate = distance + costs[slots[arc]]
+            if candidate < distances[v]:
+                distances[v] = candidate
+                heappush(heap, (candidate, v))
+    return distances
+
+def hop_distances(offsets, targets, source: int) -> array:
+    """
+    Breadth-first hop counts from source (-1 when unreachable), used to spread the landmarks cheaply.
+    """
+    hops = array('i', [-1]) * (len(offsets) - 1)
+    hops[source] = 0
+    queue = deque([source])
+    while queue:
+        u = queue.popleft()
+        for arc in range(offsets[u], offsets[u + 1]):
+            v = targets[arc]
+            if hops[v] < 0:
+                hops[v] = hops[u] + 1
+                queue.append(v)
+    return hops
+
+""" Worker process state (set once per worker by _init_worker) """
+_worker_adjacency = None
+_worker_costs = None
+
+def _init_worker(adjacency: tuple, costs: array):
+    global _worker_adjacency, _worker_costs
+    _worker_adjacency = adjacency
+    _worker_costs = costs
+
+def _landmark_tables(landmark: int, adjacency: tuple=None, costs: array=None) -> tuple[array, array]:
+    forward, backward = adjacency or _worker_adjacency
+    costs = costs if costs is not None else _worker_costs
+    distances_from = shortest_distances(*forward, costs, landmark)
+    distances_to = shortest_distances(*backward, costs, landmark) if backward is not None else distances_from
+    return distances_from, distances_to
+
+def compute_tables(topology: Topology, costs: array, landmarks: list[int], workers: int=None) -> list[tuple[array, array]]:
+    """
+    Compute the (distance from, distance to) tables of several landmarks, one landmark per worker process.
+    :param workers: Number of processes (default: number of CPUs); 1 computes them in the calling process.
+    """
+    adjacency = (topology.arrays(), topology.arrays(reverse=True) if topology.directed else None)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(landmarks) <= 1 or topology.num_zones < PARALLEL_MIN_ZONES:
+        return [_landmark_tables(landmark, adjacency, costs) for landmark in landmarks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(landmarks)), initializer=_init_worker, initargs=(adjacency, costs)) as pool:
+        return list(pool.map(_landmark_tables, landmarks))
+
+def select_landmarks(topology: Topology, k: int, selection: str="farthest", seed: int=0) -> list[int]:
+    """
+    Choose k landmark zone ids.
+    "farthest": farthest-point selection by hop count (each new landmark is the zone farthest from the chosen ones),
+    so only the final weighted tables need Dijkstra and those can run in parallel. "random": k random zones.
+    """
+    if selection not in SELECTIONS:
+        raise ValueError(f"Unknown landmark selection: {selection}. Use one of {list(SELECTIONS)}.")
+    k = min(k, topology.num_zones)
+    rng = random.Random(seed)
+    if selection == "random" or k == 0:
+        return rng.sample(range(topology.num_zones), k)
+    offsets, targets, _ = topology.arrays()
+    # The first landmark is the zone farthest from a random one
+    nearest = hop_distances(offsets, targets, rng.randrange(topology.num_zones)) # Hops to the nearest chosen landmark (-1 if none reaches it)
+    landmarks = []
+    for _ in range(k):
+        unreached = [zone_id for zone_id in range(topology.num_zones) if nearest[zone_id] < 0]
+        if landmarks and unreached:
+            landmark = unreached[0] # A component without landmarks gets one first
+        else:
+            landmark = max(range(topology.num_zones), key=nearest.__getitem__)
+        landmarks.append(landmark)
+        hops = hop_distances(offsets, targets, landmark)
+        for zone_id in range(topology.num_zones):
+            if hops[zone_id] >= 0 and (nearest[zone_id] < 0 or hops[zone_id] < nearest[zone_id]) or not landmarks[:-1]:
+                nearest[zone_id] = hops[zone_id]
+    return landmarks
+
+class Landmarks:
+    def __init__(self, ids, directed: bool, landmarks: list[int], tables: list[tuple], costs, topology: Topology=None):
+        """
+        Landmark distance tables of a graph at one version. Instances are not changed after creation:
+        update returns a new instance, so snapshots keep the tables that match their version.
+        :param ids: Name -> zone id mapping of the tables.
+        :param directed: Whether the graph is directed.
+        :param landmarks: Zone ids of the landmarks.
+        :param tables: One (distance from landmark, distance to landmark) pair of arrays per landmark.
+        :param costs: Edge costs the tables were computed with (to detect which landmarks a change affects).
+        :param topology: Adjacency the tables were computed on (built by update when first needed).
+        """
+        self.ids = ids
+        self.directed = directed
+        self.topology = topology
+        self.landmarks = landmarks
+        self.tables = tables
+        self.costs = costs
+        self._target_cache: tuple = (None, None)
+
+    @classmethod
+    def build(cls, graph, k: int=8, selection: str="farthest", workers: int=None, seed: int=0) -> "Landmarks":
+        """
+        Preprocess the landmarks of a graph.
+        :param graph: Graph (any storage backend).
+        :param k: Number of landmarks.
+        :param selection: "farthest" or "random" (see select_landmarks).
+        :param workers: Processes used to compute the tables (see compute_tables).
+        :param seed: Seed of the selection.
+        """
+        topology = Topology(graph)
+        costs = array('d', graph.storage.costs)
+        landmarks = select_landmarks(topology, k, selection, seed)
+        return cls(topology.ids, topology.directed, landmarks, compute_tables(topology, costs, landmarks, workers), costs, topology)
+
+    def __len__(self) -> int:
+        return len(self.landmarks)
+
+    def estimate(self, node: str, targets: list[str]) -> float:
+        """
+        Lower bound of the cost from node to the nearest of the targets.
+        """
+        ids = self.ids
+        v = ids.get(node)
+        if v is None:
+            return math.inf
+        target_ids = self._targets(targets)
+        best = math.inf
+        for t in target_ids:
+            bound = 0.0
+            for (distances_from, distances_to) in self.tables:
+                # d(L, t) - d(L, v) and d(v, L) - d(t, L); inf - inf (no information) is nan and ignored by max
+                forward = distances_from[t] - distances_from[v]
+                backward = distances_to[v] - distances_to[t]
+                if forward > bound:
+                    bound = forward
+                if backward > bound:
+                    bound = backward
+            if bound < best:
+                best = bound
+        return best
+
+    def distance_bound(self, node1: str, node2: str) -> float:
+        """
+        Lower bound of the cost from node1 to node2.
+        """
+        u = self.ids.get(node1)
+        v = self.ids.get(node2)
+        if u is None or v is None:
+            return math.inf
+        bound = 0.0
+        for (distances_from, distances_to) in self.tables:
+            forward = distances_from[v] - distances_from[u]
+            backward = distances_to[u] - distances_to[v]
+            if forward > bound:
+                bound = forward
+            if backward > bound:
+                bound = backward
+        return bound
+
+    def _targets(self, targets: list[str]) -> list[int]:
+        key = tuple(targets)
+        if self._target_cache[0] != key:
+            ids = self.ids
+            self._target_cache = (key, [ids[target] for target in targets if target in ids])
+        return self._target_cache[1]
+
+    def update(self, graph, changed: list[int], workers: int=None) -> "Landmarks":
+        """
+        Get the tables for the graph after the given edge slots changed, recomputing only the landmarks
+        whose distances can have changed: a cheaper edge that shortens a route from/to the landmark, or a
+        more expensive edge that was on one of its shortest routes.
+        :param graph: Graph with the new edge costs (same zones and edges as when built).
+        :param changed: Edge slots changed (as returned by Graph.commit_version).
+        :return: This instance if no landmark is affected, otherwise a new one.
+        """
+        if self.topology is None:
+            self.topology = Topology(graph)
+        costs = array('d', graph.storage.costs)
+        changes = [(slot, self.costs[slot], costs[slot]) for slot in set(changed) if self.costs[slot] != costs[slot]]
+        if not changes:
+            return self
+        affected = [i for i, tables in enumerate(self.tables) if any(self._affects(tables, *change) for change in changes)]
+        tables = list(self.tables)
+        for i, table in zip(affected, compute_tables(self.topology, costs, [self.landmarks[i] for i in affected], workers)):
+            tables[i] = table
+        return Landmarks(self.ids, self.directed, self.landmarks, tables, costs, self.topology)
+
+    def _affects(self, tables: tuple, slot: int, old_cost: float, new_cost: float) -> bool:
+        u = self.topology.ends_u[slot]
+        v = self.topology.ends_v[slot]
+        if u < 0:
+            return False
+        distances_from, distances_to = tables
+        # Arc u -> v for the distances from the landmark, arc v <- u for the distances to it (both ways if undirected)
+        pairs = [(distances_from, u, v), (distances_to, v, u)]
+        if not self.directed:
+            pairs = [(distances_from, u, v), (distances_from, v, u)]
+        for (distances, a, b) in pairs:
+            if math.isinf(distances[a]):
+                continue
+            if new_cost < old_cost and distances[a] + new_cost < distances[b]:
+                return True
+            if new_cost > old_cost and math.isclose(distances[a] + old_cost, distances[b]):
+                return True
+        return False
+
+    def sections(self) -> dict[str, array]:
+        """
+        Columns to store the tables alongside the graph (see classes/binary.py save_graph extra_sections).
+        """
+        directed = self.directed
+        columns = {
+            "lm_nodes": array('i', self.landmarks),
+            "lm_from": array('d'),
+            "lm_costs": array('d', self.costs)
+        }
+        if directed:
+            columns["lm_to"] = array('d')
+        for (distances_from, distances_to) in self.tables:
+            columns["lm_from"].frombytes(memoryview(distances_from).cast("B"))
+            if directed:
+                columns["lm_to"].frombytes(memoryview(distances_to).cast("B"))
+        return columns
+
+    @classmethod
+    def from_sections(cls, graph, sections: dict) -> "Landmarks":
+        """
+        Get the tables stored with a graph file (views of the file, nothing is recomputed).
+        :return: Landmarks, or None if the file has no landmark tables.
+        """
+        if "lm_nodes" not in sections:
+            return None
+        storage = graph.storage
+        ids = storage.ids if hasattr(storage, "ids") else {zone.get_name(): zone_id for zone_id, zone in enumerate(graph.get_nodes())}
+        n = len(ids)
+        tables = []
+        for i in range(len(sections["lm_nodes"])):
+            distances_from = sections["lm_from"][i * n:(i + 1) * n]
+            distances_to = sections["lm_to"][i * n:(i + 1) * n] if "lm_to" in sections else distances_from
+            tables.append((distances_from, distances_to))
+        return cls(ids, graph.is_directed(), sections["lm_nodes"].tolist(), tables, sections["lm_costs"])
@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import utils.notify
+from classes.graph import Graph
+from classes.algorithms import DFS, BFS, AStar, Greedy, UniformCost, HillClimb
+from utils.notify import notify
+
+# Algorithms run by default (the ones offered by main.py one at a time)
+DEFAULT_ALGORITHMS: tuple = (DFS, BFS, AStar, Greedy, UniformCost, HillClimb)
+# "first": the first feasible answer wins and the rest are cancelled; "best": wait for all and return the cheapest answer
+POLICIES: tuple[str, ...] = ("first", "best")
+
+""" Worker process state (set once per worker by _init_worker) """
+_worker_graph = None
+
+def _init_worker(path: str):
+    global _worker_graph
+    _worker_graph = Graph.load(path) # Memory-mapped: every worker shares the pages of the same file
+    utils.notify.DEBUG = False
+    sys.stdout = open(os.devnull, "w") # Warnings of the algorithms stay in the workers
+
+def _run(algorithm, start_node: str, end_nodes: list[str], peso: int) -> tuple:
+    with _worker_graph.snapshot() as snapshot:
+        begin = time.perf_counter()
+        result = algorithm(start_node, list(end_nodes), snapshot.query(), peso)
+        elapsed = time.perf_counter() - begin
+        # Answers are ranked by the cost of their path in the graph (UniformCost reports the fuel it used instead)
+        return result, None if result is None else snapshot.calcula_custo(result[0]), elapsed
+
+class Portfolio:
+    def __init__(self, graph: Graph, algorithms: tuple=DEFAULT_ALGORITHMS, workers: int=None):
+        """
+        Runs several search algorithms at the same time on a pool of worker processes.
+        The graph is saved once to a temporary binary file that every worker memory-maps read-only (see Graph.load),
+        instead of pickling a copy of the graph per task; it is saved again when the graph commits a new version.
+        :param graph: Graph to search.
+        :param algorithms: Algorithms of the portfolio (functions of classes/algorithms.py).
+        :param workers: Number of processes (default: one per algorithm, up to the number of CPUs).
+        """
+        self.graph = graph
+        self.algorithms = tuple(algorithms)
+        self.workers = workers or min(len(self.algorithms), os.cpu_count() or 1)
+        descriptor, self.path = tempfile.mkstemp(suffix=".graph")
+        os.close(descriptor)
+        self.version = None
+        self.pool = None
+
+    def __enter__(self) -> "Portfolio":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Stop the workers and remove the graph file.
+        """
+        self._stop()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _start(self):
+        if self.version != self.graph.get_version():
+            self._stop()
+            self.graph.save(self.path)
+            self.version = self.graph.get_version()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.path,))
+
+    def _stop(self):
+        """
+        Shut the pool down, terminating the workers still running a task (ProcessPoolExecutor only cancels pending ones).
+        """
+        if self.pool is None:
+            return
+        processes = list((self.pool._processes or {}).values())
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        self.pool = None
+
+    def solve(self, start_node: str, end_nodes: list[str], peso: int=0, policy: str="first", stats: dict=None):
+        """
+        Run every algorithm of the portfolio on the same query.
+        :param start_node: Nodo inicial.
+        :param end_nodes: Lista de nodos finais.
+        :param peso: Peso a ser transportado.
+        :param policy: "first" returns the first feasible answer and cancels the algorithms still running (their workers are
+                       restarted on the next query); "best" waits for all and returns the answer whose path is cheapest in the graph.
+        :param stats: Optional dict where the "winner" (name of the algorithm whose answer was returned), the wall time of each
+                      algorithm in seconds ("times", None if cancelled), the cost of the path it found in the graph ("costs", None if none) and the
+                      total wall time ("seconds") are recorded.
+        :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown portfolio policy: {policy}. Use one of {list(POLICIES)}.")
+        self._start()
+        begin = time.perf_counter()
+        futures = {self.pool.submit(_run, algorithm, start_node, list(end_nodes), peso): algorithm.__name__ for algorithm in self.algorithms}
+        times = dict.fromkeys(futures.values())
+        costs = dict.fromkeys(futures.values())
+        best = winner = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    result, costs[name], times[name] = future.result()
+                except Exception as error: # e.g. RecursionError of DFS on large graphs
+                    notify("warning", f"{name} falhou: {error!r}")
+                    continue
+                if result is None:
+                    continue
+                if best is None or costs[name] < costs[winner]:
+                    best, winner = result, name
+            if policy == "first" and best is not None:
+                break
+        if pending:
+            notify("debug", f"{winner} respondeu primeiro, a cancelar {[futures[future] for future in pending]}")
+            self._stop()
+        seconds = time.perf_counter() - begin
+        if stats is not None:
+            stats.update(winner=winner, times=times, costs=costs, seconds=seconds)
+        return best
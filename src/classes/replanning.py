@@ -0,0 +1,171 @@
+import math
+from array import array
+from heapq import heappush, heappop
+
+from classes.graph import Graph
+from classes.vehicle import Vehicle
+from utils.notify import notify
+
+class IncrementalPlanner:
+    def __init__(self, graph: Graph, start_node: str, end_nodes: list[str], peso: int=0):
+        """
+        Incremental route planner (D* Lite) that keeps its search between changes of the graph.
+        The search runs backward from the zones to reach, so g[node] is the cost of the cheapest route from node to the nearest zone;
+        when edges change (update) only the nodes whose cost can have changed are repaired, and when the vehicle moves (move)
+        the tree stays valid and only the new position has to be made consistent.
+        Routes use the edges with a vehicle able to carry the load (see Graph.vehicle_table) and minimise the edge cost, like
+        AStar without fuel or TTL limits (they depend on the whole route, not on one edge, so they are only checked by route).
+        There is no heuristic: the heuristic table estimates the cost to the zones, not from the position of the vehicle.
+        The zones and edges of the graph must not change while the planner is used, only their data (DynamicGraph.simulate).
+        :param graph: Graph to plan on (the live graph, kept in sync with update).
+        :param start_node: Position of the vehicle.
+        :param end_nodes: Zones to reach (the route goes to the cheapest one).
+        :param peso: Peso a ser transportado.
+        """
+        self.graph = graph
+        self.start_node = start_node
+        self.end_nodes = set(end_nodes)
+        self.vehicle_table = graph.vehicle_table(peso)
+        self.g: dict[str, float] = {}
+        self.rhs: dict[str, float] = {}
+        self.queue = [] # Heap of (key, node) with lazy deletion: an entry is valid while queued[node] is its key
+        self.queued: dict[str, float] = {}
+        self.expansions = 0
+        self.origins: dict[int, list[tuple[str, str]]] = None # Arcs of each edge slot (see update)
+        # Edge costs and vehicle masks the search was built with, to know how each changed edge changed
+        self.costs = array('d', graph.storage.costs)
+        self.masks = array('H', graph.storage.vehicle_mask)
+        for end_node in self.end_nodes:
+            self.rhs[end_node] = 0
+            self._check(end_node)
+        self._compute()
+
+    def _cost(self, slot: int) -> float:
+        if self.vehicle_table[self.graph.get_edge_mask(slot)] is None:
+            return math.inf
+        return self.graph.get_edge_cost(slot)
+
+    def _check(self, node: str):
+        # Queue the node while it is inconsistent (g != rhs), with key min(g, rhs)
+        g = self.g.get(node, math.inf)
+        rhs = self.rhs.get(node, math.inf)
+        if g != rhs:
+            self.queued[node] = min(g, rhs)
+            heappush(self.queue, (min(g, rhs), node))
+        else:
+            self.queued.pop(node, None)
+
+    def _recompute(self, node: str):
+        # rhs from every successor (only needed when the successor that gave the current rhs got more expensive)
+        best = math.inf
+        for (adjacente, slot, _) in self.graph.edges_of(node):
+            cost = self._cost(slot) + self.g.get(adjacente, math.inf)
+            if cost < best:
+                best = cost
+        self.rhs[node] = best
+
+    def _relax(self, origem: str, slot: int, old_cost: float, new_cost: float, old_g: float, new_g: float):
+        """
+        Update rhs[origem] after the cost of its edge to a successor went from old_cost + old_g to new_cost + new_g.
+        """
+        if origem in self.end_nodes:
+            return
+        rhs = self.rhs.get(origem, math.inf)
+        if new_cost + new_g < rhs:
+            self.rhs[origem] = new_cost + new_g
+        elif rhs == old_cost + old_g and not math.isinf(rhs):
+            self._recompute(origem)
+        else:
+            return
+        self._check(origem)
+
+    def _compute(self):
+        """
+        Expand the inconsistent nodes (g != rhs) in key order until the position of the vehicle is consistent
+        and no queued node can change its cost.
+        """
+        queue = self.queue
+        while queue:
+            key, node = queue[0]
+            if self.queued.get(node) != key:
+                heappop(queue)
+                continue
+            start_g = self.g.get(self.start_node, math.inf)
+            start_rhs = self.rhs.get(self.start_node, math.inf)
+            if key >= min(start_g, start_rhs) and start_g == start_rhs:
+                break
+            heappop(queue)
+            del self.queued[node]
+            self.expansions += 1
+            g = self.g.get(node, math.inf)
+            rhs = self.rhs.get(node, math.inf)
+            if g > rhs:
+                self.g[node] = rhs # Custo desceu: fica definitivo
+            else:
+                self.g[node] = math.inf # Custo subiu: volta a ser calculado a partir dos sucessores
+                self._check(node)
+            for (origem, slot) in self.graph.incoming_edges(node):
+                cost = self._cost(slot)
+                self._relax(origem, slot, cost, cost, g, self.g[node])
+
+    def update(self, changed: list[int]) -> int:
+        """
+        Repair the search after edges changed.
+        :param changed: Edge slots changed (as returned by Graph.commit_version or DynamicGraph.simulate).
+        :return: Number of nodes expanded by the repair.
+        """
+        before = self.expansions
+        if self.origins is None:
+            # Both directions of an undirected edge share its slot
+            self.origins = {}
+            for zone in self.graph.get_nodes():
+                for (adjacente, slot, _) in self.graph.edges_of(zone.get_name()):
+                    self.origins.setdefault(slot, []).append((zone.get_name(), adjacente))
+        for slot in set(changed):
+            old_cost = math.inf if self.vehicle_table[self.masks[slot]] is None else self.costs[slot]
+            new_cost = self._cost(slot)
+            self.costs[slot] = self.graph.get_edge_cost(slot)
+            self.masks[slot] = self.graph.get_edge_mask(slot)
+            if new_cost != old_cost:
+                for (origem, adjacente) in self.origins.get(slot, ()):
+                    g = self.g.get(adjacente, math.inf)
+                    self._relax(origem, slot, old_cost, new_cost, g, g)
+        self._compute()
+        return self.expansions - before
+
+    def move(self, node: str) -> int:
+        """
+        Move the vehicle to another node (usually the next one of its route) and plan from there.
+        :return: Number of nodes expanded to reach a consistent cost at the new position.
+        """
+        before = self.expansions
+        self.start_node = node
+        self._compute()
+        return self.expansions - before
+
+    def route(self) -> tuple[list[str], float, Vehicle]:
+        """
+        Get the current route from the position of the vehicle, following the cheapest successor of each node.
+        Warns if the route reaches its zone after the TTL.
+        :return: Tupla (caminho, custo_total, veículo) se encontrar, caso contrário, None.
+        """
+        node = self.start_node
+        if math.isinf(self.g.get(node, math.inf)) and node not in self.end_nodes:
+            return None
+        path = [node]
+        vehicle = None
+        cost = elapsed = 0
+        while node not in self.end_nodes:
+            best = None
+            for (adjacente, slot, (travel_time, _, _, _)) in self.graph.edges_of(node):
+                candidate = self._cost(slot) + self.g.get(adjacente, math.inf)
+                if best is None or candidate < best[0]:
+                    best = (candidate, adjacente, slot, travel_time)
+            _, node, slot, travel_time = best
+            cost += self.graph.get_edge_cost(slot)
+            elapsed += travel_time
+            vehicle = self.vehicle_table[self.graph.get_edge_mask(slot)]
+            path.append(node)
+        if elapsed >= self.graph.get_node(node).get_ttl():
+            notify("warning", f"A rota chega a {node} em {elapsed}, depois do TTL ({self.graph.get_node(node).get_ttl()})")
+        return (path, cost, vehicle)
@@ -0,0 +1,40 @@
+from bisect import bisect_left, bisect_right
+
+class Skyline:
+    __slots__ = ("fuels", "times")
+
+    def __init__(self):
+        """
+        Pareto front of the (fuel used, elapsed time) of the labels settled at one node.
+        Kept as a staircase: fuels strictly increasing and times strictly decreasing, so a dominance test
+        is one binary search and an insertion only removes a contiguous run of entries.
+        Labels are settled in non-decreasing cost order, so every settled label is at least as cheap as a
+        new one and cost does not need to be stored.
+        """
+        self.fuels: list[float] = []
+        self.times: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self.fuels)
+
+    def dominates(self, fuel: float, time: float) -> bool:
+        """
+        Check if some label of the front uses no more fuel and no more time.
+        """
+        i = bisect_right(self.fuels, fuel) - 1
+        return i >= 0 and self.times[i] <= time
+
+    def insert(self, fuel: float, time: float) -> bool:
+        """
+        Add a label to the front, removing the labels it dominates.
+        :return: False if the label is dominated (and was not added).
+        """
+        if self.dominates(fuel, time):
+            return False
+        start = bisect_left(self.fuels, fuel)
+        end = start
+        while end < len(self.times) and self.times[end] >= time:
+            end += 1
+        self.fuels[start:end] = [fuel]
+        self.times[start:end] = [time]
+        return True
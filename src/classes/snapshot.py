@@ -0,0 +1,189 @@
+import copy
+import math
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+from classes.graph import Graph
+from classes.zone import Zone
+from classes.storage import edge_cost
+from classes.vehicle import VEHICLE_TYPES, Vehicle, VehicleType, vehicle_mask
+
+class GraphSnapshot(Graph):
+    def __init__(self, graph: Graph):
+        """
+        Read-only view of a graph pinned at its current version.
+        Shares the zones and edge storage of the graph (no copies): edges changed after the pinned
+        version are read from the graph's version log. Several queries can read the same snapshot
+        while the graph keeps producing new versions.
+        :param graph: Graph to pin.
+        """
+        self.base = graph
+        self.storage = graph.storage
+        self.directed = graph.directed
+        self.heuristics = graph.heuristics
+        self.landmarks = graph.landmarks
+        self.incoming = graph.incoming
+        self.versions = graph.versions
+        self.version = graph.versions.pin()
+        self.released = False
+
+    def __enter__(self) -> "GraphSnapshot":
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def release(self):
+        """
+        Unpin the version (the snapshot must not be used afterwards).
+        """
+        if not self.released:
+            self.released = True
+            self.versions.release(self.version)
+
+    def query(self) -> "QueryView":
+        """
+        Get a per-query view of this snapshot, where the algorithms can change zone TTLs and vehicle ranges.
+        """
+        return QueryView(self)
+
+    @property
+    def graph(self) -> dict[str, list[Any]]:
+        return SnapshotAdjacency(self)
+
+    def get_version(self) -> int:
+        return self.version
+
+    def edges_of(self, node: str) -> list[tuple]:
+        """
+        Get the outgoing edges of a zone as they were at the pinned version.
+        :return: List of (adjacente, slot, (travel_time, fuel_cost, good_conditions, vehicles)).
+        """
+        edges = self.storage.edges_of(node) # Live data first, then the version log
+        versions = self.versions
+        result = []
+        for (adjacente, slot, data) in edges:
+            old = versions.lookup(slot, self.version)
+            if old is not None:
+                data = old
+            result.append((adjacente, slot, data))
+        return result
+
+    def get_edge_data(self, node1: str, node2: str) -> tuple:
+        data = self.storage.get_edge(node1, node2)
+        if data is not None:
+            old = self.versions.lookup(self.storage.edge_slot(node1, node2), self.version)
+            if old is not None:
+                data = old
+        return data
+
+    def edge_cost_function(self, node1: str, node2: str) -> float:
+        slot = self.storage.edge_slot(node1, node2)
+        if slot is None:
+            return math.inf
+        return self.get_edge_cost(slot)
+
+    def get_edge_cost(self, slot: int) -> float:
+        cost = self.storage.costs[slot]
+        old = self.versions.lookup(slot, self.version)
+        if old is not None:
+            cost = edge_cost(*old[:3])
+        return cost
+
+    def get_edge_mask(self, slot: int) -> int:
+        old = self.versions.lookup(slot, self.version)
+        return self.storage.vehicle_mask[slot] if old is None else vehicle_mask(old[3])
+
+    def vehicles(self, vehicles: set) -> set:
+        """
+        Hook to rebind the vehicle set of an edge (the snapshot returns the stored set).
+        """
+        return vehicles
+
+    """ The snapshot is read-only """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Graph snapshots are read-only.")
+
+    add_node = _read_only
+    add_edge = _read_only
+    add_heuristic = _read_only
+    build_landmarks = _read_only
+    update_edge = _read_only
+    commit_version = _read_only
+    set_graph = _read_only
+    set_directed = _read_only
+
+class QueryView(GraphSnapshot):
+    def __init__(self, snapshot: GraphSnapshot):
+        """
+        Per-query overlay over a snapshot. Zones are copied on first access (copy-on-write) so the
+        algorithms can change their TTL, and the vehicles of every edge are bound to private copies
+        of VEHICLE_TYPES so fuel changes stay inside the query. Nothing else is copied.
+        :param snapshot: Pinned snapshot to read (it is not released by the view).
+        """
+        self.snapshot = snapshot
+        self.base = snapshot.base
+        self.storage = snapshot.storage
+        self.directed = snapshot.directed
+        self.heuristics = snapshot.heuristics
+        self.landmarks = snapshot.landmarks
+        self.incoming = snapshot.incoming
+        self.versions = snapshot.versions
+        self.version = snapshot.version
+        self.released = True # The pin belongs to the snapshot
+        self.zones: dict[str, Zone] = {}
+        self.vehicle_types = {t: copy.copy(vehicle) for t, vehicle in VEHICLE_TYPES.items()}
+        self._vehicle_sets: dict[int, frozenset] = {}
+
+    @property
+    def nodes(self) -> list[Zone]:
+        return [self.zones.get(zone.get_name(), zone) for zone in self.storage.zones]
+
+    def get_node(self, node: str) -> Zone:
+        zone = self.zones.get(node)
+        if zone is None:
+            zone = self.storage.get_zone(node)
+            if zone is not None:
+                zone = copy.copy(zone)
+                self.zones[node] = zone
+        return zone
+
+    def get_vehicle_types(self) -> dict[int, Vehicle]:
+        return self.vehicle_types
+
+    def vehicles(self, vehicles: set) -> frozenset:
+        mask = vehicle_mask(vehicles)
+        bound = self._vehicle_sets.get(mask)
+        if bound is None:
+            types = []
+            for vehicle in vehicles:
+                vt = VehicleType(vehicle.get_type())
+                vt.set_vehicle_types(self.vehicle_types)
+                types.append(vt)
+            bound = frozenset(types)
+            self._vehicle_sets[mask] = bound
+        return bound
+
+class SnapshotAdjacency(Mapping):
+    def __init__(self, snapshot: GraphSnapshot):
+        """
+        Dict-like view of the adjacency of a snapshot (same tuples as `Graph.graph[node]`).
+        """
+        self.snapshot = snapshot
+
+    def __getitem__(self, node: str) -> list[Any]:
+        snapshot = self.snapshot
+        return [(adjacente, (travel_time, fuel_cost, good_conditions, snapshot.vehicles(vehicles)))
+                for (adjacente, _, (travel_time, fuel_cost, good_conditions, vehicles)) in snapshot.edges_of(node)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot.storage.adjacency)
+
+    def __len__(self) -> int:
+        return len(self.snapshot.storage.adjacency)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self.snapshot.storage.adjacency
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
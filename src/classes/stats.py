@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+
+# Counters recorded by every search of classes/algorithms.py in its stats dict
+COUNTERS: tuple[str, ...] = ("expansions", "relaxed", "pushes", "pops", "peak_frontier", "pruned_fuel", "pruned_ttl", "pruned_vehicle")
+# Counters that are maxima (add_stats keeps the largest instead of the sum)
+PEAKS: tuple[str, ...] = ("peak_frontier", "peak_bytes", "peak_open", "peak_nodes", "max_front")
+
+class SearchStats(dict):
+    def __init__(self, memory: bool=False):
+        """
+        Record of one search (or of many, see add), passed as the stats of the algorithms of classes/algorithms.py.
+        It is a plain dict, so every algorithm fills it like the dicts it already accepted: the COUNTERS (nodes expanded,
+        edges relaxed out of them, frontier pushes and pops, peak frontier size and edges pruned by fuel, TTL and vehicle),
+        the wall time of each phase as "<phase>_s" (the whole search in "search_s", see measure, and some phases of the
+        algorithms inside it) and the keys of each algorithm (see its docstring).
+        Nothing is counted when an algorithm gets no stats.
+        :param memory: Also trace the peak memory of the search ("peak_bytes") with tracemalloc, which slows it down several times.
+        """
+        super().__init__()
+        self.memory = memory
+
+    def counter(self, key: str) -> int:
+        """
+        Get a counter, 0 if the search did not record it.
+        """
+        return self.get(key, 0)
+
+    def phases(self) -> dict[str, float]:
+        """
+        Get the wall time of each phase.
+        :return: Dict phase -> seconds.
+        """
+        return {key[:-2]: value for key, value in self.items() if key.endswith("_s")}
+
+    def add(self, stats: dict):
+        """
+        Add the stats of another search to this record (see add_stats).
+        """
+        add_stats(self, stats)
+
+def add_stats(total: dict, stats: dict):
+    """
+    Add the stats of one search to the totals of many: counters and phase times are summed and peaks keep the largest value.
+    Non-numeric values (and flags) are kept from the last search.
+    :param total: Dict of the totals (changed in place).
+    :param stats: Stats of one search.
+    """
+    for key, value in stats.items():
+        if key in PEAKS:
+            total[key] = max(total.get(key, 0), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+        else:
+            total[key] = value
+
+@contextmanager
+def measure(stats: dict, phase: str="search"):
+    """
+    Time a phase of a search into stats["<phase>_s"] (added to the time already there) and, for a SearchStats with memory,
+    trace its peak memory into "peak_bytes". Tracing is skipped if something else is already tracing (tracemalloc is global).
+    :param stats: Stats of the search, or None to measure nothing.
+    :param phase: Name of the phase.
+    """
+    if stats is None:
+        yield
+        return
+    tracing = getattr(stats, "memory", False)
+    if tracing:
+        import tracemalloc
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        key = phase + "_s"
+        stats[key] = stats.get(key, 0.0) + time.perf_counter() - begin
+        if tracing:
+            stats["peak_bytes"] = max(stats.get("peak_bytes", 0), tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
@@ -0,0 +1,549 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+from classes.zone import Zone
+from classes.vehicle import VEHICLE_TYPES, VehicleType, vehicle_mask
+
+# Multiplier applied to the cost of an edge when the road conditions are bad
+BAD_WEATHER_FACTOR: float = 1.5
+
+def edge_cost(travel_time: int, fuel_cost: int, good_conditions: bool) -> float:
+    """
+    Cost of a single edge. (Cost function definition)
+    :param travel_time: Travel time of the edge.
+    :param fuel_cost: Fuel cost of the edge.
+    :param good_conditions: Boolean indicating if the road conditions are good.
+    :return: Cost of the edge.
+    """
+    # o custo será o tempo de viagem entre os dois nodos a dividir pelo custo do combustível e se não houver boas condições o tempo é 1.5 vezes maior
+    return travel_time / fuel_cost if good_conditions else travel_time / fuel_cost * BAD_WEATHER_FACTOR
+
+class DictStorage:
+    def __init__(self):
+        """
+        Original graph storage: adjacency lists of edge tuples indexed by zone name.
+        Keeps a name -> Zone index and role indexes so lookups do not scan the zone list,
+        and a hashed (node1, node2) -> edge slot index into cached per-edge cost and vehicle mask vectors.
+        The slot of every arc is also kept next to the adjacency lists, so parallel edges keep their own slots.
+        """
+        self.adjacency: dict[str, list[Any]] = {}
+        self.arc_slots: dict[str, array] = {}
+        self.zones: list[Zone] = []
+        self.index: dict[str, Zone] = {}
+        self.camp: list[str] = []
+        self.affected: list[str] = []
+        self.roles_seen = Zone.role_changes
+        self.edge_index: dict[tuple[str, str], int] = {}
+        self.costs = array('d')
+        self.vehicle_mask = array('H')
+        # Vehicles of the VehicleType objects of the edges (see Graph.get_vehicle_types)
+        self.vehicle_types = VEHICLE_TYPES
+
+    def add_zone(self, zone: Zone) -> bool:
+        """
+        Add a zone to the storage if it is not there yet.
+        :param zone: Zone to add.
+        :return: True if the zone was added, False if it already existed.
+        """
+        name = zone.get_name()
+        if name in self.index:
+            return False
+        self.zones.append(zone)
+        self.index[name] = zone
+        self.adjacency.setdefault(name, [])
+        self.arc_slots.setdefault(name, array('i'))
+        self._index_roles(zone)
+        return True
+
+    def get_zone(self, name: str) -> Zone:
+        return self.index.get(name)
+
+    def camp_node(self) -> str:
+        if self.roles_seen != Zone.role_changes:
+            self.reindex_roles()
+        return self.camp[0] if self.camp else None
+
+    def affected_nodes(self) -> list[str]:
+        if self.roles_seen != Zone.role_changes:
+            self.reindex_roles()
+        return list(self.affected)
+
+    def reindex_roles(self):
+        """
+        Rebuild the camp and affected role indexes. Done on read whenever some zone changed its camp flag or
+        severity since the last rebuild (see Zone.role_changes).
+        """
+        self.camp = []
+        self.affected = []
+        for zone in self.zones:
+            self._index_roles(zone)
+        self.roles_seen = Zone.role_changes
+
+    def _index_roles(self, zone: Zone):
+        if zone.is_camp():
+            self.camp.append(zone.get_name())
+        if zone.get_severity() > 0:
+            self.affected.append(zone.get_name())
+
+    def add_edge(self, node1: str, node2: str, data: tuple, directed: bool):
+        """
+        Add an edge between two zones already present in the storage.
+        :param node1: Name of the origin zone.
+        :param node2: Name of the destination zone.
+        :param data: Tuple (travel_time, fuel_cost, good_conditions, vehicles).
+        :param directed: If False the reverse edge is added too (sharing the same edge slot).
+        """
+        slot = len(self.costs)
+        self.costs.append(edge_cost(*data[:3]))
+        self.vehicle_mask.append(vehicle_mask(data[3]))
+        self.adjacency[node1].append((node2, data))
+        self.arc_slots[node1].append(slot)
+        self.edge_index[(node1, node2)] = slot
+        if not directed:
+            self.adjacency[node2].append((node1, data)) # Add edge in both directions (undirected graph)
+            self.arc_slots[node2].append(slot)
+            self.edge_index[(node2, node1)] = slot
+
+    def set_edge(self, node1: str, node2: str, data: tuple, directed: bool):
+        """
+        Replace the data of an existing edge and refresh its cached cost and vehicle mask.
+        :param node1: Name of the origin zone.
+        :param node2: Name of the destination zone.
+        :param data: Tuple (travel_time, fuel_cost, good_conditions, vehicles).
+        :param directed: If False the reverse edge is updated too.
+        """
+        self._replace(node1, node2, data)
+        if not directed:
+            self._replace(node2, node1, data)
+
+    def _replace(self, node1: str, node2: str, data: tuple):
+        slot = self.edge_index.get((node1, node2))
+        if slot is None:
+            raise KeyError(f"Edge {node1} -> {node2} not found.")
+        edges = self.adjacency[node1]
+        for idx, arc_slot in enumerate(self.arc_slots[node1]):
+            if arc_slot == slot:
+                edges[idx] = (node2, data)
+                break
+        self.costs[slot] = edge_cost(*data[:3])
+        self.vehicle_mask[slot] = vehicle_mask(data[3])
+
+    def has_edge(self, node1: str, node2: str) -> bool:
+        return (node1, node2) in self.edge_index
+
+    def edge_slot(self, node1: str, node2: str) -> int:
+        return self.edge_index.get((node1, node2))
+
+    def get_edge(self, node1: str, node2: str) -> tuple:
+        for (adjacente, data) in self.adjacency.get(node1, []):
+            if adjacente == node2:
+                return data
+        return None
+
+    def edges_of(self, node: str) -> list[tuple]:
+        """
+        Get the outgoing edges of a zone with their slots.
+        :return: List of (adjacente, slot, (travel_time, fuel_cost, good_conditions, vehicles)).
+        """
+        return [(adjacente, slot, data) for ((adjacente, data), slot) in zip(self.adjacency[node], self.arc_slots[node])]
+
+    def set_adjacency(self, adjacency: dict[str, list[Any]]):
+        """
+        Replace every edge with the ones in an adjacency dict (each listed edge is indexed as directed).
+        """
+        self.adjacency = adjacency
+        self.arc_slots = {}
+        self.edge_index = {}
+        self.costs = array('d')
+        self.vehicle_mask = array('H')
+        for node, edges in adjacency.items():
+            self.arc_slots[node] = array('i')
+            for (adjacente, data) in edges:
+                self.arc_slots[node].append(len(self.costs))
+                self.edge_index[(node, adjacente)] = len(self.costs)
+                self.costs.append(edge_cost(*data[:3]))
+                self.vehicle_mask.append(vehicle_mask(data[3]))
+
+class CSRStorage:
+    # Array columns of the storage and their typecodes (also the layout of the binary format, see classes/binary.py)
+    COLUMNS: tuple[tuple[str, str], ...] = (
+        ("travel_time", 'i'), ("fuel_cost", 'i'), ("conditions", 'b'), ("vehicle_mask", 'H'), ("costs", 'd'),
+        ("offsets", 'q'), ("targets", 'i'), ("arc_edges", 'i')
+    )
+    # Staged arcs are merged on a read once there are more than this fraction of the zones and compacted arcs
+    # (and at least COMPACT_MIN), so a compaction (O(V + E)) is amortised over the arcs added before it
+    COMPACT_RATIO: float = 0.25
+    COMPACT_MIN: int = 1024
+
+    def __init__(self):
+        """
+        Compressed-sparse-row graph storage.
+        Zone names are interned to dense integer ids. Edge attributes live in column arrays indexed
+        by edge slot (travel_time, fuel_cost, conditions, vehicle_mask, costs); the arcs of zone `u`
+        are the positions offsets[u]:offsets[u+1] of the CSR arrays (targets, arc_edges), and both
+        directions of an undirected edge point to the same slot. New arcs are staged (and read from
+        the staging buffers) until enough of them are merged into the CSR arrays at once (see compact).
+        """
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self.zones: list[Zone] = []
+        self.camp_ids: list[int] = []
+        self.affected_ids: list[int] = []
+        self.roles_seen = Zone.role_changes
+        # Edge columns (indexed by edge slot)
+        self.travel_time = array('i')
+        self.fuel_cost = array('i')
+        self.conditions = array('b')
+        self.vehicle_mask = array('H')
+        self.costs = array('d')
+        # CSR arrays (indexed by arc position)
+        self.offsets = array('q', [0])
+        self.targets = array('i')
+        self.arc_edges = array('i')
+        # Arcs added since the last compaction (COO columns)
+        self._pending_src = array('i')
+        self._pending_dst = array('i')
+        self._pending_edge = array('i')
+        # Origin zone -> positions of its staged arcs in the COO columns
+        self._pending_rows: dict[int, list[int]] = {}
+        # Hashed (u, v) -> edge slot index, keys packed as u << 32 | v
+        self.edge_index: dict[int, int] = {}
+        # Vehicle sets decoded from masks are bound to this dict (so a deepcopy of the graph gets its own vehicles)
+        self.vehicle_types = VEHICLE_TYPES
+        self._vehicle_sets: dict[int, frozenset] = {}
+        self.adjacency = CSRAdjacency(self)
+        # True while the columns are views over a loaded file (see thaw)
+        self.mapped = False
+
+    def thaw(self):
+        """
+        Turn the views of a loaded file into growable arrays, lists and dicts, so zones and edges
+        can be added. Edge data can be changed in place without thawing.
+        """
+        if not self.mapped:
+            return
+        self.names = list(self.names)
+        self.zones = list(self.zones)
+        self.ids = {name: zone_id for zone_id, name in enumerate(self.names)}
+        for (column, typecode) in self.COLUMNS:
+            values = array(typecode)
+            values.frombytes(getattr(self, column).cast("B"))
+            setattr(self, column, values)
+        self.mapped = False
+
+    """ Zones """
+    def add_zone(self, zone: Zone) -> bool:
+        """
+        Intern a zone, giving it the next dense id.
+        :param zone: Zone to add.
+        :return: True if the zone was added, False if it already existed.
+        """
+        name = zone.get_name()
+        if name in self.ids:
+            return False
+        self.thaw()
+        zone_id = len(self.names)
+        self.ids[name] = zone_id
+        self.names.append(name)
+        self.zones.append(zone)
+        self.offsets.append(self.offsets[-1]) # New zone starts with an empty row
+        self._index_roles(zone_id)
+        return True
+
+    def get_zone(self, name: str) -> Zone:
+        zone_id = self.ids.get(name)
+        return None if zone_id is None else self.zones[zone_id]
+
+    def get_id(self, name: str) -> int:
+        return self.ids[name]
+
+    def get_name(self, zone_id: int) -> str:
+        return self.names[zone_id]
+
+    def camp_node(self) -> str:
+        if self.roles_seen != Zone.role_changes:
+            self.reindex_roles()
+        return self.names[self.camp_ids[0]] if self.camp_ids else None
+
+    def affected_nodes(self) -> list[str]:
+        if self.roles_seen != Zone.role_changes:
+            self.reindex_roles()
+        return [self.names[zone_id] for zone_id in self.affected_ids]
+
+    def reindex_roles(self):
+        """
+        Rebuild the camp and affected role indexes. Done on read whenever some zone changed its camp flag or
+        severity since the last rebuild (see Zone.role_changes). Zones of a loaded file that were never accessed
+        keep their file roles, so only the accessed ones are rescanned (see MappedZones.roles).
+        """
+        if self.mapped:
+            self.camp_ids, self.affected_ids = self.zones.roles()
+        else:
+            self.camp_ids = []
+            self.affected_ids = []
+            for zone_id in range(len(self.zones)):
+                self._index_roles(zone_id)
+        self.roles_seen = Zone.role_changes
+
+    def _index_roles(self, zone_id: int):
+        zone = self.zones[zone_id]
+        if zone.is_camp():
+            self.camp_ids.append(zone_id)
+        if zone.get_severity() > 0:
+            self.affected_ids.append(zone_id)
+
+    """ Edges """
+    def add_edge(self, node1: str, node2: str, data: tuple, directed: bool):
+        """
+        Store an edge record and stage its arcs between two zones already present in the storage.
+        :param node1: Name of the origin zone.
+        :param node2: Name of the destination zone.
+        :param data: Tuple (travel_time, fuel_cost, good_conditions, vehicles).
+        :param directed: If False the reverse arc is staged too (sharing the same edge slot).
+        """
+        self.thaw()
+        u = self.ids[node1]
+        v = self.ids[node2]
+        slot = len(self.costs)
+        self.travel_time.append(0)
+        self.fuel_cost.append(0)
+        self.conditions.append(0)
+        self.vehicle_mask.append(0)
+        self.costs.append(0.0)
+        self._write(slot, data)
+        self._stage(u, v, slot)
+        if not directed:
+            self._stage(v, u, slot)
+
+    def _stage(self, u: int, v: int, slot: int):
+        self._pending_rows.setdefault(u, []).append(len(self._pending_src))
+        self._pending_src.append(u)
+        self._pending_dst.append(v)
+        self._pending_edge.append(slot)
+        self.edge_index[u << 32 | v] = slot
+
+    def set_edge(self, node1: str, node2: str, data: tuple, directed: bool):
+        """
+        Replace the data of an existing edge in place and refresh its cached cost.
+        :param node1: Name of the origin zone.
+        :param node2: Name of the destination zone.
+        :param data: Tuple (travel_time, fuel_cost, good_conditions, vehicles).
+        :param directed: If False the reverse arc is updated too (when it has its own slot).
+        """
+        slot = self.edge_slot(node1, node2)
+        if slot is None:
+            raise KeyError(f"Edge {node1} -> {node2} not found.")
+        self._write(slot, data)
+        if not directed:
+            reverse = self.edge_slot(node2, node1)
+            if reverse is not None and reverse != slot:
+                self._write(reverse, data)
+
+    def _write(self, slot: int, data: tuple):
+        travel_time, fuel_cost, good_conditions, vehicles = data
+        self.travel_time[slot] = travel_time
+        self.fuel_cost[slot] = fuel_cost
+        self.conditions[slot] = 1 if good_conditions else 0
+        self.vehicle_mask[slot] = vehicle_mask(vehicles)
+        self.costs[slot] = edge_cost(travel_time, fuel_cost, good_conditions)
+
+    def has_edge(self, node1: str, node2: str) -> bool:
+        return self.edge_slot(node1, node2) is not None
+
+    def edge_slot(self, node1: str, node2: str) -> int:
+        u = self.ids.get(node1)
+        v = self.ids.get(node2)
+        if u is None or v is None:
+            return None
+        return self.edge_index.get(u << 32 | v)
+
+    def get_edge(self, node1: str, node2: str) -> tuple:
+        slot = self.edge_slot(node1, node2)
+        return None if slot is None else self.edge_data(slot)
+
+    def edges_of(self, node: str) -> list[tuple]:
+        """
+        Get the outgoing edges of a zone with their slots (compacted arcs first, then the staged ones, in insertion order).
+        :return: List of (adjacente, slot, (travel_time, fuel_cost, good_conditions, vehicles)).
+        """
+        u = self.ids[node]
+        if len(self._pending_src) > max(self.COMPACT_MIN, self.COMPACT_RATIO * (len(self.targets) + len(self.names))):
+            self.compact()
+        targets = self.targets
+        arc_edges = self.arc_edges
+        names = self.names
+        edges = [(names[targets[arc]], arc_edges[arc], self.edge_data(arc_edges[arc])) for arc in range(self.offsets[u], self.offsets[u + 1])]
+        staged = self._pending_rows.get(u)
+        if staged:
+            targets = self._pending_dst
+            arc_edges = self._pending_edge
+            edges.extend((names[targets[i]], arc_edges[i], self.edge_data(arc_edges[i])) for i in staged)
+        return edges
+
+    def row(self, u: int) -> range:
+        """
+        Get the CSR positions holding the outgoing arcs of a zone (staged arcs are merged first).
+        :param u: Id of the zone.
+        :return: Range of arc positions.
+        """
+        self.compact()
+        return range(self.offsets[u], self.offsets[u + 1])
+
+    def edge_data(self, slot: int) -> tuple:
+        """
+        Rebuild the legacy edge tuple (travel_time, fuel_cost, good_conditions, vehicles) of an edge slot.
+        """
+        return (self.travel_time[slot], self.fuel_cost[slot], bool(self.conditions[slot]), self.get_vehicles(self.vehicle_mask[slot]))
+
+    def get_vehicles(self, mask: int) -> frozenset:
+        """
+        Decode a vehicle mask into a set of VehicleType (cached per distinct mask).
+        """
+        vehicles = self._vehicle_sets.get(mask)
+        if vehicles is None:
+            types = []
+            for vehicle_type in self.vehicle_types:
+                if mask >> vehicle_type & 1:
+                    vt = VehicleType(vehicle_type)
+                    vt.set_vehicle_types(self.vehicle_types)
+                    types.append(vt)
+            vehicles = frozenset(types)
+            self._vehicle_sets[mask] = vehicles
+        return vehicles
+
+    def compact(self):
+        """
+        Merge the staged arcs into the CSR arrays with a stable counting sort by origin zone,
+        so each row keeps the insertion order of its arcs. O(V + E).
+        """
+        if not self._pending_src:
+            return
+        n = len(self.names)
+        offsets = self.offsets
+        # Origin of every arc: existing CSR rows followed by the staged arcs
+        src = array('i')
+        for u in range(n):
+            src.extend([u] * (offsets[u + 1] - offsets[u]))
+        src.extend(self._pending_src)
+        counts = [0] * (n + 1)
+        for u in src:
+            counts[u + 1] += 1
+        new_offsets = array('q', [0]) * (n + 1)
+        for u in range(n):
+            new_offsets[u + 1] = new_offsets[u] + counts[u + 1]
+        position = list(new_offsets[:n])
+        order = [0] * len(src)
+        for i, u in enumerate(src):
+            order[position[u]] = i
+            position[u] += 1
+        targets = self.targets + self._pending_dst
+        arc_edges = self.arc_edges + self._pending_edge
+        self.targets = array('i', [targets[i] for i in order])
+        self.arc_edges = array('i', [arc_edges[i] for i in order])
+        self.offsets = new_offsets
+        del self._pending_src[:]
+        del self._pending_dst[:]
+        del self._pending_edge[:]
+        self._pending_rows = {}
+
+    def set_adjacency(self, adjacency: dict[str, list[Any]]):
+        """
+        Replace every edge with the ones in a legacy adjacency dict (each listed arc is added as a directed edge).
+        """
+        self.thaw()
+        for column in (self.travel_time, self.fuel_cost, self.conditions, self.vehicle_mask, self.costs,
+                       self.targets, self.arc_edges, self._pending_src, self._pending_dst, self._pending_edge):
+            del column[:]
+        self.edge_index = {}
+        self._pending_rows = {}
+        self.offsets = array('q', [0]) * (len(self.names) + 1)
+        for node, edges in adjacency.items():
+            self.add_zone(self.get_zone(node) or Zone(node))
+            for (adjacente, data) in edges:
+                self.add_zone(self.get_zone(adjacente) or Zone(adjacente))
+                self.add_edge(node, adjacente, data, True)
+
+class CompactStorage(CSRStorage):
+    COLUMNS = CSRStorage.COLUMNS + (("keys", 'q'), ("key_slots", 'i'))
+
+    def __init__(self):
+        """
+        Memory-lean variant of CSRStorage (the "compact" backend).
+        Instead of a hash map with one entry per arc, compacted arcs are indexed by a sorted array of
+        packed (u << 32 | v) keys searched by bisection (12 bytes per arc, O(log E) lookups). Only the
+        arcs staged since the last compaction are kept in the hashed index.
+        """
+        super().__init__()
+        self.keys = array('q')
+        self.key_slots = array('i')
+
+    def edge_slot(self, node1: str, node2: str) -> int:
+        u = self.ids.get(node1)
+        v = self.ids.get(node2)
+        if u is None or v is None:
+            return None
+        key = u << 32 | v
+        slot = self.edge_index.get(key)
+        if slot is not None:
+            return slot
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.key_slots[i]
+        return None
+
+    def compact(self):
+        """
+        Merge the staged arcs into the CSR arrays and their keys into the sorted key index.
+        """
+        if not self._pending_src:
+            return
+        super().compact()
+        old_keys = self.keys
+        old_slots = self.key_slots
+        keys = array('q')
+        slots = array('i')
+        i = 0
+        for key, slot in sorted(self.edge_index.items()):
+            j = bisect_left(old_keys, key, i)
+            keys.extend(old_keys[i:j])
+            slots.extend(old_slots[i:j])
+            if j < len(old_keys) and old_keys[j] == key:
+                j += 1 # The newer edge replaces the old entry
+            keys.append(key)
+            slots.append(slot)
+            i = j
+        keys.extend(old_keys[i:])
+        slots.extend(old_slots[i:])
+        self.keys = keys
+        self.key_slots = slots
+        self.edge_index = {}
+
+    def set_adjacency(self, adjacency: dict[str, list[Any]]):
+        self.keys = array('q')
+        self.key_slots = array('i')
+        super().set_adjacency(adjacency)
+
+class CSRAdjacency(Mapping):
+    def __init__(self, storage: CSRStorage):
+        """
+        Read-only dict-like view of a CSRStorage, so `graph.graph[node]` keeps returning
+        a list of (adjacente, (travel_time, fuel_cost, good_conditions, vehicles)) tuples.
+        """
+        self.storage = storage
+
+    def __getitem__(self, node: str) -> list[Any]:
+        return [(adjacente, data) for (adjacente, _, data) in self.storage.edges_of(node)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.storage.names)
+
+    def __len__(self) -> int:
+        return len(self.storage.names)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self.storage.ids
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
@@ -0,0 +1,242 @@
+"""
+Seeded synthetic graphs of any size, independent of the world geometries of RandomGraph and DynamicGraph:
+random geometric graphs, grids with obstacles and scale-free graphs. Every attribute (travel time, fuel cost, road
+conditions and vehicles of the edges, population, severity and TTL of the zones) is sampled with NumPy over whole
+columns, and the columns become the storage of a compact graph directly (see binary.from_sections), with no Python
+object per zone or edge: generating a graph is linear in its number of edges apart from the NumPy sorts of its arcs
+(into the CSR rows and the sorted key index) and of its zone names.
+Other backends are rebuilt from the compact graph through the Graph API.
+"""
+
+import json
+
+from classes.graph import Graph
+from classes.binary import from_sections
+from classes.storage import BAD_WEATHER_FACTOR
+from classes.vehicle import VEHICLE_TYPES
+
+# Limits of the sampled attributes (the ones of RandomGraph and DynamicGraph)
+TRAVEL_TIME_LIMITS: tuple[int, int] = (30, 180)
+FUEL_COST_LIMITS: tuple[int, int] = (35, 70)
+GOOD_CONDITIONS_PROBABILITY: float = 0.85
+EDGE_VEHICLE_LIMITS: tuple[int, int] = (3, 4)
+POPULATION_LIMITS: tuple[int, int] = (1000, 10**6)
+SEVERITY_LIMITS: tuple[int, int] = (2, 4)
+TTL_LIMITS: tuple[int, int] = (800, 980)
+
+def geometric_graph(num_zones: int, degree: float=6.0, seed: int=0, backend: str="compact", affected: int=2, ttl_scale: int=1) -> Graph:
+    """
+    Random geometric graph: zones at uniform random points of the unit square, linked to every zone closer than the
+    radius that gives them the mean degree asked for. Close pairs are found in a grid of cells of that radius (each
+    zone is only compared with the zones of its cell and of the neighbouring cells), and the travel time of an edge
+    grows with its length. Zones are numbered cell by cell.
+    :param num_zones: Number of zones.
+    :param degree: Mean number of edges of a zone.
+    :param seed: Seed of the generator.
+    :param backend: Storage backend of the graph.
+    :param affected: Number of affected zones (severity > 0).
+    :param ttl_scale: Factor applied to the zone TTLs (long routes of large graphs exceed the default ones).
+    :return: Graph with about num_zones * degree / 2 edges.
+    """
+    if num_zones < 1:
+        raise ValueError(f"A geometric graph needs at least one zone (got {num_zones}).")
+    if degree <= 0:
+        raise ValueError(f"The mean degree of a geometric graph must be positive (got {degree}).")
+    import numpy as np # Loaded on demand (see benchmarks/startup.py)
+    rng = np.random.default_rng(seed)
+    points = rng.random((num_zones, 2))
+    radius = min(1.0, float(np.sqrt(degree / (np.pi * max(1, num_zones)))))
+    side = max(1, int(1 / radius))
+    cells = np.minimum((points * side).astype(np.int64), side - 1)
+    cell = cells[:, 0] * side + cells[:, 1]
+    # Zones are numbered by cell, so the zones of a cell are consecutive (and the points compared are close in memory)
+    order = np.argsort(cell, kind="stable")
+    points, cell = points[order], cell[order]
+    counts = np.bincount(cell, minlength=side * side)
+    starts = np.cumsum(counts) - counts
+    occupied = np.flatnonzero(counts)
+    sources, targets = [], []
+    # Each pair of neighbouring cells is visited once: the cell itself and the neighbours above and to the right
+    for (dx, dy) in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        x = occupied // side + dx
+        y = occupied % side + dy
+        inside = (x < side) & (y >= 0) & (y < side)
+        first = occupied[inside]
+        second = x[inside] * side + y[inside]
+        keep = counts[second] > 0
+        first, second = first[keep], second[keep]
+        # The i-th zone of the first cell against the j-th zone of the second, for the cells that have both (the cells
+        # are filtered as i and j grow, so the work is the number of pairs compared)
+        i = 0
+        while len(first):
+            has_i = counts[first] > i
+            first, second = first[has_i], second[has_i]
+            j = i + 1 if dx == dy == 0 else 0
+            first_j, second_j = first, second
+            while len(first_j):
+                has_j = counts[second_j] > j
+                first_j, second_j = first_j[has_j], second_j[has_j]
+                u = starts[first_j] + i
+                v = starts[second_j] + j
+                close = np.hypot(*(points[u] - points[v]).T) <= radius
+                sources.append(u[close])
+                targets.append(v[close])
+                j += 1
+            i += 1
+    u = np.concatenate(sources) if sources else np.empty(0, np.int64)
+    v = np.concatenate(targets) if targets else np.empty(0, np.int64)
+    length = np.hypot(*(points[u] - points[v]).T) / radius
+    low, high = TRAVEL_TIME_LIMITS
+    travel_time = np.rint(low + (high - low) * length).astype(np.int32)
+    return _graph("geometric", rng, num_zones, u, v, travel_time, seed, backend, affected, ttl_scale)
+
+def grid_graph(width: int, height: int, obstacles: float=0.2, seed: int=0, backend: str="compact", affected: int=2, ttl_scale: int=1) -> Graph:
+    """
+    Grid of zones linked to their horizontal and vertical neighbours, with a random fraction of the cells blocked
+    (blocked cells are not zones, so routes go around them).
+    :param width: Columns of the grid.
+    :param height: Rows of the grid.
+    :param obstacles: Probability of a cell being blocked.
+    :param seed: Seed of the generator.
+    :param backend: Storage backend of the graph.
+    :param affected: Number of affected zones (severity > 0).
+    :param ttl_scale: Factor applied to the zone TTLs.
+    :return: Graph with about (1 - obstacles) * width * height zones and twice as many edges (each zone is "Z<cell>").
+    """
+    if width < 1 or height < 1:
+        raise ValueError(f"A grid needs at least one row and one column (got {width}x{height}).")
+    if not 0 <= obstacles < 1:
+        raise ValueError(f"The obstacle probability of a grid must be in [0, 1) (got {obstacles}).")
+    import numpy as np # Loaded on demand (see benchmarks/startup.py)
+    rng = np.random.default_rng(seed)
+    free = rng.random(width * height) >= obstacles
+    if not free.any():
+        raise ValueError(f"Every cell of the {width}x{height} grid is blocked (seed {seed}).")
+    zone_of = np.cumsum(free) - 1 # Zone id of each free cell
+    cells = np.arange(width * height).reshape(height, width)
+    right = cells[:, :-1].ravel()
+    down = cells[:-1, :].ravel()
+    u_cells = np.concatenate((right, down))
+    v_cells = np.concatenate((right + 1, down + width))
+    open_edges = free[u_cells] & free[v_cells]
+    u = zone_of[u_cells[open_edges]]
+    v = zone_of[v_cells[open_edges]]
+    travel_time = rng.integers(TRAVEL_TIME_LIMITS[0], TRAVEL_TIME_LIMITS[1] + 1, len(u), dtype=np.int32)
+    return _graph("grid", rng, int(free.sum()), u, v, travel_time, seed, backend, affected, ttl_scale, np.flatnonzero(free))
+
+def scale_free_graph(num_zones: int, links: int=2, seed: int=0, backend: str="compact", affected: int=2, ttl_scale: int=1) -> Graph:
+    """
+    Scale-free graph by preferential attachment (Barabási-Albert): every zone after the first `links` ones is linked
+    to `links` earlier zones, chosen with probability proportional to their degree, so a few hubs concentrate the
+    edges as the main junctions of a road network do. The targets are drawn all at once (Batagelj-Brandes): a new
+    edge copies the end of a uniformly random earlier edge end, which is resolved by following the copies back.
+    :param num_zones: Number of zones.
+    :param links: Edges of each new zone.
+    :param seed: Seed of the generator.
+    :param backend: Storage backend of the graph.
+    :param affected: Number of affected zones (severity > 0).
+    :param ttl_scale: Factor applied to the zone TTLs.
+    :return: Graph with about (num_zones - links) * links edges (repeated picks of a zone are merged).
+    """
+    if num_zones < 1:
+        raise ValueError(f"A scale-free graph needs at least one zone (got {num_zones}).")
+    if links < 1:
+        raise ValueError(f"Each zone of a scale-free graph must add at least one edge (got {links}).")
+    import numpy as np # Loaded on demand (see benchmarks/startup.py)
+    rng = np.random.default_rng(seed)
+    num_edges = max(0, num_zones - links) * links
+    edge = np.arange(num_edges)
+    u = links + edge // links # Zone that adds the edge
+    # Edge ends are numbered 2e (the new zone of edge e) and 2e + 1 (its target); the first zone links to the initial ones
+    draw = (rng.random(num_edges) * (2 * links * (u - links))).astype(np.int64)
+    v = np.where(edge < links, edge, -1)
+    pending = np.flatnonzero(v < 0)
+    end = draw[pending]
+    while len(pending):
+        even = end % 2 == 0
+        copied = (end - 1) // 2
+        initial = ~even & (copied < links)
+        v[pending[even]] = links + end[even] // 2 // links
+        v[pending[initial]] = copied[initial]
+        follow = ~even & ~initial
+        pending, end = pending[follow], draw[copied[follow]]
+    # A zone can pick the same target twice: its targets are sorted within its row of links, and repeats dropped
+    v = np.sort(v.reshape(-1, links), axis=1).ravel() if num_edges else v
+    repeated = np.zeros(num_edges, dtype=bool)
+    repeated[1:] = (v[1:] == v[:-1]) & (u[1:] == u[:-1])
+    u, v = u[~repeated], v[~repeated]
+    travel_time = rng.integers(TRAVEL_TIME_LIMITS[0], TRAVEL_TIME_LIMITS[1] + 1, len(u), dtype=np.int32)
+    return _graph("scale_free", rng, num_zones, u, v, travel_time, seed, backend, affected, ttl_scale)
+
+def _view(values, dtype, typecode: str) -> memoryview:
+    import numpy as np
+    return memoryview(np.ascontiguousarray(values, dtype=dtype)).cast("B").cast(typecode)
+
+def _graph(kind: str, rng, num_zones: int, u, v, travel_time, seed: int, backend: str, affected: int, ttl_scale: int, labels=None) -> Graph:
+    """
+    Sample the remaining attributes of a generated graph and build it from its columns.
+    :param u: Zone ids of one end of each (undirected) edge.
+    :param v: Zone ids of the other end.
+    :param labels: Number in the name of each zone ("Z<label>"; default its id).
+    """
+    import numpy as np
+    num_edges = len(u)
+    # Edge attributes
+    fuel_cost = rng.integers(FUEL_COST_LIMITS[0], FUEL_COST_LIMITS[1] + 1, num_edges, dtype=np.int32)
+    conditions = (rng.random(num_edges) < GOOD_CONDITIONS_PROBABILITY).astype(np.int8)
+    costs = travel_time / fuel_cost * np.where(conditions == 1, 1.0, BAD_WEATHER_FACTOR)
+    # A uniform set of k vehicles is a uniform mask among the masks with k bits set
+    masks = np.arange(1 << len(VEHICLE_TYPES))
+    bits = np.array([bin(mask).count("1") for mask in masks])
+    count = rng.integers(EDGE_VEHICLE_LIMITS[0], EDGE_VEHICLE_LIMITS[1] + 1, num_edges)
+    vehicle_mask = np.zeros(num_edges, dtype=np.uint16)
+    for k in range(EDGE_VEHICLE_LIMITS[0], EDGE_VEHICLE_LIMITS[1] + 1):
+        choices = masks[bits == k]
+        chosen = count == k
+        vehicle_mask[chosen] = choices[rng.integers(0, len(choices), int(chosen.sum()))]
+    # Zone attributes: one camp and a few affected zones
+    population = rng.integers(POPULATION_LIMITS[0], POPULATION_LIMITS[1] + 1, num_zones, dtype=np.int64)
+    ttl = rng.integers(TTL_LIMITS[0], TTL_LIMITS[1] + 1, num_zones, dtype=np.int64) * ttl_scale
+    severity = np.zeros(num_zones, dtype=np.int32)
+    camp = np.zeros(num_zones, dtype=np.int8)
+    roles = rng.choice(num_zones, min(num_zones, affected + 1), replace=False)
+    camp[roles[:1]] = 1
+    severity[roles[1:]] = rng.integers(SEVERITY_LIMITS[0], SEVERITY_LIMITS[1] + 1, len(roles) - 1)
+    heuristics = (severity * 100 + population // 100).astype(np.float64) # Graph.heuristic_function of every zone
+    # Names as a string table sorted by the loader's binary search
+    labels = np.arange(num_zones) if labels is None else labels
+    encoded = np.char.add(b"Z", labels.astype("S"))
+    name_offsets = np.concatenate(([0], np.cumsum(np.char.str_len(encoded))))
+    # CSR arcs (both directions of each edge share its slot), sorted by (origin, target) keys as the compact index wants
+    arc_u = np.concatenate((u, v)).astype(np.int64)
+    arc_v = np.concatenate((v, u)).astype(np.int64)
+    arc_edges = np.concatenate((np.arange(num_edges), np.arange(num_edges)))
+    keys = arc_u << 32 | arc_v
+    order = np.argsort(keys)
+    keys, arc_v, arc_edges = keys[order], arc_v[order], arc_edges[order]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(arc_u, minlength=num_zones))))
+    params = {"class": Graph.__name__, "attributes": {"generator": kind, "seed": seed}}
+    sections = {
+        "names": _view(np.frombuffer(b"".join(encoded.tolist()), dtype=np.uint8), np.uint8, 'B'),
+        "name_offsets": _view(name_offsets, np.int64, 'q'),
+        "name_order": _view(np.argsort(encoded, kind="stable"), np.int32, 'i'),
+        "population": _view(population, np.int64, 'q'),
+        "severity": _view(severity, np.int32, 'i'),
+        "ttl": _view(ttl, np.int32, 'i'),
+        "camp": _view(camp, np.int8, 'b'),
+        "heuristics": _view(heuristics, np.float64, 'd'),
+        "travel_time": _view(travel_time, np.int32, 'i'),
+        "fuel_cost": _view(fuel_cost, np.int32, 'i'),
+        "conditions": _view(conditions, np.int8, 'b'),
+        "vehicle_mask": _view(vehicle_mask, np.uint16, 'H'),
+        "costs": _view(costs, np.float64, 'd'),
+        "offsets": _view(offsets, np.int64, 'q'),
+        "targets": _view(arc_v, np.int32, 'i'),
+        "arc_edges": _view(arc_edges, np.int32, 'i'),
+        "keys": _view(keys, np.int64, 'q'),
+        "key_slots": _view(arc_edges, np.int32, 'i'),
+        "camp_ids": _view(np.flatnonzero(camp), np.int32, 'i'),
+        "affected_ids": _view(np.sort(np.flatnonzero(severity)), np.int32, 'i'),
+        "params": _view(np.frombuffer(json.dumps(params).encode("utf-8"), dtype=np.uint8), np.uint8, 'B')
+    }
+    return from_sections(Graph, {"directed": False}, sections, backend)
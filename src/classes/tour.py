@@ -0,0 +1,238 @@
+import math
+import time
+from heapq import heappush, heappop
+
+from classes.graph import Graph
+from utils.notify import notify
+
+# Largest number of zones whose visiting order is solved exactly (Held-Karp keeps 2^n * n states: ~60 MB and ~1.5 s at 18 zones, ~5x that at 20)
+HELD_KARP_MAX_ZONES: int = 18
+
+def leg_table(graph: Graph, terminals: list[str], peso: int=0) -> tuple[list[list[float]], list[list[float]], list[dict]]:
+    """
+    Fastest routes between every pair of terminals, with one Dijkstra (by travel time) per terminal.
+    Only edges with a vehicle able to carry the load are used (see Graph.vehicle_table), and, as in AStar, the fuel used since
+    the terminal must stay within the range of the vehicle of each edge (each node keeps only its fastest route, so a slower
+    route that would use less fuel is not kept).
+    :param terminals: Names of the terminals (camp first, then the zones to visit).
+    :return: Tuple (times, costs, parents): times[i][j] and costs[i][j] are the travel time and the cost of the fastest route
+             from terminal i to terminal j (math.inf if there is none), parents[i] the search tree of terminal i.
+    """
+    vehicle_table = graph.vehicle_table(peso)
+    index = {terminal: i for i, terminal in enumerate(terminals)}
+    times = [[math.inf] * len(terminals) for _ in terminals]
+    costs = [[math.inf] * len(terminals) for _ in terminals]
+    trees = []
+    for (i, source) in enumerate(terminals):
+        elapsed = {source: 0}
+        cost = {source: 0}
+        fuel_used = {source: 0}
+        parents = {source: None}
+        settled = set()
+        remaining = len(terminals)
+        open_set = [(0, source)]
+        while open_set and remaining:
+            current_time, current_node = heappop(open_set)
+            if current_node in settled or current_time > elapsed[current_node]:
+                continue
+            settled.add(current_node)
+            j = index.get(current_node)
+            if j is not None:
+                times[i][j] = current_time
+                costs[i][j] = cost[current_node]
+                remaining -= 1
+            current_fuel = fuel_used[current_node]
+            for (adjacente, slot, (travel_time, fuel_cost, _, _)) in graph.edges_of(current_node):
+                if adjacente in settled:
+                    continue
+                vehicle = vehicle_table[graph.get_edge_mask(slot)]
+                if vehicle is None or vehicle.get_range() < current_fuel + fuel_cost:
+                    continue
+                if current_time + travel_time < elapsed.get(adjacente, math.inf):
+                    elapsed[adjacente] = current_time + travel_time
+                    cost[adjacente] = cost[current_node] + graph.get_edge_cost(slot)
+                    fuel_used[adjacente] = current_fuel + fuel_cost
+                    parents[adjacente] = current_node
+                    heappush(open_set, (current_time + travel_time, adjacente))
+        trees.append(parents)
+    return times, costs, trees
+
+def held_karp(times: list[list[float]], weights: list[float], ttls: list[float], by_time: bool=False, stats: dict=None) -> tuple[list[int], float]:
+    """
+    Visiting order of every zone from the camp by bitmask Held-Karp dynamic programming, vectorised with NumPy over
+    all the subsets of each size (the only Python loops are over subset sizes and last zones).
+    The objective is the severity-weighted sum of arrival times: a leg j -> k from the visited set S costs its travel time
+    times the weight of the zones not in S (all of them are still waiting). A transition that reaches a zone at or after its
+    TTL is discarded.
+    Each (subset, last zone) state keeps only its cheapest order, so the order is exact while no TTL binds: once a TTL discards
+    the cheapest transition into a state, a costlier order that arrived earlier (and could have stayed within the later TTLs)
+    is already lost, and the order returned may be suboptimal or missing.
+    :param times: Travel times between terminals (index 0 is the camp, 1..n the zones).
+    :param weights: Weight (severity) of each zone (index i is terminal i + 1).
+    :param ttls: TTL of each zone (same indexes as weights).
+    :param by_time: Minimise the arrival time at the last zone instead (exact for TTL feasibility: among the orders of a
+                    set ending in a zone, the one that arrives first leaves every later zone with the most slack).
+    :param stats: Optional dict where "exact" is recorded: False if a TTL discarded the cheapest transition into some state.
+    :return: Tuple (order of the zones as terminal indexes, objective), or (None, math.inf) if no order reaches every zone within its TTL.
+    """
+    import numpy as np # Loaded on demand (see benchmarks/startup.py)
+    n = len(weights)
+    full = (1 << n) - 1
+    legs = np.asarray(times, dtype=float)
+    ttl = np.asarray(ttls, dtype=float)
+    # Weight and size of every subset (built by doubling: subsets with bit i are the ones without it plus zone i)
+    visited_weight = np.zeros(1 << n)
+    size = np.zeros(1 << n, dtype=np.int8)
+    for i in range(n):
+        visited_weight[1 << i:1 << (i + 1)] = visited_weight[:1 << i] + weights[i]
+        size[1 << i:1 << (i + 1)] = size[:1 << i] + 1
+    waiting = visited_weight[full] - visited_weight # Weight of the zones still to visit after each subset
+    cost = np.full((1 << n, n), np.inf)
+    arrival = np.full((1 << n, n), np.inf, dtype=np.float32) # Sums of integer travel times, exact in float32
+    parent = np.full((1 << n, n), -1, dtype=np.int8)
+    for k in range(n):
+        if legs[0, k + 1] < ttl[k]:
+            arrival[1 << k, k] = legs[0, k + 1]
+            cost[1 << k, k] = legs[0, k + 1] if by_time else legs[0, k + 1] * visited_weight[full]
+    masks = np.arange(1 << n)
+    layers = [masks[size == s] for s in range(n + 1)]
+    zone_legs = legs[1:, 1:]
+    exact = True
+    for s in range(1, n):
+        layer = layers[s]
+        for k in range(n):
+            sources = layer[(layer >> k) & 1 == 0]
+            if not len(sources):
+                continue
+            new_arrival = arrival[sources] + zone_legs[:, k]
+            if by_time:
+                # States only reached late keep an arrival time, but no order may continue from them
+                candidates = np.where(np.isinf(cost[sources]), np.inf, new_arrival)
+            else:
+                candidates = cost[sources] + zone_legs[:, k] * waiting[sources][:, None]
+            late = new_arrival >= ttl[k]
+            if exact and not by_time and late.any():
+                # Every state equal to the one without TTLs keeps the order exact (its optimum is a lower bound)
+                unbounded = candidates.min(axis=1)
+                candidates[late] = np.inf
+                exact = bool(np.array_equal(candidates.min(axis=1), unbounded))
+            else:
+                candidates[late] = np.inf
+            best = np.argmin(candidates, axis=1)
+            rows = np.arange(len(sources))
+            targets = sources | (1 << k)
+            cost[targets, k] = candidates[rows, best]
+            arrival[targets, k] = new_arrival[rows, best]
+            parent[targets, k] = best
+    last = int(np.argmin(cost[full]))
+    objective = float(cost[full, last])
+    if stats is not None:
+        stats["exact"] = exact and not math.isinf(objective)
+    if math.isinf(objective):
+        return None, math.inf
+    order = []
+    mask = full
+    while last >= 0:
+        order.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    order.reverse()
+    return order, objective
+
+def insertion_tour(times: list[list[float]], weights: list[float], ttls: list[float]) -> tuple[list[int], float]:
+    """
+    Visiting order by cheapest insertion (zones taken by decreasing severity, then by TTL) improved with 2-opt
+    (reversing segments of the order while the objective improves). Same objective and TTL rule as held_karp;
+    orders that miss a TTL are only kept while no feasible one is known.
+    :return: Tuple (order of the zones as terminal indexes, objective), or (None, math.inf) if the order found misses a TTL.
+    """
+    def evaluate(order: list[int]) -> tuple[int, float]:
+        late = 0
+        objective = 0.0
+        clock = 0.0
+        previous = 0
+        for zone in order:
+            clock += times[previous][zone]
+            objective += weights[zone - 1] * clock
+            late += clock >= ttls[zone - 1]
+            previous = zone
+        return late, objective
+
+    order = []
+    for zone in sorted(range(1, len(weights) + 1), key=lambda zone: (-weights[zone - 1], ttls[zone - 1])):
+        order = min((order[:i] + [zone] + order[i:] for i in range(len(order) + 1)), key=evaluate)
+    best = evaluate(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                value = evaluate(candidate)
+                if value < best:
+                    order, best = candidate, value
+                    improved = True
+    if best[0] or math.isinf(best[1]):
+        return None, math.inf
+    return order, best[1]
+
+def plan_tour(start_node: str, end_nodes: list[str], graph: Graph, peso: int=0, stats: dict=None):
+    """
+    Planear a ordem de visita de todas as zonas afetadas a partir do campo, antes de os seus TTLs expirarem.
+    As rotas mais rápidas entre o campo e as zonas são calculadas uma vez (uma pesquisa por terminal); a ordem minimiza a soma
+    dos tempos de chegada pesados pela severidade de cada zona (as mais afetadas primeiro), por Held-Karp até HELD_KARP_MAX_ZONES
+    zonas (inserção + 2-opt acima disso). Held-Karp só garante a ordem ótima enquanto nenhum TTL a restringe (ver held_karp);
+    se não encontrar uma ordem dentro dos TTLs, procura-se a ordem que chega mais cedo à última zona, que encontra uma sempre
+    que exista mas ignora a severidade.
+    :param start_node: Nodo inicial (campo).
+    :param end_nodes: Zonas a visitar.
+    :param graph: Grafo.
+    :param peso: Peso a ser transportado (só são usadas arestas com um veículo capaz de o levar e com autonomia para o combustível
+                 gasto desde o início de cada trajeto entre zonas, ver leg_table).
+    :param stats: Dicionário opcional onde são registados o método ("method"), se a ordem é garantidamente ótima ("exact"), o tempo
+                  das pesquisas ("legs_s") e da ordenação ("order_s").
+    :return: Tupla (ordem, caminho, chegadas, custo_total): ordem das zonas, caminho completo, tempo de chegada a cada zona e
+             custo do caminho, caso contrário, None.
+    """
+    zones = [zone for zone in dict.fromkeys(end_nodes) if zone != start_node]
+    if not zones:
+        return ([], [start_node], {}, 0)
+    terminals = [start_node] + zones
+    begin = time.perf_counter()
+    times, costs, trees = leg_table(graph, terminals, peso)
+    legs = time.perf_counter() - begin
+    weights = [graph.get_node(zone).get_severity() or 1 for zone in zones] # Zones without severity still have to be reached
+    ttls = [graph.get_node(zone).get_ttl() for zone in zones]
+    begin = time.perf_counter()
+    exact = {"exact": False}
+    if len(zones) <= HELD_KARP_MAX_ZONES:
+        method = "held-karp"
+        order, _ = held_karp(times, weights, ttls, stats=exact)
+        if order is None:
+            method = "held-karp (tempo)"
+            order, _ = held_karp(times, weights, ttls, by_time=True)
+    else:
+        method = "insertion+2opt"
+        order, _ = insertion_tour(times, weights, ttls)
+    if stats is not None:
+        stats.update(method=method, exact=method == "held-karp" and exact["exact"], legs_s=legs, order_s=time.perf_counter() - begin)
+    if order is None:
+        notify("debug", f"Nenhuma ordem de visita chega a todas as zonas dentro do TTL ({method})")
+        return None
+    path = [start_node]
+    arrivals = {}
+    clock = total_cost = 0
+    previous = 0
+    for terminal in order:
+        leg = []
+        node = terminals[terminal]
+        while node != terminals[previous]:
+            leg.append(node)
+            node = trees[previous][node]
+        path.extend(reversed(leg))
+        clock += times[previous][terminal]
+        total_cost += costs[previous][terminal]
+        arrivals[terminals[terminal]] = clock
+        previous = terminal
+    return ([terminals[terminal] for terminal in order], path, arrivals, total_cost)
@@ -1,4 +1,6 @@
 class Vehicle:
+    __slots__ = ("name", "capacity", "range", "speed")
+
     def __init__(self, name: str, capacity: int=0, range: int=0, speed: int=1):
         """
         Representa um veículo.
@@ -58,6 +60,17 @@ VEHICLE_TYPES: dict[int, Vehicle] = {
     4: Vehicle("Drone", 100, 1000, 300)
 }
 
+def vehicle_mask(vehicles) -> int:
+    """
+    Encode a collection of vehicle types as a bitmask over VEHICLE_TYPES.
+    :param vehicles: Iterable of VehicleType objects permitted on an edge.
+    :return: Integer with bit `type` set for each permitted vehicle type.
+    """
+    mask = 0
+    for vehicle in vehicles:
+        mask |= 1 << vehicle.get_type()
+    return mask
+
 def get_fastest_capable_vehicle(vehicleList: list[Vehicle], capacity: int) -> Vehicle:
     """
     Get the fastest vehicle that can carry the given capacity, 
@@ -93,7 +106,44 @@ def get_start_capable_vehicle(capacity: int) -> Vehicle:
     best_vehicle = max(suitable_vehicles, key=lambda v: v.get_range())
     return best_vehicle
 
+# Tables built by best_vehicle_table, by (load bucket, type, capacity and speed of every vehicle)
+_VEHICLE_TABLES: dict[tuple, list[int]] = {}
+
+def load_bucket(capacity: int, vehicleTypes: dict[int, Vehicle]=VEHICLE_TYPES) -> int:
+    """
+    Load bucket of a load: the number of vehicles that can not carry it. Loads between two consecutive capacities share a
+    bucket, and with it the vehicles the algorithms can use (see best_vehicle_table).
+    :param capacity: The required capacity the vehicle must support.
+    :param vehicleTypes: Vehicles indexed by type.
+    """
+    return sum(1 for v in vehicleTypes.values() if v.get_capacity() < capacity)
+
+def best_vehicle_table(capacity: int, vehicleTypes: dict[int, Vehicle]=VEHICLE_TYPES) -> list[int]:
+    """
+    Lookup table with the choice of get_fastest_capable_vehicle for every vehicle mask (see vehicle_mask),
+    so the vehicle of an edge is one index instead of a sort per expansion.
+    The choice only depends on which vehicles can carry the load, so one table is built per load bucket
+    (loads between two consecutive capacities) and shared by every load in it.
+    :param capacity: The required capacity the vehicle must support.
+    :param vehicleTypes: Vehicles indexed by type (the bits of the masks).
+    :return: List indexed by mask with the type of the chosen vehicle, or None if no permitted vehicle can carry the load.
+    """
+    specs = tuple((t, v.get_capacity(), v.get_speed()) for t, v in vehicleTypes.items())
+    key = (load_bucket(capacity, vehicleTypes), specs)
+    table = _VEHICLE_TABLES.get(key)
+    if table is None:
+        table = [None] * (1 << (max(vehicleTypes) + 1) if vehicleTypes else 1)
+        for mask in range(len(table)):
+            types = [t for t in vehicleTypes if mask >> t & 1]
+            best_vehicle = get_fastest_capable_vehicle([vehicleTypes[t] for t in types], capacity)
+            if best_vehicle is not None:
+                table[mask] = next(t for t in types if vehicleTypes[t] is best_vehicle)
+        _VEHICLE_TABLES[key] = table
+    return table
+
 class VehicleType:
+    __slots__ = ("types", "type")
+
     def __init__(self, type: int=0):
         """
         Representa um tipo de veículo.
@@ -0,0 +1,95 @@
+import threading
+from bisect import bisect_right
+from operator import itemgetter
+
+class VersionLog:
+    def __init__(self):
+        """
+        Multi-version log of edge changes (copy-on-write at edge granularity).
+        The storage always holds the newest edge data; before an edge is overwritten its previous data
+        is recorded here as (version, old_data), meaning "before `version` the edge had old_data".
+        A snapshot pinned at version p reads the first entry with version > p, or the live data if there is none.
+        Writers must record before writing the storage and readers must read the storage before the log.
+        """
+        self.version = 0
+        self.history: dict[int, list[tuple[int, tuple]]] = {}
+        self.pins: dict[int, int] = {} # version -> number of snapshots pinned at it
+        self.changed: list[int] = [] # Edge slots changed since the last commit
+        self.lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["lock"] # Locks can not be copied or pickled
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def pin(self) -> int:
+        """
+        Pin the current version so its edge data is kept until released.
+        :return: Pinned version.
+        """
+        with self.lock:
+            version = self.version
+            self.pins[version] = self.pins.get(version, 0) + 1
+            return version
+
+    def release(self, version: int):
+        """
+        Release a pinned version and drop the history no snapshot needs anymore.
+        """
+        with self.lock:
+            count = self.pins.get(version, 0) - 1
+            if count > 0:
+                self.pins[version] = count
+            else:
+                self.pins.pop(version, None)
+            self._prune()
+
+    def record(self, slot: int, old_data: tuple):
+        """
+        Record the data an edge slot had before it is changed in the next version.
+        Only the first change of a slot within a version is recorded.
+        """
+        with self.lock:
+            pending = self.version + 1
+            entries = self.history.setdefault(slot, [])
+            if entries and entries[-1][0] == pending:
+                return
+            entries.append((pending, old_data))
+            self.changed.append(slot)
+
+    def commit(self) -> list[int]:
+        """
+        Publish the recorded changes as a new version.
+        :return: Edge slots changed in the new version.
+        """
+        with self.lock:
+            changed = self.changed
+            self.changed = []
+            self.version += 1
+            self._prune()
+            return changed
+
+    def lookup(self, slot: int, version: int) -> tuple:
+        """
+        Get the data an edge slot had at a pinned version.
+        :return: Old edge data, or None if the live data is still valid for that version.
+        """
+        entries = self.history.get(slot)
+        if not entries:
+            return None
+        i = bisect_right(entries, version, key=itemgetter(0))
+        return entries[i][1] if i < len(entries) else None
+
+    def _prune(self):
+        # An entry (v, old) is only needed by snapshots pinned before v
+        oldest = min(self.pins) if self.pins else self.version
+        for slot in list(self.history):
+            entries = [entry for entry in self.history[slot] if entry[0] > oldest]
+            if entries:
+                self.history[slot] = entries
+            else:
+                del self.history[slot]
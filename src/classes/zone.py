@@ -1,4 +1,8 @@
 class Zone:
+    __slots__ = ("name", "population", "severity", "ttl", "camp") # No per-instance __dict__ (large graphs hold millions of zones)
+    # Bumped whenever a zone changes its camp flag or severity, so storages know their role indexes are stale
+    role_changes: int = 0
+
     def __init__(self, name: str, population: int=0, severity: int=0, ttl: int=0, camp: bool=False):
         """
         Representa uma zona.
@@ -51,9 +55,11 @@ class Zone:
 
     def set_severity(self, severity):
         self.severity = severity
+        Zone.role_changes += 1
 
     def set_ttl(self, ttl):
         self.ttl = ttl
 
     def set_camp(self, camp):
-        self.camp = camp
\ No newline at end of file
+        self.camp = camp
+        Zone.role_changes += 1
@@ -1,19 +1,16 @@
 from classes.zone import Zone
 from classes.graph import Graph
 from classes.vehicle import VehicleType, VEHICLE_TYPES
+from utils.world import load_continent
 import random
-import geopandas as gpd
-import networkx as nx  # Using NetworkX for graph connectivity check
-
-import warnings
-warnings.filterwarnings("ignore", category=FutureWarning) # Hide FutureWarning messages from geopandas
 
 class FixedGraph(Graph): # Inherit from Graph
-    def __init__(self):
+    def __init__(self, backend: str="dict"):
         """
         FixedGraph extends graph and creates a fixed graph with fixed zones and edges (defined manually).
+        :param backend: Graph storage backend ("dict", "csr" or "compact").
         """
-        super().__init__() # Initialize the parent Graph class
+        super().__init__(backend=backend) # Initialize the parent Graph class
         self.example_graph() # Set up the example graph
 
     def example_graph(self):
@@ -43,8 +40,8 @@ class FixedGraph(Graph): # Inherit from Graph
             self.add_heuristic(zone.get_name(), self.heuristic_function(zone))
 
 class RandomGraph(Graph):
-    def __init__(self, continent="Africa", max_edges_per_zone=1, max_affected_zones=2, edge_max_vehicles=4):
-        super().__init__()
+    def __init__(self, continent="Africa", max_edges_per_zone=1, max_affected_zones=2, edge_max_vehicles=4, backend="dict"):
+        super().__init__(backend=backend)
         self.continent = continent
         self.max_edges_per_zone = max_edges_per_zone
         self.max_affected_zones = max_affected_zones
@@ -57,13 +54,12 @@ class RandomGraph(Graph):
         self.example_graph()
 
     def example_graph(self):
-        world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
-        continent = world[world['continent'] == self.continent]
+        continent = load_continent(self.continent) # Countries of the continent from the local geometry cache
         # Initialize zones with each country
         self.zones: dict[int, Zone] = {}
-        for index, row in continent.iterrows():
+        for index, (name, population) in enumerate(zip(continent.names, continent.population)):
             zone_ttl = random.randint(*self.zone_ttl_limits)  # Random TTL
-            self.zones[index] = Zone(str(row['name']), int(row['pop_est']), 0, zone_ttl, False)
+            self.zones[index] = Zone(name, population, 0, zone_ttl, False)
         # Randomly choose one country as the camp
         camp_zone = random.choice(list(self.zones.values()))
         camp_zone.set_camp(True)
@@ -99,6 +95,7 @@ class RandomGraph(Graph):
         """
         Ensure that the graph is connected. If not, add edges to make it connected.
         """
+        import networkx as nx  # Using NetworkX for graph connectivity check (loaded only by the builders that need it)
         # Create a simple NetworkX graph for checking connectivity
         g = nx.Graph()
         for zone in self.zones.values():
@@ -151,19 +148,15 @@ class IRLGraph(Graph):
 from classes.zone import Zone
 from classes.graph import Graph
 from classes.vehicle import VehicleType, VEHICLE_TYPES
+from utils.world import load_continent
 import random
-import geopandas as gpd
-import networkx as nx  # Using NetworkX for graph connectivity check
-
-import warnings
-warnings.filterwarnings("ignore", category=FutureWarning) # Hide FutureWarning messages from geopandas
 
 class DynamicGraph(Graph):
-    def __init__(self, continent="Africa", edge_update_probability=0.2, max_edges_per_zone=2, fixed_affected_zones=2):
+    def __init__(self, continent="Africa", edge_update_probability=0.2, max_edges_per_zone=2, fixed_affected_zones=2, backend="dict"):
         """
         DynamicGraph creates a graph where the zones and streets are fixed but travel times and meteorologic conditions change.
         """
-        super().__init__()
+        super().__init__(backend=backend)
         self.continent = continent
         self.edge_update_probability = edge_update_probability
         self.max_edges_per_zone = max_edges_per_zone
@@ -180,13 +173,12 @@ class DynamicGraph(Graph):
         """
         Creates a fixed graph with static zones and edges, but dynamic travel times and conditions.
         """
-        world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
-        continent = world[world['continent'] == self.continent]
+        continent = load_continent(self.continent) # Countries of the continent from the local geometry cache
 
         self.zones: dict[int, Zone] = {}
-        for index, row in continent.iterrows():
+        for index, (name, population) in enumerate(zip(continent.names, continent.population)):
             zone_ttl = random.randint(*self.zone_ttl_limits)  # Random TTL
-            self.zones[index] = Zone(str(row['name']), int(row['pop_est']), 0, zone_ttl, False)
+            self.zones[index] = Zone(name, population, 0, zone_ttl, False)
 
         # Set Angola as the camp zone by name
         camp_zone = None
@@ -249,25 +241,20 @@ class DynamicGraph(Graph):
         """
         for node in self.nodes:
             node_name = node.get_name()
-            for idx, (adjacente, (_, fuel_cost, _, vehicles)) in enumerate(self.graph[node_name]):
+            for (adjacente, (_, fuel_cost, _, vehicles)) in self.graph[node_name]:
                 # If the edge needs to be updated (based on probability)
                 if random.random() < self.edge_update_probability:
                     # Update the travel time randomly
                     new_travel_time = random.randint(*self.zone_travel_time_limits)
                     # Randomly update the good conditions (True/False based on defined weights)
                     new_good_conditions = random.choices([True, False], weights=self.zone_good_conditions_weights, k=1)[0]
-                    # Update the edge in the graph with the new values
-                    self.graph[node_name][idx] = (adjacente, (new_travel_time, fuel_cost, new_good_conditions, vehicles))
-                    # For undirected graphs, we also need to update the reverse edge
-                    if not self.directed:
-                        # Find the reverse edge (from adjacente to node_name) and update it
-                        for rev_idx, (rev_adj, (_, _, _, _)) in enumerate(self.graph[adjacente]):
-                            if rev_adj == node_name:
-                                self.graph[adjacente][rev_idx] = (node_name, (new_travel_time, fuel_cost, new_good_conditions, vehicles))
-                                break
+                    # Update the edge in the graph with the new values (the reverse edge too for undirected graphs)
+                    self.update_edge(node_name, adjacente, new_travel_time, fuel_cost, new_good_conditions, vehicles)
 
-    def simulate(self):
+    def simulate(self) -> list[int]:
         """
-        Run a simulation step that updates the edge conditions.
+        Run a simulation step that updates the edge conditions and publishes them as a new graph version.
+        :return: Slots of the edges changed in the new version (see Graph.commit_version).
         """
-        self.update_conditions()
\ No newline at end of file
+        self.update_conditions()
+        return self.commit_version()
\ No newline at end of file
@@ -1,14 +1,30 @@
 import sys
 from colorama import Fore
-import copy
 
 from example_graph import FixedGraph, RandomGraph, DynamicGraph
 from classes.graph import Graph
-from utils.notify import notify
+from utils.notify import notify, buffered, set_level, counters, LEVELS
 from utils.menu import Menu
-from classes.algorithms import BFS, DFS, Greedy, AStar, UniformCost, HillClimb
+from classes.algorithms import BFS, DFS, Greedy, AStar, BidirectionalAStar, RCSP, UniformCost, HillClimb, BeamSearch, SMAStar, ARAStarSolutions
+from classes.batch import solve_batch
+from classes.cache import RouteCache
+from classes.stats import SearchStats
+from classes.tour import plan_tour
+from classes.portfolio import Portfolio
+from classes.annealing import Annealer
+from classes.replanning import IncrementalPlanner
 from classes.vehicle import VEHICLE_TYPES
 
+# Graph classes that can be restored from a saved graph file
+SCENARIOS: dict[str, type] = {
+    "Graph": Graph,
+    "FixedGraph": FixedGraph,
+    "RandomGraph": RandomGraph,
+    "DynamicGraph": DynamicGraph
+}
+# Whether the searches of "[Resolver]" also trace their peak memory (tracemalloc slows them down several times)
+measure_memory: bool = False
+
 def run_main():
     main_menu = Menu("Selecione o tipo de grafo que deseja utilizar:")
     main_menu.add_entry("Fixed Graph", lambda: (run_menu(["", "test"]), main_menu.close()))
@@ -28,29 +44,63 @@ def run_menu(args: list):
     elif args[1] == "run_dynamic": # "make args='run_dynamic'"
         notify("info", "Running with dynamic graph")
         graph = DynamicGraph()
+    elif args[1] == "load" and len(args) > 2: # "make dev ARGS='load <ficheiro>'"
+        notify("info", f"Running with graph loaded from {args[2]}")
+        from classes.binary import read_params
+        graph = SCENARIOS.get(read_params(args[2])["class"], Graph).load(args[2])
     else:
-        notify("warning", "Invalid arguments. Usage: python main.py [test|run_dynamic|run_irl]")
+        notify("warning", "Invalid arguments. Usage: python main.py [test|run_random|run_dynamic|load <file>]")
+    cache = RouteCache(graph) if graph is not None else None # Answers of "[Resolver]", kept until the edges of their routes change
     graph_menu = Menu("Selecione uma opção:")
     graph_menu.add_entry("[Imprimir] Grafo", lambda: print(graph.graph))
     graph_menu.add_entry("[Imprimir] Nodos", lambda: graph.print_nodes())
     graph_menu.add_entry("[Imprimir] Arestas", lambda: graph.print_edges())
     graph_menu.add_entry("[Desenhar] Grafo", lambda: graph.draw_graph(), False)
     graph_menu.add_entry("[Desenhar] Mapa", lambda: graph.draw_map(), False)
-    graph_menu.add_entry("[Resolver] com DFS", lambda: resolve(graph, DFS))
-    graph_menu.add_entry("[Resolver] com BFS", lambda: resolve(graph, BFS))
-    graph_menu.add_entry("[Resolver] com A*", lambda: resolve(graph, AStar))
-    graph_menu.add_entry("[Resolver] com Greedy", lambda: resolve(graph, Greedy))
-    graph_menu.add_entry("[Resolver] com Uniform Cost", lambda: resolve(graph, UniformCost))
-    graph_menu.add_entry("[Resolver] com Hill Climbing", lambda: resolve(graph, HillClimb))
-    if args[1] == "run_dynamic":
+    graph_menu.add_entry("[Resolver] com DFS", lambda: resolve(graph, DFS, cache))
+    graph_menu.add_entry("[Resolver] com BFS", lambda: resolve(graph, BFS, cache))
+    graph_menu.add_entry("[Resolver] com A*", lambda: resolve(graph, AStar, cache))
+    graph_menu.add_entry("[Resolver] com A* bidirecional", lambda: resolve(graph, BidirectionalAStar, cache))
+    graph_menu.add_entry("[Resolver] com RCSP (rota ótima com combustível e TTL)", lambda: resolve(graph, RCSP, cache))
+    graph_menu.add_entry("[Resolver] com Greedy", lambda: resolve(graph, Greedy, cache))
+    graph_menu.add_entry("[Resolver] com Uniform Cost", lambda: resolve(graph, UniformCost, cache))
+    graph_menu.add_entry("[Resolver] com Hill Climbing", lambda: resolve(graph, HillClimb, cache))
+    graph_menu.add_entry("[Resolver] com Simulated Annealing (cadeias em paralelo)", lambda: resolve_annealing(graph))
+    graph_menu.add_entry("[Resolver] com Beam Search (memória limitada)", lambda: resolve(graph, BeamSearch, cache))
+    graph_menu.add_entry("[Resolver] com SMA* (memória limitada)", lambda: resolve(graph, SMAStar, cache))
+    graph_menu.add_entry("[Resolver] com ARA* (anytime, com prazo)", lambda: resolve_anytime(graph))
+    graph_menu.add_entry("[Resolver] lote de cargas com A*", lambda: resolve_batch(graph))
+    graph_menu.add_entry("[Resolver] com portfólio de algoritmos em paralelo", lambda: resolve_portfolio(graph))
+    graph_menu.add_entry("[Planear] Ordem de visita de todas as zonas afetadas", lambda: plan(graph))
+    graph_menu.add_entry("[Pré-processar] Landmarks (heurística ALT)", lambda: (build_landmarks(graph), cache.clear()))
+    graph_menu.add_entry("[Imprimir] Estatísticas da cache de rotas", lambda: print_cache(cache))
+    graph_menu.add_entry("[Imprimir] Contadores das mensagens das pesquisas", lambda: print_counters())
+    graph_menu.add_entry("[Configurar] Nível das mensagens", lambda: configure_level())
+    graph_menu.add_entry("[Configurar] Medir a memória das pesquisas", lambda: configure_memory())
+    graph_menu.add_entry("[Guardar] Grafo em ficheiro", lambda: save(graph))
+    if isinstance(graph, DynamicGraph):
+        planners = [] # Planner of "[Replanear]", repaired after every simulation step
         def simulate_graph():
-            graph.simulate()
+            changed = graph.simulate()
             notify("info", "Condições dinamicas alteradas.")
+            cache.update(changed)
+            for planner in planners:
+                expanded = planner.update(changed)
+                show_route(planner, f"Rota reparada ({len(set(changed))} arestas alteradas, {expanded} nodos expandidos)")
+        def move_vehicle():
+            if not planners or planners[0].route() is None:
+                notify("error", "Não há rota planeada.")
+                return
+            path = planners[0].route()[0]
+            planners[0].move(path[1] if len(path) > 1 else graph.get_camp_node())
+            show_route(planners[0], f"Veículo em {planners[0].start_node}")
         graph_menu.add_entry("[Simular] Alterações Metereológicas", lambda: simulate_graph(), False)
+        graph_menu.add_entry("[Replanear] Rota incremental (D* Lite) ao longo da simulação", lambda: replan(graph, planners))
+        graph_menu.add_entry("[Avançar] Veículo para o nodo seguinte da rota", lambda: move_vehicle(), False)
     graph_menu.default_exit(exit_program)
     graph_menu.show()
 
-def resolve(graph: Graph, algorithm):
+def resolve(graph: Graph, algorithm, cache: RouteCache=None):
     start_node = graph.get_camp_node()
     end_nodes = graph.get_affected_nodes()
     carga = int(input(Fore.YELLOW + "Digite a carga total que será transportada (em kg): " + Fore.RESET))
@@ -62,15 +112,182 @@ def resolve(graph: Graph, algorithm):
         notify("error", f"Carga inválida. A carga máxima suportada é de {max_vehicle_cap} kg.")
         return
     notify("info", f"Resolvendo com {algorithm.__name__} de {start_node} para {end_nodes} com carga de {carga} kg")
-    start_node_copy = copy.deepcopy(start_node)
-    end_nodes_copy = copy.deepcopy(end_nodes)
-    graph_copy = copy.deepcopy(graph)
-    #vehicles_copy = copy.deepcopy(VEHICLE_TYPES) # if we wanted the change of vehicles to keep the fuel level of that vehicle we would need to deepcopy the vehicles and pass them and do: path_vehicles = [v.get_vehicle() for v in vehicleTypes]; vehicle_list = [vehicles_copy for vehicles_copy in path_vehicles]; current_vehicle = get_fastest_capable_vehicle(vehicle_list, peso)
-    res = algorithm(start_node_copy, end_nodes_copy, graph_copy, carga)
+    stats = SearchStats(measure_memory)
+    # The algorithms change zone TTLs and vehicle ranges: they run on a per-query view of a pinned graph version instead of a deepcopy
+    with buffered(): # The messages of the search are printed in blocks, not line by line
+        if cache is not None:
+            res = cache.solve(algorithm, start_node, list(end_nodes), carga, stats)
+        else:
+            with graph.snapshot() as snapshot:
+                res = algorithm(start_node, list(end_nodes), snapshot.query(), carga, stats=stats)
     if res is not None:
         notify("success", f"Resultado: {res[0]} com custo total de {int(res[1])} e veículo {res[2]}")
     else:
         notify("error", "Não foi possível chegar às zonas afetadas dadas as características dos caminhos existentes e os veículos à disposição.")
+    print_stats(stats)
+
+def resolve_anytime(graph: Graph):
+    start_node = graph.get_camp_node()
+    end_nodes = graph.get_affected_nodes()
+    carga = int(input(Fore.YELLOW + "Digite a carga total que será transportada (em kg): " + Fore.RESET))
+    if carga <= 0:
+        notify("error", "Carga inválida. A carga deve ser maior que zero.")
+        return
+    prazo = int(input(Fore.YELLOW + "Digite o prazo para a resposta (em ms): " + Fore.RESET))
+    stats = SearchStats(measure_memory)
+    res = None
+    with graph.snapshot() as snapshot:
+        for res in ARAStarSolutions(start_node, list(end_nodes), snapshot.query(), carga, deadline_ms=prazo, stats=stats):
+            notify("info", f"Rota {res[0]} com custo total de {int(res[1])} (no máximo {res[3]:.2f}x o ótimo)")
+    if res is not None:
+        notify("success", f"Resultado: {res[0]} com custo total de {int(res[1])} e veículo {res[2]}" + (" (prazo esgotado)" if stats["timed_out"] else ""))
+    else:
+        notify("error", "Nenhuma rota encontrada dentro do prazo com os veículos à disposição.")
+    print_stats(stats)
+
+def resolve_batch(graph: Graph):
+    start_node = graph.get_camp_node()
+    end_nodes = graph.get_affected_nodes()
+    try:
+        cargas = [int(carga) for carga in input(Fore.YELLOW + "Digite as cargas a transportar, separadas por vírgulas (em kg): " + Fore.RESET).split(",")]
+    except ValueError:
+        notify("error", "Cargas inválidas. Use números inteiros separados por vírgulas.")
+        return
+    if any(carga <= 0 for carga in cargas):
+        notify("error", "Carga inválida. A carga deve ser maior que zero.")
+        return
+    max_vehicle_cap = max([v.get_capacity() for v in VEHICLE_TYPES.values()])
+    if any(carga > max_vehicle_cap for carga in cargas):
+        notify("error", f"Carga inválida. A carga máxima suportada é de {max_vehicle_cap} kg.")
+        return
+    stats = SearchStats(measure_memory)
+    results = solve_batch(graph, [(start_node, end_nodes, carga) for carga in cargas], AStar, stats)
+    for carga, res in zip(cargas, results):
+        if res is not None:
+            notify("success", f"Carga {carga} kg: {res[0]} com custo total de {int(res[1])} e veículo {res[2]}")
+        else:
+            notify("error", f"Carga {carga} kg: não foi possível chegar às zonas afetadas com os veículos à disposição.")
+    notify("info", f"{stats['queries']} consultas em {stats['seconds'] * 1000:.1f} ms ({stats['queries_per_second']:.0f} consultas/s)")
+    print_stats(stats)
+
+def resolve_portfolio(graph: Graph):
+    start_node = graph.get_camp_node()
+    end_nodes = graph.get_affected_nodes()
+    carga = int(input(Fore.YELLOW + "Digite a carga total que será transportada (em kg): " + Fore.RESET))
+    if carga <= 0:
+        notify("error", "Carga inválida. A carga deve ser maior que zero.")
+        return
+    policy = "best" if input(Fore.YELLOW + "Esperar por todos e escolher o menor custo? (s/N): " + Fore.RESET).strip().lower() == "s" else "first"
+    stats = {}
+    with Portfolio(graph) as portfolio:
+        res = portfolio.solve(start_node, list(end_nodes), carga, policy, stats)
+    for name, seconds in stats["times"].items():
+        cost = stats["costs"][name]
+        notify("info", f"{name}: " + (f"{seconds * 1000:.1f} ms" if seconds is not None else "cancelado") + (f", custo {cost:.2f}" if cost is not None else ""))
+    if res is not None:
+        notify("success", f"Resultado ({stats['winner']}): {res[0]} com custo total de {int(stats['costs'][stats['winner']])} e veículo {res[2]}")
+    else:
+        notify("error", "Não foi possível chegar às zonas afetadas dadas as características dos caminhos existentes e os veículos à disposição.")
+
+def resolve_annealing(graph: Graph):
+    start_node = graph.get_camp_node()
+    end_nodes = graph.get_affected_nodes()
+    carga = int(input(Fore.YELLOW + "Digite a carga total que será transportada (em kg): " + Fore.RESET))
+    if carga <= 0:
+        notify("error", "Carga inválida. A carga deve ser maior que zero.")
+        return
+    segundos = float(input(Fore.YELLOW + "Digite o tempo máximo da pesquisa (em segundos): " + Fore.RESET))
+    stats = {}
+    with Annealer(graph) as annealer:
+        res = annealer.solve(start_node, list(end_nodes), carga, seconds=segundos, stats=stats)
+    for (moment, cost) in stats.get("trace", []):
+        notify("info", f"{moment:.2f} s: custo {cost:.2f}")
+    if res is not None:
+        notify("success", f"Resultado: {res[0]} com custo total de {int(res[1])} e veículo {res[2]} ({stats['iterations']} iterações, {stats['restarts']} recomeços)")
+    else:
+        notify("error", "Não foi possível chegar às zonas afetadas dadas as características dos caminhos existentes e os veículos à disposição.")
+
+def plan(graph: Graph):
+    start_node = graph.get_camp_node()
+    end_nodes = graph.get_affected_nodes()
+    carga = int(input(Fore.YELLOW + "Digite a carga total que será transportada (em kg): " + Fore.RESET))
+    if carga <= 0:
+        notify("error", "Carga inválida. A carga deve ser maior que zero.")
+        return
+    stats = {}
+    res = plan_tour(start_node, list(end_nodes), graph, carga, stats)
+    if res is not None:
+        notify("success", f"Ordem de visita: {res[0]} com custo total de {int(res[3])} ({stats['method']}{'' if stats['exact'] else ', não garantidamente ótima'})")
+        notify("info", f"Caminho: {res[1]}")
+        for zona, chegada in res[2].items():
+            notify("info", f"Chegada a {zona} ao fim de {chegada} (TTL {graph.get_node(zona).get_ttl()})")
+    else:
+        notify("error", "Nenhuma ordem de visita chega a todas as zonas afetadas dentro do TTL com os veículos à disposição.")
+
+def replan(graph: Graph, planners: list):
+    carga = int(input(Fore.YELLOW + "Digite a carga total que será transportada (em kg): " + Fore.RESET))
+    if carga <= 0:
+        notify("error", "Carga inválida. A carga deve ser maior que zero.")
+        return
+    planners[:] = [IncrementalPlanner(graph, graph.get_camp_node(), list(graph.get_affected_nodes()), carga)]
+    show_route(planners[0], f"Rota planeada ({planners[0].expansions} nodos expandidos); é reparada a cada simulação")
+
+def show_route(planner: IncrementalPlanner, message: str):
+    res = planner.route()
+    if res is not None:
+        notify("success", f"{message}: {res[0]} com custo total de {int(res[1])} e veículo {res[2]}")
+    else:
+        notify("error", f"{message}: não há caminho para as zonas afetadas com os veículos à disposição.")
+
+def print_cache(cache: RouteCache):
+    counters = cache.counters()
+    notify("info", f"Cache de rotas: {counters['hits']} acertos, {counters['misses']} falhas ({counters['hit_rate']:.0%} de acertos), "
+                   f"{counters['evictions']} removidas por falta de espaço, {counters['invalidations']} invalidadas, "
+                   f"{counters['entries']} entradas (~{counters['bytes'] / 1024:.1f} KiB)")
+
+def print_counters():
+    values = counters()
+    if not values:
+        notify("info", "Nenhuma mensagem contada.")
+    for category, count in sorted(values.items()):
+        notify("info", f"{category}: {count}")
+
+def print_stats(stats: SearchStats):
+    if not stats:
+        notify("info", "Resposta da cache de rotas, sem pesquisa.")
+        return
+    notify("info", f"Pesquisa: {stats.counter('expansions')} nodos expandidos, {stats.counter('relaxed')} arestas examinadas, "
+                   f"{stats.counter('pushes')} inserções e {stats.counter('pops')} remoções da fronteira (no máximo {stats.counter('peak_frontier')} nodos)")
+    notify("info", f"Arestas cortadas: {stats.counter('pruned_fuel')} por combustível, {stats.counter('pruned_ttl')} por TTL, "
+                   f"{stats.counter('pruned_vehicle')} por falta de veículo")
+    notify("info", "Tempo: " + ", ".join(f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in stats.phases().items())
+                   + (f", memória máxima {stats['peak_bytes'] / 1024:.1f} KiB" if "peak_bytes" in stats else ""))
+
+def configure_memory():
+    global measure_memory
+    measure_memory = not measure_memory
+    notify("success", "Memória das pesquisas medida com tracemalloc (mais lentas)" if measure_memory else "Memória das pesquisas não medida")
+
+def configure_level():
+    level = input(Fore.YELLOW + f"Digite o nível mínimo das mensagens ({', '.join(LEVELS)}): " + Fore.RESET).strip().lower()
+    if level not in LEVELS:
+        notify("error", "Nível inválido.")
+        return
+    set_level(level)
+    notify("success", f"Mensagens a partir de {level}")
+
+def build_landmarks(graph: Graph):
+    k = int(input(Fore.YELLOW + "Digite o número de landmarks: " + Fore.RESET))
+    if k <= 0:
+        notify("error", "Número de landmarks inválido. Deve ser maior que zero.")
+        return
+    graph.build_landmarks(k)
+    notify("success", f"Heurística ALT com {len(graph.landmarks)} landmarks (A*, Greedy e Hill Climbing passam a usá-la)")
+
+def save(graph: Graph):
+    path = input(Fore.YELLOW + "Digite o caminho do ficheiro onde guardar o grafo: " + Fore.RESET)
+    graph.save(path)
+    notify("success", f"Grafo guardado em {path} (abrir com: python src/main.py load {path})")
 
 def main():
     args = sys.argv
@@ -0,0 +1,90 @@
+"""
+Memory report: bytes per zone and per edge for each graph storage backend.
+The "dict" backend is the original layout (adjacency lists of edge tuples, one set of VehicleType per edge).
+Usage: python src/memory_report.py [synthetic_edges]
+"""
+
+import sys
+import random
+import tracemalloc
+
+from classes.graph import Graph, BACKENDS
+from classes.zone import Zone
+from classes.vehicle import VehicleType, VEHICLE_TYPES
+from utils.notify import notify
+
+def graph_spec(graph: Graph) -> tuple[list[tuple], list[tuple]]:
+    """
+    Extract plain zone and edge descriptions from a graph (each undirected edge once).
+    :param graph: Source graph.
+    :return: Tuple (zones, edges) with zones as (name, population, severity, ttl, camp)
+             and edges as (node1, node2, travel_time, fuel_cost, good_conditions, vehicle_types).
+    """
+    zones = [(z.get_name(), z.get_population(), z.get_severity(), z.get_ttl(), z.is_camp()) for z in graph.get_nodes()]
+    edges = []
+    seen = set()
+    for node in graph.get_nodes():
+        node_name = node.get_name()
+        for (adjacente, (travel_time, fuel_cost, good_conditions, vehicles)) in graph.graph[node_name]:
+            if (adjacente, node_name) in seen:
+                continue
+            seen.add((node_name, adjacente))
+            edges.append((node_name, adjacente, travel_time, fuel_cost, good_conditions, tuple(v.get_type() for v in vehicles)))
+    return zones, edges
+
+def synthetic_spec(num_edges: int, seed: int=0) -> tuple[list[tuple], list[tuple]]:
+    """
+    Random sparse graph with num_edges edges over num_edges // 4 zones.
+    """
+    rng = random.Random(seed)
+    num_zones = max(2, num_edges // 4)
+    zones = [(f"Z{i}", rng.randint(1000, 10**6), 0, rng.randint(800, 980), i == 0) for i in range(num_zones)]
+    edges = []
+    for _ in range(num_edges):
+        u = rng.randrange(num_zones)
+        v = rng.randrange(num_zones)
+        vehicles = tuple(rng.sample(range(len(VEHICLE_TYPES)), rng.randint(3, 4)))
+        edges.append((f"Z{u}", f"Z{v}", rng.randint(30, 180), rng.randint(35, 70), rng.random() < 0.85, vehicles))
+    return zones, edges
+
+def measure(backend: str, zones: list[tuple], edges: list[tuple]) -> tuple[float, float]:
+    """
+    Build a graph with the given backend and measure the memory it allocates.
+    :return: Tuple (bytes per zone, bytes per edge).
+    """
+    tracemalloc.start()
+    graph = Graph(backend=backend)
+    objects = {}
+    for (name, population, severity, ttl, camp) in zones:
+        objects[name] = Zone(name, population, severity, ttl, camp)
+        graph.add_node(objects[name])
+    zone_bytes = tracemalloc.get_traced_memory()[0]
+    for (node1, node2, travel_time, fuel_cost, good_conditions, vehicles) in edges:
+        graph.add_edge(objects[node1], objects[node2], travel_time, fuel_cost, good_conditions, {VehicleType(t) for t in vehicles})
+    if hasattr(graph.storage, "compact"):
+        graph.storage.compact()
+    del objects
+    total_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return zone_bytes / max(1, len(zones)), (total_bytes - zone_bytes) / max(1, len(edges))
+
+def report(title: str, zones: list[tuple], edges: list[tuple]):
+    notify("info", f"{title}: {len(zones)} zonas, {len(edges)} arestas")
+    print(f"{'backend':<10}{'bytes/zona':>14}{'bytes/aresta':>14}")
+    for backend in BACKENDS:
+        per_zone, per_edge = measure(backend, zones, edges)
+        print(f"{backend:<10}{per_zone:>14.1f}{per_edge:>14.1f}")
+
+def main():
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    try:
+        from example_graph import RandomGraph
+        random_graph = RandomGraph()
+    except Exception as e:
+        notify("warning", f"RandomGraph indisponível: {e}")
+    else:
+        report("RandomGraph", *graph_spec(random_graph))
+    report("Grafo sintético", *synthetic_spec(num_edges))
+
+if __name__ == "__main__":
+    main()
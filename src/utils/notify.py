@@ -1,32 +1,152 @@
+import os
+import sys
+import time
+import atexit
+from collections import Counter
+from contextlib import contextmanager
 from colorama import Fore, Back
 
-# Whether to print debug messages
-DEBUG: bool = True
+# Severity of each type of message; messages below LEVEL are not formatted nor printed
+LEVELS: dict[str, int] = {"debug": 10, "info": 20, "success": 20, "message": 20, "warning": 30, "error": 40}
+# Minimum level printed (can be set with the UM_LOG_LEVEL environment variable or set_level)
+LEVEL: int = LEVELS.get(os.environ.get("UM_LOG_LEVEL", "debug"), LEVELS["debug"])
+# Whether to print debug messages (kept in sync by set_level, and can still be switched off on its own)
+DEBUG: bool = LEVEL <= LEVELS["debug"]
+# Lines printed at once by buffered
+BUFFER_LINES: int = 1024
+# Messages counted by category, whether they are printed or not
+COUNTERS: Counter = Counter()
+
+_COLORS: dict[str, tuple[str, str]] = {
+    "info": (Back.BLUE, Fore.BLUE),
+    "warning": (Back.YELLOW, Fore.YELLOW),
+    "error": (Back.RED, Fore.RED),
+    "success": (Back.GREEN, Fore.GREEN),
+    "debug": (Back.CYAN, Fore.CYAN),
+    "message": (Back.WHITE, Fore.WHITE)
+}
+_buffer: list[str] = []
+_buffering: int = 0 # Depth of nested buffered blocks
+_json_sink = None # (file, minimum level, json.dumps) of open_json_log
+
+"""
+Sets the minimum level of the printed messages.
+:param level: Type of message (debug, info, warning, error).
+"""
+def set_level(level: str):
+    global LEVEL, DEBUG
+    LEVEL = LEVELS[level]
+    DEBUG = LEVEL <= LEVELS["debug"]
+
+"""
+Whether messages of a type are printed at the current level.
+:param type: Type of message.
+"""
+def enabled(type: str) -> bool:
+    return LEVELS.get(type, 20) >= LEVEL and (DEBUG or type != 'debug')
+
+"""
+Whether messages of a type are printed or written to the JSON log (callers can skip building the ones that are not).
+:param type: Type of message.
+"""
+def wanted(type: str) -> bool:
+    return enabled(type) or (_json_sink is not None and LEVELS.get(type, 20) >= _json_sink[1])
 
 """
 Prints a message to the console with a colored background.
+The message is only formatted (message % args) if it is printed or written to the JSON log, so hot paths should pass
+their values as args instead of building an f-string.
 :param type: Type of message (info, warning, error, success, debug, message).
-:param message: Message to print.
-"""
-def notify(type: str, message: str):
-    if type == 'info':
-        print(Back.BLUE + "[INFO]" + Back.RESET + " " + Fore.BLUE + message + Fore.RESET)
-    elif type == 'warning':
-        print(Back.YELLOW + "[WARNING]" + Back.RESET + " " + Fore.YELLOW + message + Fore.RESET)
-    elif type == 'error':
-        print(Back.RED + "[ERROR]" + Back.RESET + " " + Fore.RED + message + Fore.RESET)
-    elif type == 'success':
-        print(Back.GREEN + "[SUCCESS]" + Back.RESET + " " + Fore.GREEN + message + Fore.RESET)
-    elif type == 'debug':
-        if DEBUG:
-            print(Back.CYAN + "[DEBUG]" + Back.RESET + " " + Fore.CYAN + message + Fore.RESET)
-    elif type == 'message':
-        print(Back.WHITE + "[MESSAGE]" + Back.RESET + " " + Fore.WHITE + message + Fore.RESET)
-    else:
-        print(message)
+:param message: Message to print, or format string for args.
+:param args: Values for the format string.
+:param category: Counter incremented by the message, even if it is not printed (see counters).
+"""
+def notify(type: str, message: str, *args, category: str=None):
+    if category is not None:
+        COUNTERS[category] += 1
+    level = LEVELS.get(type, 20)
+    printed = level >= LEVEL and (DEBUG or type != 'debug')
+    logged = _json_sink is not None and level >= _json_sink[1]
+    if not printed and not logged:
+        return
+    if args:
+        message = message % args
+    if logged:
+        _json_sink[0].write(_json_sink[2]({"time": time.time(), "type": type, "category": category, "message": message}, ensure_ascii=False) + "\n")
+    if printed:
+        colors = _COLORS.get(type)
+        line = colors[0] + "[" + type.upper() + "]" + Back.RESET + " " + colors[1] + message + Fore.RESET if colors is not None else message
+        if _buffering:
+            _buffer.append(line)
+            if len(_buffer) >= BUFFER_LINES:
+                flush()
+        else:
+            print(line)
+
+"""
+Writes the buffered messages to the console.
+"""
+def flush():
+    if _buffer:
+        sys.stdout.write("\n".join(_buffer) + "\n")
+        _buffer.clear()
+    sys.stdout.flush()
+
+"""
+Buffers the printed messages inside a with block, writing them in blocks of BUFFER_LINES and at the end of the block
+(use around searches, not around prompts).
+"""
+@contextmanager
+def buffered():
+    global _buffering
+    _buffering += 1
+    try:
+        yield
+    finally:
+        _buffering -= 1
+        if not _buffering:
+            flush()
+
+"""
+Writes every message from a level on (printed or not) to a JSON-lines file, one object per message with its
+"time", "type", "category" and "message" (can also be set with the UM_LOG_JSON environment variable).
+:param path: Path of the file (appended to).
+:param level: Minimum type of message written.
+"""
+def open_json_log(path: str, level: str="debug"):
+    global _json_sink
+    import json
+    close_json_log()
+    _json_sink = (open(path, "a", encoding="utf-8"), LEVELS[level], json.dumps)
+
+"""
+Closes the JSON-lines file of open_json_log.
+"""
+def close_json_log():
+    global _json_sink
+    if _json_sink is not None:
+        _json_sink[0].close()
+        _json_sink = None
+
+"""
+Gets the message counters.
+:param reset: Whether to reset them after reading.
+:return: Dict category -> number of messages.
+"""
+def counters(reset: bool=False) -> dict[str, int]:
+    result = dict(COUNTERS)
+    if reset:
+        COUNTERS.clear()
+    return result
 
 """
 Clears the console.
 """
 def clear():
-    print("\033c")  # clean the console
\ No newline at end of file
+    flush()
+    print("\033c")  # clean the console
+
+if os.environ.get("UM_LOG_JSON"):
+    open_json_log(os.environ["UM_LOG_JSON"])
+atexit.register(close_json_log)
+atexit.register(flush)
@@ -0,0 +1,121 @@
+"""
+Local cache of the Natural Earth country geometries used by RandomGraph, DynamicGraph and Graph.draw_map.
+The world file is parsed once by import_world and split into one pickle per continent (names, population,
+centroids and WKB geometries), so the graph builders load only their continent, without geopandas or the network.
+"""
+
+import os
+import sys
+import pickle
+from functools import lru_cache
+
+# Directory of the geometry cache (can be changed with the UM_WORLD_CACHE environment variable)
+WORLD_CACHE_DIR: str = os.environ.get("UM_WORLD_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "world"))
+INDEX_FILE: str = "index.pkl"
+IMPORT_HINT: str = "Import a Natural Earth countries file first: make world ARGS=<path to ne_110m_admin_0_countries.shp>"
+
+class ContinentSlice:
+    def __init__(self, data: dict):
+        """
+        Countries of one continent, as stored in the cache.
+        :param data: Dict with the lists "names", "population", "centroids" ((x, y) tuples) and "wkb" (geometries).
+        """
+        self.names: list[str] = data["names"]
+        self.population: list[int] = data["population"]
+        self.centroids: list[tuple[float, float]] = data["centroids"]
+        self.wkb: list[bytes] = data["wkb"]
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.geometries = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def centroid(self, name: str) -> tuple[float, float]:
+        return self.centroids[self.positions[name]]
+
+    def geometry(self, name: str):
+        """
+        Get the shapely geometry of a country (decoded from WKB on first use).
+        """
+        geometry = self.geometries.get(name)
+        if geometry is None:
+            from shapely import from_wkb
+            geometry = from_wkb(self.wkb[self.positions[name]])
+            self.geometries[name] = geometry
+        return geometry
+
+def _cache_file(name: str) -> str:
+    return os.path.join(WORLD_CACHE_DIR, name)
+
+def import_world(path: str) -> list[str]:
+    """
+    Parse a Natural Earth countries file once and write the per-continent cache.
+    :param path: Local world file readable by geopandas (e.g. ne_110m_admin_0_countries.shp or naturalearth_lowres.shp).
+    :return: Names of the continents written to the cache.
+    """
+    import geopandas as gpd
+    world = gpd.read_file(path)
+    world.columns = [column.lower() if column != "geometry" else column for column in world.columns]
+    os.makedirs(WORLD_CACHE_DIR, exist_ok=True)
+    index = {}
+    for continent, countries in world.groupby("continent"):
+        data = {"names": [], "population": [], "centroids": [], "wkb": []}
+        for _, row in countries.iterrows():
+            centroid = row.geometry.centroid
+            data["names"].append(str(row["name"]))
+            data["population"].append(int(row["pop_est"]))
+            data["centroids"].append((centroid.x, centroid.y))
+            data["wkb"].append(row.geometry.wkb)
+            index[str(row["name"])] = continent
+        with open(_cache_file(f"{continent}.pkl"), "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(_cache_file(INDEX_FILE), "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    load_continent.cache_clear()
+    load_index.cache_clear()
+    return sorted(set(index.values()))
+
+@lru_cache(maxsize=None)
+def load_index() -> dict[str, str]:
+    """
+    Get the country name -> continent index of the cache.
+    """
+    try:
+        with open(_cache_file(INDEX_FILE), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"World geometry cache not found in {WORLD_CACHE_DIR}. {IMPORT_HINT}") from None
+
+@lru_cache(maxsize=None)
+def load_continent(continent: str) -> ContinentSlice:
+    """
+    Load the countries of a continent from the cache (once per process).
+    :param continent: Continent name as in Natural Earth (e.g. "Africa").
+    """
+    try:
+        with open(_cache_file(f"{continent}.pkl"), "rb") as f:
+            return ContinentSlice(pickle.load(f))
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Continent {continent} not found in the world geometry cache ({WORLD_CACHE_DIR}). {IMPORT_HINT}") from None
+
+def find_countries(names: list[str]) -> dict[str, tuple]:
+    """
+    Find the geometry and centroid of countries, loading only the continents they belong to.
+    :param names: Country names.
+    :return: Dict name -> (geometry, (x, y) centroid) for the names present in the cache.
+    """
+    index = load_index()
+    countries = {}
+    for name in names:
+        continent = index.get(name)
+        if continent is not None:
+            countries[name] = (load_continent(continent).geometry(name), load_continent(continent).centroid(name))
+    return countries
+
+if __name__ == "__main__":
+    from utils.notify import notify
+    if len(sys.argv) < 2:
+        notify("error", f"Usage: {IMPORT_HINT}")
+        sys.exit(1)
+    continents = import_world(sys.argv[1])
+    notify("success", f"World geometry cache written to {os.path.normpath(WORLD_CACHE_DIR)}: {', '.join(continents)}")
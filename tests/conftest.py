@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The modules of the project are imported from src (as PYTHONPATH=src does for the make targets)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import utils.notify
+
+@pytest.fixture(autouse=True)
+def quiet():
+    """
+    Keep the messages of the algorithms out of the test output (as UM_LOG_LEVEL=error).
+    """
+    level, debug = utils.notify.LEVEL, utils.notify.DEBUG
+    utils.notify.set_level("error")
+    yield
+    utils.notify.LEVEL, utils.notify.DEBUG = level, debug
@@ -0,0 +1,32 @@
+"""
+Graphs and edge changes shared by the tests.
+"""
+
+import random
+
+from classes.synthetic import scale_free_graph
+
+def synthetic(num_zones: int=300, seed: int=0, backend: str="dict"):
+    """
+    Small seeded scale-free graph whose TTLs are large enough for any route (see classes/synthetic.py).
+    """
+    return scale_free_graph(num_zones, 3, seed, backend, affected=3, ttl_scale=1000)
+
+def change_edges(graph, probability: float, rng: random.Random) -> list[int]:
+    """
+    Change the travel time and road conditions of random edges (as DynamicGraph.update_conditions) and commit them.
+    :return: Edge slots changed (see Graph.commit_version).
+    """
+    for zone in graph.get_nodes():
+        for (adjacente, _, (_, fuel_cost, _, vehicles)) in graph.edges_of(zone.get_name()):
+            if rng.random() < probability:
+                graph.update_edge(zone.get_name(), adjacente, rng.randint(30, 180), fuel_cost, rng.random() < 0.85, vehicles)
+    return graph.commit_version()
+
+def queries(graph, count: int, seed: int=0, targets: int=2) -> list[tuple[str, list[str], int]]:
+    """
+    Random (start node, end nodes, load) queries over the zones of a graph.
+    """
+    rng = random.Random(seed)
+    names = sorted(zone.get_name() for zone in graph.get_nodes())
+    return [(sample[0], sample[1:], rng.choice((50, 300, 550, 900))) for sample in (rng.sample(names, targets + 1) for _ in range(count))]
@@ -0,0 +1,44 @@
+import pytest
+
+from classes.algorithms import AStar, BFS
+from classes.batch import solve_batch
+from tests.graphs import synthetic, queries
+
+def one_by_one(graph, algorithm, workload: list[tuple]) -> list:
+    results = []
+    for (start_node, end_nodes, peso) in workload:
+        with graph.snapshot() as snapshot:
+            results.append(algorithm(start_node, list(end_nodes), snapshot.query(), peso))
+    return results
+
+@pytest.mark.parametrize("algorithm", (AStar, BFS))
+def test_batch_matches_the_algorithm(algorithm):
+    graph = synthetic()
+    camp = graph.get_camp_node()
+    ends = sorted(zone.get_name() for zone in graph.get_nodes())[:4]
+    # Repeated end nodes (in any order) and loads of the same bucket share one search of AStar
+    workload = queries(graph, 30) + [(camp, ends[:2], peso) for peso in (10, 40, 150, 550, 900)] + [(camp, ends[1::-1], 20)]
+    stats = {}
+    assert solve_batch(graph, workload, algorithm, stats) == one_by_one(graph, algorithm, workload)
+    assert stats["queries"] == len(workload)
+    if algorithm is AStar:
+        assert stats["groups"] < len(workload)
+
+def test_batch_results_do_not_share_paths():
+    graph = synthetic()
+    workload = [(graph.get_camp_node(), graph.get_affected_nodes(), peso) for peso in (10, 20)]
+    first, second = solve_batch(graph, workload)
+    if first is not None:
+        assert first == second and first[0] is not second[0]
+
+def test_shared_trees_match_astar_without_heuristic():
+    graph = synthetic()
+    graph.heuristics = dict.fromkeys(graph.heuristics, 0)
+    workload = queries(graph, 40, targets=3)
+    stats = {}
+    assert solve_batch(graph, workload, AStar, stats, shared_tree=True) == one_by_one(graph, AStar, workload)
+    assert stats["trees"] <= len(workload)
+
+def test_shared_trees_need_astar():
+    with pytest.raises(ValueError):
+        solve_batch(synthetic(), [], BFS, shared_tree=True)
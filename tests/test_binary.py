@@ -0,0 +1,36 @@
+import pytest
+
+from example_graph import FixedGraph
+from classes.algorithms import AStar
+from tests.graphs import synthetic, queries
+from tests.test_storage import edges, answer
+
+def zones(graph) -> list[tuple]:
+    return sorted((zone.get_name(), zone.get_population(), zone.get_severity(), zone.get_ttl(), zone.is_camp()) for zone in graph.get_nodes())
+
+@pytest.mark.parametrize("backend, mmap", (("compact", True), ("compact", False), ("dict", False), ("csr", True)))
+def test_save_and_load_keep_the_graph(tmp_path, backend, mmap):
+    graph = FixedGraph()
+    path = str(tmp_path / "fixed.graph")
+    graph.save(path)
+    loaded = FixedGraph.load(path, mmap, backend)
+    assert type(loaded) is FixedGraph
+    assert zones(loaded) == zones(graph)
+    assert edges(loaded) == edges(graph)
+    assert dict(loaded.get_heuristics()) == dict(graph.get_heuristics())
+    assert loaded.get_camp_node() == graph.get_camp_node()
+    assert loaded.get_affected_nodes() == graph.get_affected_nodes()
+    for peso in (50, 300, 900):
+        assert answer(AStar(graph.get_camp_node(), graph.get_affected_nodes(), loaded, peso)) == answer(AStar(graph.get_camp_node(), graph.get_affected_nodes(), graph, peso))
+
+def test_save_and_load_keep_the_landmarks(tmp_path):
+    graph = synthetic()
+    graph.build_landmarks(4, workers=1)
+    path = str(tmp_path / "synthetic.graph")
+    graph.save(path)
+    loaded = type(graph).load(path)
+    assert loaded.landmarks.landmarks == graph.landmarks.landmarks
+    for (loaded_tables, tables) in zip(loaded.landmarks.tables, graph.landmarks.tables):
+        assert [list(table) for table in loaded_tables] == [list(table) for table in tables]
+    for (start_node, end_nodes, peso) in queries(graph, 10):
+        assert answer(AStar(start_node, end_nodes, loaded, peso)) == answer(AStar(start_node, end_nodes, graph, peso))
@@ -0,0 +1,90 @@
+import random
+
+from classes.graph import Graph
+from classes.zone import Zone
+from classes.vehicle import VehicleType
+from classes.algorithms import AStar, BFS, RCSP
+from classes.cache import RouteCache
+from tests.graphs import synthetic, change_edges, queries
+
+def fresh(graph, algorithm, start_node: str, end_nodes: list[str], peso: int):
+    with graph.snapshot() as snapshot:
+        return algorithm(start_node, list(end_nodes), snapshot.query(), peso)
+
+def test_repeated_queries_are_hits_with_the_same_answer():
+    graph = synthetic()
+    cache = RouteCache(graph)
+    workload = queries(graph, 10)
+    first = [cache.solve(AStar, start_node, end_nodes, peso) for (start_node, end_nodes, peso) in workload]
+    second = [cache.solve(AStar, start_node, list(reversed(end_nodes)), peso) for (start_node, end_nodes, peso) in workload]
+    assert first == second
+    assert cache.counters()["hits"] == len(workload)
+    assert first == [fresh(graph, AStar, *query) for query in workload]
+
+def test_update_drops_only_the_routes_over_changed_edges():
+    graph = synthetic()
+    cache = RouteCache(graph)
+    rng = random.Random(0)
+    for (start_node, end_nodes, peso) in queries(graph, 30):
+        for algorithm in (AStar, BFS):
+            cache.solve(algorithm, start_node, end_nodes, peso)
+    routes = {key: set(slots) for (key, (result, slots, _)) in cache.entries.items() if result is not None}
+    before = len(cache.entries)
+    changed = change_edges(graph, 0.05, rng)
+    dropped = cache.update(changed)
+    kept = set(cache.entries)
+    assert kept == {key for (key, slots) in routes.items() if slots.isdisjoint(changed)}
+    assert 0 < dropped == before - len(kept) < before
+
+def test_kept_routes_keep_their_cost():
+    graph = synthetic()
+    cache = RouteCache(graph)
+    rng = random.Random(1)
+    workload = queries(graph, 30)
+    for _ in range(5):
+        for query in workload:
+            result = cache.solve(AStar, *query)
+            if result is not None:
+                assert abs(graph.calcula_custo(result[0]) - result[1]) < 1e-9
+        cache.update(change_edges(graph, 0.05, rng))
+
+def test_versions_committed_without_update_clear_the_cache():
+    graph = synthetic()
+    cache = RouteCache(graph)
+    for query in queries(graph, 5):
+        cache.solve(AStar, *query)
+    change_edges(graph, 0.05, random.Random(2))
+    change_edges(graph, 0.05, random.Random(3))
+    cache.update([])
+    assert not cache.entries
+
+def test_strict_drops_routes_when_an_edge_gets_faster():
+    # The route over B misses the TTL of T until A-B gets faster (its cost goes up: bad conditions)
+    graph = Graph()
+    zones = {name: Zone(name, 1000, 0, 1000, name == "A") for name in "ABC"}
+    zones["T"] = Zone("T", 1000, 3, 100)
+    for zone in zones.values():
+        graph.add_node(zone)
+    car = {VehicleType(0)}
+    graph.add_edge(zones["A"], zones["B"], 60, 70, True, car)
+    graph.add_edge(zones["B"], zones["T"], 40, 70, True, car)
+    graph.add_edge(zones["A"], zones["C"], 30, 1, True, car)
+    graph.add_edge(zones["C"], zones["T"], 30, 1, True, car)
+    cache = RouteCache(graph, strict=True)
+    assert cache.solve(AStar, "A", ["T"], 100)[0] == ["A", "C", "T"]
+    graph.update_edge("A", "B", 50, 70, False, car)
+    cache.update(graph.commit_version())
+    for algorithm in (AStar, RCSP):
+        result = cache.solve(algorithm, "A", ["T"], 100)
+        assert result == fresh(graph, algorithm, "A", ["T"], 100)
+        assert result[0] == ["A", "B", "T"]
+
+def test_strict_keeps_only_answers_the_algorithm_still_gives():
+    graph = synthetic()
+    cache = RouteCache(graph, strict=True)
+    rng = random.Random(4)
+    workload = queries(graph, 30)
+    for _ in range(5):
+        for query in workload:
+            assert cache.solve(AStar, *query) == fresh(graph, AStar, *query)
+        cache.update(change_edges(graph, 0.02, rng))
@@ -0,0 +1,32 @@
+import random
+
+from classes.landmarks import Topology, compute_tables
+from tests.graphs import synthetic, change_edges
+
+def test_update_matches_a_fresh_build():
+    graph = synthetic(500)
+    graph.build_landmarks(6, workers=1)
+    rng = random.Random(0)
+    recomputed = 0
+    for _ in range(5):
+        before = graph.landmarks
+        changed = change_edges(graph, 0.05, rng)
+        assert changed
+        recomputed += graph.landmarks is not before
+        costs = [graph.get_edge_cost(slot) for slot in range(len(graph.storage.costs))]
+        fresh = compute_tables(Topology(graph), costs, graph.landmarks.landmarks, 1)
+        for (tables, expected) in zip(graph.landmarks.tables, fresh):
+            assert [list(table) for table in tables] == [list(table) for table in expected]
+    assert recomputed
+
+def test_estimates_are_lower_bounds():
+    graph = synthetic(500)
+    graph.build_landmarks(6, workers=1)
+    topology = Topology(graph)
+    costs = [graph.get_edge_cost(slot) for slot in range(len(graph.storage.costs))]
+    names = sorted(graph.landmarks.ids)
+    rng = random.Random(1)
+    for target in rng.sample(names, 5):
+        (distances_to_target, _) = compute_tables(topology, costs, [graph.landmarks.ids[target]], 1)[0]
+        for node in rng.sample(names, 50):
+            assert graph.landmarks.estimate(node, [target]) <= distances_to_target[graph.landmarks.ids[node]] + 1e-9
@@ -0,0 +1,46 @@
+import math
+import random
+from heapq import heappush, heappop
+
+from classes.replanning import IncrementalPlanner
+from tests.graphs import synthetic, change_edges
+
+def cheapest(graph, start_node: str, end_nodes: list[str], peso: int) -> float:
+    """
+    Cost of the cheapest route to the nearest end node by Dijkstra over the edges with a vehicle for the load.
+    """
+    vehicle_table = graph.vehicle_table(peso)
+    best = {start_node: 0}
+    open_set = [(0, start_node)]
+    while open_set:
+        cost, node = heappop(open_set)
+        if node in end_nodes:
+            return cost
+        if cost > best[node]:
+            continue
+        for (adjacente, slot, _) in graph.edges_of(node):
+            if vehicle_table[graph.get_edge_mask(slot)] is None:
+                continue
+            if cost + graph.get_edge_cost(slot) < best.get(adjacente, math.inf):
+                best[adjacente] = cost + graph.get_edge_cost(slot)
+                heappush(open_set, (best[adjacente], adjacente))
+    return math.inf
+
+def test_repairs_match_dijkstra():
+    graph = synthetic(400)
+    rng = random.Random(0)
+    names = sorted(zone.get_name() for zone in graph.get_nodes())
+    start_node, *end_nodes = rng.sample(names, 4)
+    for peso in (50, 550):
+        planner = IncrementalPlanner(graph, start_node, end_nodes, peso)
+        for tick in range(10):
+            planner.update(change_edges(graph, 0.05, rng))
+            route = planner.route()
+            if tick % 3 == 2 and route is not None and len(route[0]) > 1:
+                planner.move(route[0][1])
+                route = planner.route()
+            expected = cheapest(graph, planner.start_node, set(end_nodes), peso)
+            if math.isinf(expected):
+                assert route is None
+            else:
+                assert math.isclose(route[1], expected)
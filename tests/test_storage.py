@@ -0,0 +1,43 @@
+import pytest
+
+from example_graph import FixedGraph
+from classes.algorithms import AStar, BFS, UniformCost
+from tests.graphs import synthetic, queries
+
+BACKENDS = ("dict", "csr", "compact")
+BUILDERS = {"fixed": lambda backend: FixedGraph(backend=backend), "synthetic": lambda backend: synthetic(backend=backend)}
+
+def edges(graph) -> list[tuple]:
+    return sorted((zone.get_name(), adjacente, travel_time, fuel_cost, good_conditions, graph.get_edge_mask(slot), graph.get_edge_cost(slot))
+                  for zone in graph.get_nodes() for (adjacente, slot, (travel_time, fuel_cost, good_conditions, _)) in graph.edges_of(zone.get_name()))
+
+def answer(result: tuple) -> tuple:
+    return None if result is None else (tuple(result[0]), round(result[1], 9), str(result[2]))
+
+@pytest.mark.parametrize("name", BUILDERS)
+def test_backends_store_the_same_graph(name):
+    graphs = [BUILDERS[name](backend) for backend in BACKENDS]
+    reference = graphs[0]
+    for graph in graphs[1:]:
+        assert sorted(zone.get_name() for zone in graph.get_nodes()) == sorted(zone.get_name() for zone in reference.get_nodes())
+        assert edges(graph) == edges(reference)
+        assert graph.get_camp_node() == reference.get_camp_node()
+        assert sorted(graph.get_affected_nodes()) == sorted(reference.get_affected_nodes())
+
+@pytest.mark.parametrize("algorithm", (AStar, BFS, UniformCost))
+def test_backends_give_the_same_answers(algorithm):
+    graphs = [synthetic(backend=backend) for backend in BACKENDS]
+    for (start_node, end_nodes, peso) in queries(graphs[0], 20):
+        answers = {answer(algorithm(start_node, list(end_nodes), graph, peso)) for graph in graphs}
+        assert len(answers) == 1
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_role_indexes_follow_zone_changes(backend):
+    graph = FixedGraph(backend=backend)
+    assert graph.get_affected_nodes() == ["Tanzania", "Malawi"]
+    graph.get_node("Zambia").set_severity(3)
+    graph.get_node("Malawi").set_severity(0)
+    assert sorted(graph.get_affected_nodes()) == ["Tanzania", "Zambia"]
+    graph.get_node(graph.get_camp_node()).set_camp(False)
+    graph.get_node("Zambia").set_camp(True)
+    assert graph.get_camp_node() == "Zambia"
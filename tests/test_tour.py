@@ -0,0 +1,70 @@
+import math
+import random
+from itertools import permutations
+
+from classes.tour import held_karp, insertion_tour
+
+def instance(n: int, seed: int, ttl_limits: tuple[int, int]) -> tuple[list[list[float]], list[float], list[float]]:
+    rng = random.Random(seed)
+    times = [[0 if i == j else rng.randint(10, 100) for j in range(n + 1)] for i in range(n + 1)]
+    weights = [rng.randint(1, 4) for _ in range(n)]
+    ttls = [rng.randint(*ttl_limits) for _ in range(n)]
+    return times, weights, ttls
+
+def brute_force(times, weights, ttls, by_time: bool=False) -> float:
+    """
+    Best objective over every visiting order that reaches each zone within its TTL (math.inf if none does).
+    """
+    best = math.inf
+    for order in permutations(range(1, len(weights) + 1)):
+        clock = objective = 0
+        previous = 0
+        for zone in order:
+            clock += times[previous][zone]
+            if clock >= ttls[zone - 1]:
+                break
+            objective += weights[zone - 1] * clock
+            previous = zone
+        else:
+            best = min(best, clock if by_time else objective)
+    return best
+
+def test_held_karp_matches_brute_force_without_binding_ttls():
+    for seed in range(20):
+        times, weights, ttls = instance(6, seed, (10**6, 10**6))
+        stats = {}
+        order, objective = held_karp(times, weights, ttls, stats=stats)
+        assert stats["exact"]
+        assert math.isclose(objective, brute_force(times, weights, ttls))
+        assert sorted(order) == list(range(1, 7))
+
+def test_held_karp_is_exact_when_it_says_so():
+    exact = 0
+    for seed in range(40):
+        times, weights, ttls = instance(6, seed, (100, 400))
+        stats = {}
+        order, objective = held_karp(times, weights, ttls, stats=stats)
+        expected = brute_force(times, weights, ttls)
+        if stats["exact"]:
+            exact += 1
+            assert math.isclose(objective, expected)
+        elif order is not None:
+            assert objective >= expected - 1e-9
+    assert exact
+
+def test_held_karp_by_time_finds_a_feasible_order_whenever_one_exists():
+    for seed in range(40):
+        times, weights, ttls = instance(6, seed, (100, 400))
+        order, arrival = held_karp(times, weights, ttls, by_time=True)
+        expected = brute_force(times, weights, ttls, by_time=True)
+        assert (order is None) == math.isinf(expected)
+        if order is not None:
+            assert math.isclose(arrival, expected)
+
+def test_insertion_tour_is_feasible_and_not_better_than_the_optimum():
+    for seed in range(20):
+        times, weights, ttls = instance(7, seed, (300, 900))
+        order, objective = insertion_tour(times, weights, ttls)
+        if order is not None:
+            assert sorted(order) == list(range(1, 8))
+            assert objective >= brute_force(times, weights, ttls) - 1e-9